@@ -0,0 +1,121 @@
+"""
+Benchmark do resumo matinal contra os servidores locais
+
+Prepara o resumo (busca paralela dos tópicos e um resumo no LLM por tópico)
+e distribui para N chats por uma Bot API falsa que aplica os limites de
+flood do Telegram. Reporta os tempos, quantas chamadas ao LLM foram feitas
+e se algum envio excedeu os limites.
+
+Uso:
+    python -m benchmarks.bench_digest --chats 200
+    python -m benchmarks.bench_digest --chats 60 --groups 20 --rounds 2
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from typing import Any, Dict, List
+
+from benchmarks.bench_e2e import BENCH_TOKEN, configure_environment
+from benchmarks.common import run_metadata, save_results
+from benchmarks.fakes import (
+    FakeNewsServer, FakeOllamaServer, FakeOpenWeatherServer, FakeTelegramServer, StandIns
+)
+
+
+def busiest_second(times: List[float]) -> int:
+    """Maior quantidade de envios dentro de qualquer janela de 1 s"""
+    times = sorted(times)
+    best = start = 0
+    for end, at in enumerate(times):
+        while at - times[start] >= 1.0:
+            start += 1
+        best = max(best, end - start + 1)
+    return best
+
+
+def min_chat_gap(sent: List[Dict[str, Any]]) -> float:
+    """Menor intervalo entre duas mensagens no mesmo chat"""
+    last: Dict[int, float] = {}
+    gap = float("inf")
+    for message in sorted(sent, key=lambda m: m["at"]):
+        if message["chat_id"] in last:
+            gap = min(gap, message["at"] - last[message["chat_id"]])
+        last[message["chat_id"]] = message["at"]
+    return gap
+
+
+async def run(args: argparse.Namespace, chat_ids: List[int], telegram: FakeTelegramServer) -> Dict[str, Any]:
+    from telegram import Bot
+    from services.morning_digest import MorningDigest
+    from services.telegram_sender import RateLimitedSender
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    digest = MorningDigest()
+    async with Bot(BENCH_TOKEN, base_url=telegram.base_url) as bot:
+        sender = RateLimitedSender(bot)
+        prepared = await digest.prepare()
+        deliveries = []
+        for _ in range(args.rounds):
+            delivered = await digest.deliver(sender, chat_ids)
+            deliveries.append({'seconds': delivered['timings']['delivery'],
+                               'delivered': delivered['delivered'], 'failed': len(delivered['failed'])})
+    await digest.registry.cleanup()
+
+    return {
+        'prepare_seconds': prepared['timings']['prepare'],
+        'topics': {section['topic']: section['timings'] for section in prepared['sections']},
+        'deliveries': deliveries,
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark do resumo matinal")
+    parser.add_argument("--chats", type=int, default=100, help="Chats privados de destino")
+    parser.add_argument("--groups", type=int, default=0, help="Grupos de destino")
+    parser.add_argument("--rounds", type=int, default=1, help="Envios seguidos para os mesmos chats")
+    parser.add_argument("--flood-rate", type=float, default=30, help="Limite global da Bot API falsa (msg/s)")
+    parser.add_argument("--token-rate", type=float, default=50.0, help="Tokens/s do Ollama falso")
+    parser.add_argument("--output", default="benchmarks/results/digest.json", help="Arquivo JSON de saída")
+    parser.add_argument("--verbose", action="store_true", help="Mantém os logs INFO do bot")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    chat_ids = list(range(1, args.chats + 1)) + [-1000000000000 - i for i in range(1, args.groups + 1)]
+
+    ollama = FakeOllamaServer(token_rate=args.token_rate, latency=0.2, tokens=80)
+    news = FakeNewsServer()
+    weather = FakeOpenWeatherServer()
+    telegram = FakeTelegramServer(flood_rate=args.flood_rate, chat_interval=1.0)
+
+    with StandIns(ollama, news, weather, telegram):
+        configure_environment(ollama, news, chat_ids, weather)
+        results = asyncio.run(run(args, chat_ids, telegram))
+        sent = list(telegram.sent)
+        results['llm_requests'] = ollama.requests
+        results['flood_errors'] = telegram.flood_errors
+
+    results['busiest_second'] = busiest_second([message["at"] for message in sent])
+    results['min_chat_gap'] = min_chat_gap(sent) if args.rounds > 1 else None
+    results['config'] = {key: value for key, value in vars(args).items() if key not in ("output", "verbose")}
+    results['meta'] = run_metadata()
+
+    print(f"\n☀️  Resumo matinal: preparo em {results['prepare_seconds']:.2f}s, "
+          f"{results['llm_requests']} chamadas ao LLM para {len(chat_ids)} chats")
+    for topic, timings in results['topics'].items():
+        print(f"   {topic:<12} busca={timings['fetch']:.2f}s resumo={timings['summary']:.2f}s")
+    for i, delivery in enumerate(results['deliveries'], 1):
+        print(f"   Envio {i}: {delivery['delivered']} entregues, {delivery['failed']} falhas "
+              f"em {delivery['seconds']:.1f}s")
+    print(f"   Pico: {results['busiest_second']} msg/s | Respostas 429: {results['flood_errors']}")
+    save_results(results, args.output)
+    return 1 if results['flood_errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
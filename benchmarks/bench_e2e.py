@@ -0,0 +1,218 @@
+"""
+Benchmark ponta a ponta do Pateta Bot
+
+Sobe servidores locais no lugar do Ollama, dos sites de notícias e da Bot API
+do Telegram, envia N chats concorrentes pelo handle_message e mede vazão,
+latência por mensagem e atraso do event loop.
+
+Uso:
+    python -m benchmarks.bench_e2e --chats 20 --messages 5
+    python -m benchmarks.bench_e2e --output benchmarks/results/e2e.json \\
+        --baseline benchmarks/results/e2e-anterior.json --tolerance 0.15
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.common import compare_with_baseline, run_metadata, save_results, summarize
+from benchmarks.fakes import (
+    FIXTURES_DIR, FakeNewsServer, FakeOllamaServer, FakeOpenWeatherServer, FakeTelegramServer, StandIns
+)
+
+BENCH_TOKEN = "123456:BENCHMARK"
+
+# Métricas verificadas contra o baseline: (caminho, qual direção é melhor)
+REGRESSION_CHECKS = [
+    ("throughput_msgs_per_sec", "higher"),
+    ("latency.p50", "lower"),
+    ("latency.p99", "lower"),
+    ("loop_lag.p99", "lower"),
+]
+
+
+def configure_environment(ollama: FakeOllamaServer, news: FakeNewsServer, chat_ids: List[int],
+                          weather: Optional[FakeOpenWeatherServer] = None) -> None:
+    """Aponta as configurações do bot para os servidores locais (antes de importar main)"""
+    if weather:
+        os.environ.update({"OPENWEATHER_API_URL": weather.weather_url, "OPENWEATHER_API_KEY": "benchmark"})
+    os.environ.update({
+        "BOT_TOKEN": BENCH_TOKEN,
+        "ALLOWED_CHAT_IDS": ",".join(str(chat_id) for chat_id in chat_ids),
+        "OLLAMA_HOST": ollama.url,
+        "GOOGLE_NEWS_RSS_BASE": news.rss_url,
+        "NEWS_FEEDS": news.rss_url,
+        # As fixtures gravadas têm datas antigas
+        "NEWS_INDEX_MAX_AGE_HOURS": str(24 * 365 * 10),
+        "DUCKDUCKGO_API_URL": news.ddg_url,
+        "NEWS_SITES": ",".join(news.site_url(name) for name in ("g1", "uol", "terra")),
+        "SPORTS_SITES": news.site_url("ge"),
+        "METRICS_PORT": "0",
+    })
+
+
+def make_update(bot, update_id: int, chat_id: int, text: str,
+                user_id: Optional[int] = None, group: bool = False):
+    """Cria um Update de mensagem de texto como o Telegram enviaria"""
+    from telegram import MessageEntity, Update
+
+    user_id = user_id if user_id is not None else chat_id
+    message: Dict[str, Any] = {
+        "message_id": update_id,
+        "date": int(time.time()),
+        "chat": ({"id": chat_id, "type": "group", "title": f"Grupo{chat_id}"} if group
+                 else {"id": chat_id, "type": "private", "first_name": f"Chat{chat_id}"}),
+        "from": {"id": user_id, "is_bot": False, "first_name": f"Usuario{user_id}"},
+        "text": text,
+    }
+    if text.startswith("/"):
+        command_length = len(text.split()[0])
+        message["entities"] = [{"type": MessageEntity.BOT_COMMAND, "offset": 0, "length": command_length}]
+    return Update.de_json({"update_id": update_id, "message": message}, bot)
+
+
+async def _monitor_loop_lag(samples: List[float], stop: asyncio.Event, interval: float = 0.01) -> None:
+    """Mede o atraso do event loop em relação a um sleep fixo"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, time.perf_counter() - start - interval))
+
+
+async def run_load(app, chat_ids: List[int], messages_per_chat: int, texts: List[str]) -> Dict[str, Any]:
+    """
+    Executa a carga: cada chat envia suas mensagens em sequência,
+    esperando a resposta anterior (como um usuário real)
+    """
+    latencies: List[float] = []
+    lag_samples: List[float] = []
+    errors = 0
+    update_ids = iter(range(1, 10 ** 9))
+
+    async def run_chat(index: int, chat_id: int) -> None:
+        nonlocal errors
+        for n in range(messages_per_chat):
+            text = texts[(index + n) % len(texts)]
+            update = make_update(app.bot, next(update_ids), chat_id, text)
+            start = time.perf_counter()
+            try:
+                await app.process_update(update)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(_monitor_loop_lag(lag_samples, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(run_chat(i, chat_id) for i, chat_id in enumerate(chat_ids)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await monitor
+
+    return {
+        'elapsed': elapsed,
+        'messages': len(latencies),
+        'errors': errors,
+        'throughput_msgs_per_sec': len(latencies) / elapsed if elapsed else 0.0,
+        'latency': summarize(latencies),
+        'loop_lag': summarize(lag_samples),
+    }
+
+
+async def bench(args: argparse.Namespace, telegram: FakeTelegramServer) -> Dict[str, Any]:
+    """Inicializa o bot contra os servidores locais e executa a carga"""
+    import main as bot_main
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    texts = json.loads((FIXTURES_DIR / "messages.json").read_text())
+    chat_ids = list(range(1, args.chats + 1))
+
+    app = bot_main.build_application(BENCH_TOKEN, base_url=telegram.base_url)
+    await app.initialize()
+    try:
+        return await run_load(app, chat_ids, args.messages, texts)
+    finally:
+        await app.shutdown()
+        await bot_main.tools_registry.cleanup()
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    """Exibe o resumo no terminal"""
+    latency = results['latency']
+    lag = results['loop_lag']
+    print("\n📊 Benchmark ponta a ponta")
+    print(f"   Mensagens: {results['messages']} em {results['elapsed']:.2f}s "
+          f"({results['errors']} erros)")
+    print(f"   Vazão: {results['throughput_msgs_per_sec']:.2f} msg/s")
+    print(f"   Latência: p50={latency['p50'] * 1000:.1f}ms p99={latency['p99'] * 1000:.1f}ms "
+          f"max={latency['max'] * 1000:.1f}ms")
+    print(f"   Atraso do event loop: p50={lag['p50'] * 1000:.2f}ms p99={lag['p99'] * 1000:.2f}ms "
+          f"max={lag['max'] * 1000:.2f}ms")
+    print(f"   Ollama: {results['stand_ins']['ollama_requests']} requisições | "
+          f"Sites: {results['stand_ins']['news_requests']} | "
+          f"Clima: {results['stand_ins']['weather_requests']} | "
+          f"Telegram: {results['stand_ins']['telegram_calls']}")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark ponta a ponta do Pateta Bot")
+    parser.add_argument("--chats", type=int, default=10, help="Chats concorrentes")
+    parser.add_argument("--messages", type=int, default=5, help="Mensagens por chat")
+    parser.add_argument("--token-rate", type=float, default=200.0, help="Tokens/s do Ollama falso")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Avaliação do prompt (s)")
+    parser.add_argument("--llm-tokens", type=int, default=40, help="Tokens por resposta")
+    parser.add_argument("--llm-parallel", type=int, default=4, help="Gerações simultâneas no Ollama falso")
+    parser.add_argument("--site-latency", type=float, default=0.02, help="Latência dos sites falsos (s)")
+    parser.add_argument("--output", default="benchmarks/results/e2e.json", help="Arquivo JSON de saída")
+    parser.add_argument("--baseline", help="Resultado anterior para detectar regressões")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Piora relativa aceitável")
+    parser.add_argument("--verbose", action="store_true", help="Mantém os logs INFO do bot")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    ollama = FakeOllamaServer(token_rate=args.token_rate, latency=args.llm_latency,
+                              tokens=args.llm_tokens, parallel=args.llm_parallel)
+    news = FakeNewsServer(latency=args.site_latency)
+    weather = FakeOpenWeatherServer(latency=args.site_latency)
+    telegram = FakeTelegramServer()
+
+    with StandIns(ollama, news, weather, telegram):
+        configure_environment(ollama, news, list(range(1, args.chats + 1)), weather)
+        results = asyncio.run(bench(args, telegram))
+        results['stand_ins'] = {
+            'ollama_requests': ollama.requests,
+            'news_requests': news.requests,
+            'weather_requests': weather.requests,
+            'telegram_calls': sum(telegram.calls.values()),
+        }
+
+    results['config'] = {key: value for key, value in vars(args).items()
+                         if key not in ("output", "baseline", "verbose")}
+    results['meta'] = run_metadata()
+
+    print_report(results)
+    save_results(results, args.output)
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, REGRESSION_CHECKS, args.tolerance)
+        if regressions:
+            print("❌ Regressões em relação ao baseline:")
+            for regression in regressions:
+                print(f"   - {regression}")
+            return 1
+        print("✅ Sem regressões em relação ao baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Benchmark do roteamento de intenção
+
+Compara o roteamento por embeddings (contra o Ollama falso, que gera
+embeddings determinísticos por hashing) com as palavras-chave em frases
+rotuladas fora dos exemplos do manifesto, e mede a preparação dos vetores
+(calculados e lidos do disco) e a classificação com e sem o LRU.
+
+Uso:
+    python -m benchmarks.bench_intent
+    python -m benchmarks.bench_intent --threshold 0.35 --rounds 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import run_metadata, save_results, summarize
+from benchmarks.fakes import FIXTURES_DIR, FakeOllamaServer, StandIns
+
+
+def accuracy(predictions: List[Any], expected: List[Any]) -> float:
+    return sum(p == e for p, e in zip(predictions, expected)) / len(expected) if expected else 0.0
+
+
+async def run(args: argparse.Namespace, ollama: FakeOllamaServer) -> Dict[str, Any]:
+    from core.ollama_pool import OllamaPool
+    from mcp.intent_router import CHAT_EXAMPLES, CHAT_LABEL, IntentRouter
+    from mcp.tools_registry import tools_registry
+
+    labelled = json.loads((FIXTURES_DIR / "intents.json").read_text())
+    texts = [entry['text'] for entry in labelled]
+    expected = [entry['tool'] for entry in labelled]
+    examples = tools_registry.intent_examples()
+    examples[CHAT_LABEL] = CHAT_EXAMPLES
+
+    pool = OllamaPool([ollama.url], health_interval=0)
+    cache_path = os.path.join(tempfile.mkdtemp(prefix="pateta-intent-"), "intent_vectors.npz")
+    prepare = {}
+    for label in ("embed", "disk"):
+        router = IntentRouter(examples, pool=pool, cache_path=cache_path, threshold=args.threshold)
+        requests = ollama.embed_requests
+        start = time.perf_counter()
+        await router.prepare()
+        prepare[label] = {'seconds': time.perf_counter() - start, 'embed_requests': ollama.embed_requests - requests}
+
+    cold: List[float] = []
+    warm: List[float] = []
+    predictions: List[Any] = []
+    for text in texts:
+        start = time.perf_counter()
+        found = await router.classify(text)
+        cold.append(time.perf_counter() - start)
+        label = found[0] if found else None
+        if found is None:
+            # Abaixo do limite: o registro usaria as palavras-chave
+            keyword = tools_registry.detect_tool_needed(text)
+            label = keyword['tool'] if keyword else CHAT_LABEL
+        predictions.append(None if label == CHAT_LABEL else label)
+    for _ in range(args.rounds):
+        for text in texts:
+            start = time.perf_counter()
+            await router.classify(text)
+            warm.append(time.perf_counter() - start)
+
+    vector = router._lru[next(iter(router._lru))]
+    start = time.perf_counter()
+    for _ in range(args.rounds * 10):
+        router.nearest(vector)
+    nearest_seconds = (time.perf_counter() - start) / (args.rounds * 10)
+
+    keywords: List[Any] = []
+    keyword_times: List[float] = []
+    for text in texts:
+        start = time.perf_counter()
+        tool_info = tools_registry.detect_tool_needed(text)
+        keyword_times.append(time.perf_counter() - start)
+        keywords.append(tool_info['tool'] if tool_info else None)
+
+    await pool.close()
+    misses = [{'text': text, 'expected': exp, 'embedding': pred}
+              for text, exp, pred in zip(texts, expected, predictions) if pred != exp]
+    return {
+        'examples': len(router.texts),
+        'prepare': prepare,
+        'accuracy': {'embedding': accuracy(predictions, expected), 'keywords': accuracy(keywords, expected)},
+        'classify_cold': summarize(cold),
+        'classify_warm': summarize(warm),
+        'keywords': summarize(keyword_times),
+        'nearest_seconds': nearest_seconds,
+        'misses': misses,
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark do roteamento de intenção")
+    parser.add_argument("--threshold", type=float, default=0.3,
+                        help="Similaridade mínima (os embeddings falsos são menos parecidos que os reais)")
+    parser.add_argument("--rounds", type=int, default=100, help="Repetições das classificações com LRU")
+    parser.add_argument("--embed-latency", type=float, default=0.005, help="Latência do /api/embed falso (s)")
+    parser.add_argument("--output", default="benchmarks/results/intent.json", help="Arquivo JSON de saída")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    ollama = FakeOllamaServer(embed_latency=args.embed_latency)
+
+    with StandIns(ollama):
+        results = asyncio.run(run(args, ollama))
+
+    results['config'] = {key: value for key, value in vars(args).items() if key != "output"}
+    results['meta'] = run_metadata()
+
+    print(f"\n🧭 Roteamento de intenção: {results['examples']} exemplos")
+    for label, prepare in results['prepare'].items():
+        print(f"   Preparo ({label:<5}) {prepare['seconds'] * 1000:7.1f} ms | {prepare['embed_requests']} requisições")
+    print(f"   Acerto: embeddings {results['accuracy']['embedding']:.0%} | "
+          f"palavras-chave {results['accuracy']['keywords']:.0%}")
+    for label, key in (("Sem LRU", 'classify_cold'), ("Com LRU", 'classify_warm'), ("Palavras-chave", 'keywords')):
+        summary = results[key]
+        print(f"   {label:<15} p50={summary['p50'] * 1e6:8.1f}µs p99={summary['p99'] * 1e6:8.1f}µs")
+    print(f"   Similaridade (matriz x vetor): {results['nearest_seconds'] * 1e6:.1f}µs")
+    save_results(results, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Benchmark do logging
+
+Mede o custo, na thread que registra (o event loop no bot), das linhas de
+log do caminho quente: escrita síncrona como antes, fila com escrita numa
+thread (texto e JSON), amostragem por logger e linhas DEBUG desligadas
+com f-string e com formatação preguiçosa. O destino simula a latência de
+um pipe ou disco lento (--sink-latency) a cada gravação.
+
+Uso:
+    python -m benchmarks.bench_logging
+    python -m benchmarks.bench_logging --records 50000 --sink-latency 0
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+
+from benchmarks.common import run_metadata, save_results
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class SlowSink:
+    """Arquivo cujo flush espera `latency` segundos (stderr num pipe cheio, disco lento)"""
+
+    def __init__(self, output, latency: float):
+        self.output = output
+        self.latency = latency
+
+    def write(self, text: str) -> int:
+        return self.output.write(text)
+
+    def flush(self) -> None:
+        self.output.flush()
+        if self.latency:
+            time.sleep(self.latency)
+
+
+def emit(records: int, kind: str) -> float:
+    """Segundos por registro na thread que registra"""
+    logger = logging.getLogger("httpx" if kind == "sampled" else "bench.hot_path")
+    chat_id, user_id = 123456789, 987654321
+    start = time.perf_counter()
+    for i in range(records):
+        if kind == "debug_fstring":
+            logger.debug(f"Chat ID: {chat_id}, User ID: {user_id}, Allowed: {i % 2 == 0}")
+        elif kind == "debug_lazy":
+            logger.debug("Chat ID: %s, User ID: %s, Allowed: %s", chat_id, user_id, i % 2 == 0)
+        else:
+            logger.info("Mensagem recebida de %s: %.50s... (%s)", "Usuario", "qual a previsão do tempo amanhã?", i)
+    return (time.perf_counter() - start) / records
+
+
+def run_scenario(label: str, records: int, use_queue: bool, fmt: str, kind: str, path: str,
+                 args: argparse.Namespace) -> Dict[str, Any]:
+    from config.logging_config import setup_logging, shutdown_logging
+    from utils.metrics import metrics
+
+    dropped = metrics.counter("log_records_dropped_total")
+    dropped_before = dropped.value
+    with open(path, "w", encoding="utf-8") as output:
+        setup_logging("INFO", fmt, use_queue=use_queue, queue_size=args.queue_size, sample_rates="httpx=0.05",
+                      stream=SlowSink(output, args.sink_latency))
+        per_record = emit(records, kind)
+        start = time.perf_counter()
+        shutdown_logging()
+        drain = time.perf_counter() - start
+    with open(path, encoding="utf-8") as written:
+        lines = sum(1 for _ in written)
+    return {'label': label, 'per_record_seconds': per_record, 'drain_seconds': drain, 'lines': lines,
+            'dropped': int(dropped.value - dropped_before)}
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    path = os.path.join(tempfile.mkdtemp(prefix="pateta-log-"), "bench.log")
+    scenarios = [
+        ("síncrono (texto)", False, TEXT_FORMAT, "info"),
+        ("fila (texto)", True, TEXT_FORMAT, "info"),
+        ("fila (json)", True, "json", "info"),
+        ("fila + amostragem 5%", True, TEXT_FORMAT, "sampled"),
+        ("debug desligado f-string", True, TEXT_FORMAT, "debug_fstring"),
+        ("debug desligado preguiçoso", True, TEXT_FORMAT, "debug_lazy"),
+    ]
+    results = [run_scenario(label, args.records, use_queue, fmt, kind, path, args)
+               for label, use_queue, fmt, kind in scenarios]
+    os.remove(path)
+    return {'scenarios': results}
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark do logging")
+    parser.add_argument("--records", type=int, default=20000, help="Registros por cenário")
+    parser.add_argument("--sink-latency", type=float, default=0.00002, help="Espera a cada gravação no destino (s)")
+    parser.add_argument("--queue-size", type=int, default=100000, help="Tamanho da fila (LOG_QUEUE_SIZE)")
+    parser.add_argument("--output", default="benchmarks/results/logging.json", help="Arquivo JSON de saída")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    results = run(args)
+    results['config'] = {key: value for key, value in vars(args).items() if key != "output"}
+    results['meta'] = run_metadata()
+
+    print(f"\n📝 Logging: {args.records} registros por cenário")
+    for scenario in results['scenarios']:
+        print(f"   {scenario['label']:<27} {scenario['per_record_seconds'] * 1e6:6.2f}µs/registro | "
+              f"esvaziar {scenario['drain_seconds'] * 1000:7.1f}ms | {scenario['lines']} linhas "
+              f"({scenario['dropped']} descartadas)")
+    save_results(results, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
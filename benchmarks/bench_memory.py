@@ -0,0 +1,132 @@
+"""
+Benchmark da memória de conversa
+
+Alimenta a memória com conversas longas em muitos chats, com um resumidor
+falso de latência configurável, e mede o custo de registrar uma troca e de
+montar o histórico, o tamanho do histórico enviado ao modelo (que não cresce
+com a conversa) e a memória ocupada conforme a quantidade de chats (que
+para de crescer no limite do LRU).
+
+Uso:
+    python -m benchmarks.bench_memory
+    python -m benchmarks.bench_memory --chats 1000,10000,50000 --max-chats 1000
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+from benchmarks.common import run_metadata, save_results, summarize
+
+WORDS = ("nave", "clima", "notícia", "futebol", "marte", "pateta", "missão", "tempo", "jogo", "amanhã",
+         "quem", "ganhou", "chuva", "previsão", "robô", "sistema", "órbita", "estrela", "piada", "hoje")
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+async def conversation(args: argparse.Namespace) -> Dict[str, Any]:
+    """Uma conversa longa num chat: o histórico enviado fica limitado"""
+    from core.conversation_memory import ConversationMemory, estimate_tokens
+
+    summaries = 0
+
+    async def summarizer(summary: str, turns: List) -> str:
+        nonlocal summaries
+        await asyncio.sleep(args.summary_latency)
+        summaries += 1
+        return f"{summary} {' '.join(question for question, _, _ in turns)}"
+
+    rng = random.Random(1)
+    memory = ConversationMemory(summarizer, max_turns=args.turns, max_tokens=args.tokens, max_chats=args.max_chats)
+    append: List[float] = []
+    history: List[float] = []
+    prompt_tokens: List[int] = []
+    for _ in range(args.messages):
+        start = time.perf_counter()
+        messages = memory.messages(1)
+        history.append(time.perf_counter() - start)
+        prompt_tokens.append(sum(estimate_tokens(message['content']) for message in messages))
+        start = time.perf_counter()
+        memory.append(1, sentence(rng, 12), sentence(rng, 60))
+        append.append(time.perf_counter() - start)
+        # Entre mensagens de um mesmo chat o resumidor tem tempo de rodar
+        await asyncio.sleep(args.summary_latency * 2)
+    return {
+        'append': summarize(append),
+        'history': summarize(history),
+        'prompt_tokens_max': max(prompt_tokens),
+        'prompt_tokens_last': prompt_tokens[-1],
+        'summaries': summaries,
+    }
+
+
+async def fill(chats: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """Memória ocupada com trocas em `chats` chats distintos"""
+    from core.conversation_memory import ConversationMemory
+
+    rng = random.Random(2)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    # Sem resumidor: as trocas que saem do buffer são descartadas
+    memory = ConversationMemory(None, max_turns=args.turns, max_tokens=args.tokens, max_chats=args.max_chats)
+    start = time.perf_counter()
+    for chat_id in range(chats):
+        for _ in range(args.turns):
+            memory.append(chat_id, sentence(rng, 12), sentence(rng, 60))
+    elapsed = time.perf_counter() - start
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    stats = memory.get_stats()
+    return {'chats': chats, 'kept': stats['chats'], 'turns': stats['turns'],
+            'bytes': used, 'append_per_sec': chats * args.turns / elapsed}
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        'conversation': await conversation(args),
+        'fill': [await fill(chats, args) for chats in args.chats],
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark da memória de conversa")
+    parser.add_argument("--chats", type=lambda value: [int(item) for item in value.split(",")],
+                        default=[1000, 10000, 50000], help="Quantidades de chats (separadas por vírgula)")
+    parser.add_argument("--max-chats", type=int, default=1000, help="Chats mantidos em memória")
+    parser.add_argument("--turns", type=int, default=6, help="Trocas mantidas por chat")
+    parser.add_argument("--tokens", type=int, default=1500, help="Tokens estimados mantidos por chat")
+    parser.add_argument("--messages", type=int, default=200, help="Mensagens da conversa longa")
+    parser.add_argument("--summary-latency", type=float, default=0.002, help="Latência do resumidor falso (s)")
+    parser.add_argument("--output", default="benchmarks/results/memory.json", help="Arquivo JSON de saída")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+    results['config'] = {key: value for key, value in vars(args).items() if key != "output"}
+    results['meta'] = run_metadata()
+
+    talk = results['conversation']
+    print(f"\n💭 Memória de conversa: {args.turns} trocas / {args.tokens} tokens por chat, "
+          f"{args.max_chats} chats no LRU")
+    print(f"   Conversa de {args.messages} mensagens: histórico máx. ~{talk['prompt_tokens_max']} tokens "
+          f"(último ~{talk['prompt_tokens_last']}) | {talk['summaries']} resumos")
+    for label, key in (("Registrar troca", 'append'), ("Montar histórico", 'history')):
+        summary = talk[key]
+        print(f"   {label:<17} p50={summary['p50'] * 1e6:7.1f}µs p99={summary['p99'] * 1e6:7.1f}µs")
+    for item in results['fill']:
+        print(f"   {item['chats']:>6} chats -> {item['kept']:>5} mantidos | {item['bytes'] / 1e6:6.1f} MB | "
+              f"{item['append_per_sec']:9.0f} trocas/s")
+    save_results(results, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""
+Benchmark de modelos e opções de geração
+
+Roda um conjunto fixo de prompts (papo livre, papo com histórico e
+perguntas com o contexto de ferramentas, montado como no
+_chat_with_context) pelo OllamaClient em cada combinação de modelo,
+temperature, num_predict e num_ctx. Para cada combinação mede o tempo de
+carga do modelo (descarregado antes, salvo --keep-loaded), o tempo até o
+primeiro token, as velocidades de avaliação do prompt e de geração
+informadas pelo Ollama e a memória ocupada segundo o /api/ps. Tags de
+quantização são modelos diferentes: informe-as em --models.
+
+Com --fake, roda contra o Ollama falso (para CI); sem ele, contra
+OLLAMA_HOST ou --host.
+
+Uso:
+    python -m benchmarks.bench_models --fake
+    python -m benchmarks.bench_models --models llama3.2:3b-instruct-q4_K_M,llama3.2:3b-instruct-q8_0
+    python -m benchmarks.bench_models --temperature 0.2,0.8 --num-predict 200,800 --num-ctx 2048,8192
+"""
+
+import argparse
+import asyncio
+import itertools
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.common import run_metadata, save_results, summarize
+from benchmarks.fakes import FIXTURES_DIR, FakeOllamaServer, StandIns
+
+HISTORY = [
+    {"role": "user", "content": "[Ana] oi pateta, tudo bem?"},
+    {"role": "assistant", "content": "Tudo ótimo, Ana! Meus circuitos estão em perfeito funcionamento :-)"},
+    {"role": "user", "content": "[Ana] vai chover amanhã em São Paulo?"},
+    {"role": "assistant", "content": "Pela previsão, sim: leve o guarda-chuva e deixe o resto comigo."},
+]
+
+
+def build_prompts() -> List[Tuple[str, str, List[Dict[str, str]]]]:
+    """(rótulo, conteúdo, histórico) dos prompts fixos"""
+    from core.ollama_client import context_prompt
+    from mcp.news_parsers import parse_rss
+    from mcp.tool_result import NewsItem, ToolResult, render_prompt
+
+    news = ToolResult.found("flamengo", parse_rss((FIXTURES_DIR / "google_news_rss.xml").read_text(), 5))
+    weather = ToolResult.found("clima rio de janeiro", [
+        NewsItem("Rio de Janeiro: 27°C, céu limpo, sensação 29°C, umidade 70%, vento 12 km/h", "", None, "OpenWeather")
+    ])
+    return [
+        ("papo", "[Ana] me conte uma piada curta sobre robôs", []),
+        ("histórico", "[Ana] e no fim de semana, dá praia?", HISTORY),
+        ("notícias", "[Ana] " + context_prompt("quais as últimas notícias do flamengo?", render_prompt(news)), []),
+        ("clima", "[Ana] " + context_prompt("como está o clima no Rio?", render_prompt(weather)), []),
+    ]
+
+
+def parse_list(text: str, kind: type) -> List[Any]:
+    return [kind(value.strip()) for value in text.split(",") if value.strip()]
+
+
+def option_grid(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Combinações de opções (num_ctx 0: janela padrão do modelo)"""
+    grid = []
+    for temperature, num_predict, num_ctx in itertools.product(
+        parse_list(args.temperature, float), parse_list(args.num_predict, int), parse_list(args.num_ctx, int)
+    ):
+        options: Dict[str, Any] = {"temperature": temperature, "num_predict": num_predict}
+        if num_ctx:
+            options["num_ctx"] = num_ctx
+        grid.append(options)
+    return grid
+
+
+def _loaded_size(response, model: str) -> Optional[Dict[str, int]]:
+    """Memória do modelo segundo o /api/ps"""
+    for entry in response.models:
+        if entry.model in (model, f"{model}:latest"):
+            return {'size': entry.size or 0, 'size_vram': entry.size_vram or 0}
+    return None
+
+
+def summarize_cell(requests: List[Dict[str, float]]) -> Dict[str, Any]:
+    """Resumo das gerações de uma combinação (a primeira inclui a carga do modelo)"""
+    warm = requests[1:] or requests
+    prompt_seconds = sum(request['prompt_eval_duration'] for request in requests) / 1e9
+    eval_seconds = sum(request['eval_duration'] for request in requests) / 1e9
+    return {
+        'load_seconds': requests[0]['load_duration'] / 1e9,
+        'ttft': summarize([request['ttft'] for request in warm]),
+        'total': summarize([request['total'] for request in warm]),
+        'prompt_tokens_per_second': (sum(request['prompt_eval_count'] for request in requests) / prompt_seconds
+                                     if prompt_seconds else 0.0),
+        'generation_tokens_per_second': (sum(request['eval_count'] for request in requests) / eval_seconds
+                                         if eval_seconds else 0.0),
+        'mean_prompt_tokens': sum(request['prompt_eval_count'] for request in requests) / len(requests),
+        'mean_generated_tokens': sum(request['eval_count'] for request in requests) / len(requests),
+    }
+
+
+async def run(args: argparse.Namespace, host: str) -> Dict[str, Any]:
+    from core.ollama_client import OllamaClient
+    from core.ollama_pool import OllamaPool
+
+    pool = OllamaPool([host], health_interval=0)
+    backend = pool.primary
+    prompts = build_prompts()
+    cells: List[Dict[str, Any]] = []
+    errors = 0
+
+    for model in parse_list(args.models, str):
+        info = await asyncio.to_thread(OllamaClient(model, pool=pool).get_model_info)
+        for options in option_grid(args):
+            client = OllamaClient(model, pool=pool, options=options)
+            if not args.keep_loaded:
+                # Descarrega o modelo: a primeira geração mede a carga (inclusive a de um num_ctx diferente)
+                await backend.client.chat(model=model, messages=[], keep_alive=0)
+            requests: List[Dict[str, Any]] = []
+            for _ in range(args.repeat):
+                for label, content, history in prompts:
+                    stats: Dict[str, Any] = {'prompt': label}
+                    try:
+                        await client._stream(content, history, stats=stats)
+                        requests.append(stats)
+                    except Exception as e:
+                        errors += 1
+                        print(f"   ⚠️ {model} {options} {label}: {e}")
+            cell = {'model': model, 'options': options, 'info': info, 'requests': requests}
+            if requests:
+                cell.update(summarize_cell(requests))
+                cell['memory'] = _loaded_size(await backend.client.ps(), model)
+            cells.append(cell)
+
+    await pool.close()
+    return {'cells': cells, 'errors': errors, 'prompts': [label for label, _, _ in prompts]}
+
+
+def print_table(cells: List[Dict[str, Any]]) -> None:
+    header = (f"   {'modelo':<32} {'quant.':<7} {'temp':>4} {'pred':>5} {'ctx':>6} | {'carga':>6} "
+              f"{'TTFT p50':>8} {'prompt':>9} {'geração':>9} | {'memória':>8}")
+    print(header)
+    print("   " + "-" * (len(header) - 3))
+    for cell in cells:
+        options, info = cell['options'], cell['info']
+        row = (f"   {cell['model'][:32]:<32} {(info.get('quantization_level') or '-')[:7]:<7} "
+               f"{options['temperature']:>4.1f} {options['num_predict']:>5} {options.get('num_ctx', '-'):>6} | ")
+        if not cell['requests']:
+            print(row + "falhou")
+            continue
+        memory = cell['memory']
+        print(row + f"{cell['load_seconds']:>5.2f}s {cell['ttft']['p50'] * 1000:>6.0f}ms "
+                    f"{cell['prompt_tokens_per_second']:>5.0f}t/s {cell['generation_tokens_per_second']:>5.1f}t/s | "
+                    f"{(memory['size'] / 1e9 if memory else 0):>6.2f}GB")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    from config.settings import OLLAMA_HOST, OLLAMA_MODEL, OLLAMA_NUM_CTX, OLLAMA_NUM_PREDICT, OLLAMA_TEMPERATURE
+
+    parser = argparse.ArgumentParser(description="Benchmark de modelos e opções de geração")
+    parser.add_argument("--models", default=OLLAMA_MODEL, help="Modelos (com tags) separados por vírgula")
+    parser.add_argument("--temperature", default=str(OLLAMA_TEMPERATURE), help="Valores de temperature")
+    parser.add_argument("--num-predict", default=str(OLLAMA_NUM_PREDICT), help="Valores de num_predict")
+    parser.add_argument("--num-ctx", default=str(OLLAMA_NUM_CTX), help="Valores de num_ctx (0: padrão do modelo)")
+    parser.add_argument("--repeat", type=int, default=3, help="Rodadas do conjunto de prompts por combinação")
+    parser.add_argument("--keep-loaded", action="store_true", help="Não descarrega o modelo antes de cada combinação")
+    parser.add_argument("--host", default=OLLAMA_HOST, help="Servidor Ollama (sem --fake)")
+    parser.add_argument("--fake", action="store_true", help="Usa o Ollama falso (CI)")
+    parser.add_argument("--fake-load-time", type=float, default=0.3, help="Carga de um modelo no Ollama falso (s)")
+    parser.add_argument("--fake-token-rate", type=float, default=200.0, help="Tokens/s de geração no Ollama falso")
+    parser.add_argument("--fake-prompt-rate", type=float, default=2000.0, help="Tokens/s de prompt no Ollama falso")
+    parser.add_argument("--output", default="benchmarks/results/models.json", help="Arquivo JSON de saída")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.fake:
+        models = parse_list(args.models, str)
+        fake = FakeOllamaServer(token_rate=args.fake_token_rate, latency=0.02, tokens=200, model=models[0],
+                                models=models, load_time=args.fake_load_time, prompt_rate=args.fake_prompt_rate)
+        with StandIns(fake):
+            results = asyncio.run(run(args, fake.url))
+    else:
+        results = asyncio.run(run(args, args.host))
+
+    results['config'] = {key: value for key, value in vars(args).items() if key != "output"}
+    results['meta'] = run_metadata()
+
+    print(f"\n🧪 Modelos e opções: {len(results['prompts'])} prompts x {args.repeat} rodadas por combinação"
+          f"{' (Ollama falso)' if args.fake else ''}")
+    print_table(results['cells'])
+    if results['errors']:
+        print(f"   Gerações com erro: {results['errors']}")
+    save_results(results, args.output)
+    return 1 if results['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
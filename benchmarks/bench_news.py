@@ -0,0 +1,124 @@
+"""
+Benchmark do índice local de notícias contra os servidores falsos
+
+Mede a carga do índice (inicial e sem mudanças: respostas 304), a latência
+das consultas respondidas pelo índice e a das que caem na busca na rede.
+
+Uso:
+    python -m benchmarks.bench_news
+    python -m benchmarks.bench_news --site-latency 0.2 --queries 5000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import run_metadata, save_results, summarize
+from benchmarks.fakes import FakeNewsServer, StandIns
+
+# Consultas com resultado no índice (termos dos títulos das fixtures) e sem resultado
+INDEXED_QUERIES = ("notícias", "botafogo", "stf", "camara dos deputados", "policia federal credito",
+                   "auditoria", "Brasileirão")
+MISSING_QUERY = "xadrez olímpico"
+
+
+async def run(args: argparse.Namespace, news: FakeNewsServer) -> Dict[str, Any]:
+    from mcp.news_tool import NewsTool
+
+    tool = NewsTool()
+    try:
+        ingests = {}
+        for label in ("cold", "unchanged"):
+            requests = news.requests
+            start = time.perf_counter()
+            added = await tool.ingest()
+            ingests[label] = {
+                'seconds': time.perf_counter() - start,
+                'new_items': added,
+                'requests': news.requests - requests,
+            }
+
+        searches: List[float] = []
+        queries: List[float] = []
+        hits = 0
+        for i in range(args.queries):
+            query = INDEXED_QUERIES[i % len(INDEXED_QUERIES)]
+            start = time.perf_counter()
+            found = tool.index.search(query, 3)
+            searches.append(time.perf_counter() - start)
+            hits += bool(found)
+            start = time.perf_counter()
+            await tool.execute({'query': query, 'limit': 3})
+            queries.append(time.perf_counter() - start)
+
+        fallback: List[float] = []
+        for _ in range(args.fallbacks):
+            requests = news.requests
+            start = time.perf_counter()
+            try:
+                await tool.execute({'query': MISSING_QUERY, 'limit': 3})
+            except Exception:
+                pass
+            fallback.append(time.perf_counter() - start)
+        live_requests = news.requests - requests if args.fallbacks else 0
+
+        return {
+            'ingest': ingests,
+            'index': tool.index.get_stats(),
+            'hit_ratio': hits / args.queries if args.queries else 0.0,
+            'search': summarize(searches),
+            'query': summarize(queries),
+            'fallback': summarize(fallback),
+            'fallback_requests': live_requests,
+        }
+    finally:
+        await tool.cleanup()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark do índice de notícias")
+    parser.add_argument("--site-latency", type=float, default=0.05, help="Latência dos sites falsos (s)")
+    parser.add_argument("--queries", type=int, default=2000, help="Consultas respondidas pelo índice")
+    parser.add_argument("--fallbacks", type=int, default=5, help="Consultas sem resultado no índice")
+    parser.add_argument("--output", default="benchmarks/results/news.json", help="Arquivo JSON de saída")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    news = FakeNewsServer(latency=args.site_latency)
+
+    with StandIns(news):
+        # As configurações são lidas no import, então o ambiente vem antes da ferramenta
+        os.environ.update({
+            "GOOGLE_NEWS_RSS_BASE": news.rss_url,
+            "DUCKDUCKGO_API_URL": news.ddg_url,
+            "NEWS_FEEDS": news.rss_url,
+            "NEWS_SITES": ",".join(news.site_url(name) for name in ("g1", "uol", "terra")),
+            "NEWS_INGEST_INTERVAL": "0",
+            # As fixtures gravadas têm datas antigas
+            "NEWS_INDEX_MAX_AGE_HOURS": str(24 * 365 * 10),
+        })
+        results = asyncio.run(run(args, news))
+
+    results['config'] = {'site_latency': args.site_latency, 'queries': args.queries, 'fallbacks': args.fallbacks}
+    results['meta'] = run_metadata()
+
+    index = results['index']
+    print(f"\n📰 Índice de notícias: {index['items']} itens, {index['terms']} termos "
+          f"(acertos: {results['hit_ratio']:.0%})")
+    for label, ingest in results['ingest'].items():
+        print(f"   Carga {label:<10} {ingest['seconds'] * 1000:7.1f} ms | "
+              f"{ingest['new_items']:3} novos | {ingest['requests']} requisições")
+    for label, key in (("Busca no índice", 'search'), ("Consulta", 'query'), ("Busca na rede", 'fallback')):
+        summary = results[key]
+        print(f"   {label:<16} p50={summary['p50'] * 1e6:.0f}µs p99={summary['p99'] * 1e6:.0f}µs")
+    save_results(results, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Benchmark do pool de servidores Ollama contra vários Ollamas falsos
+
+Cenários:
+    balanceamento: rajada de gerações com 1 host e com N hosts iguais
+    afinidade:     um host com o modelo carregado e outro que precisaria carregá-lo
+    failover:      um host respondendo 503 e outro fora do ar junto de um host saudável
+
+Uso:
+    python -m benchmarks.bench_ollama_pool
+    python -m benchmarks.bench_ollama_pool --hosts 4 --requests 64 --parallel 2
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import run_metadata, save_results, summarize
+from benchmarks.fakes import FakeOllamaServer, StandIns
+
+# Porta sem servidor: conexão recusada
+DEAD_HOST = "http://127.0.0.1:9"
+
+
+async def burst(hosts: List[str], requests: int, concurrency: int, check: bool = True) -> Dict[str, Any]:
+    """Dispara as gerações com concorrência limitada e mede cada uma"""
+    from core.ollama_client import OllamaClient
+    from core.ollama_pool import OllamaPool
+
+    pool = OllamaPool(hosts, health_interval=0)
+    client = OllamaClient(pool=pool)
+    if check:
+        await pool.check_health()
+    slots = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with slots:
+            start = time.perf_counter()
+            try:
+                await client._generate(f"pergunta {i}")
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    await pool.close()
+    return {
+        'elapsed': elapsed,
+        'throughput': requests / elapsed if elapsed else 0.0,
+        'errors': errors,
+        'latency': summarize(latencies),
+        'backends': pool.get_stats(),
+    }
+
+
+async def run(args: argparse.Namespace, servers: List[FakeOllamaServer], cold: FakeOllamaServer,
+              failing: FakeOllamaServer) -> Dict[str, Any]:
+    hosts = [server.url for server in servers]
+    results: Dict[str, Any] = {}
+
+    results['single'] = await burst(hosts[:1], args.requests, args.concurrency)
+    results['balanced'] = await burst(hosts, args.requests, args.concurrency)
+
+    # Requisições em sequência: sem afinidade, metade iria para o host que precisa carregar o modelo
+    loads = cold.loads
+    results['affinity'] = await burst([cold.url, hosts[0]], args.affinity_requests, 1)
+    results['affinity']['cold_loads'] = cold.loads - loads
+
+    # Sem verificação prévia: as falhas só aparecem nas próprias gerações
+    failing.fail_status = 503
+    results['failover'] = await burst([failing.url, DEAD_HOST, hosts[0]], args.requests, args.concurrency, check=False)
+    return results
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark do pool de servidores Ollama")
+    parser.add_argument("--hosts", type=int, default=3, help="Servidores Ollama falsos saudáveis")
+    parser.add_argument("--parallel", type=int, default=1, help="Gerações simultâneas por servidor")
+    parser.add_argument("--requests", type=int, default=30, help="Gerações por cenário")
+    parser.add_argument("--concurrency", type=int, default=12, help="Gerações em andamento no cliente")
+    parser.add_argument("--affinity-requests", type=int, default=10, help="Gerações do cenário de afinidade")
+    parser.add_argument("--token-rate", type=float, default=400.0, help="Tokens/s de cada servidor")
+    parser.add_argument("--load-time", type=float, default=1.0, help="Tempo de carga do modelo no host frio (s)")
+    parser.add_argument("--output", default="benchmarks/results/ollama_pool.json", help="Arquivo JSON de saída")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    servers = [FakeOllamaServer(token_rate=args.token_rate, parallel=args.parallel) for _ in range(args.hosts)]
+    cold = FakeOllamaServer(token_rate=args.token_rate, parallel=args.parallel,
+                            load_time=args.load_time, preloaded=False)
+    failing = FakeOllamaServer(token_rate=args.token_rate, parallel=args.parallel)
+
+    with StandIns(*servers, cold, failing):
+        results = asyncio.run(run(args, servers, cold, failing))
+
+    results['config'] = {key: value for key, value in vars(args).items() if key != "output"}
+    results['meta'] = run_metadata()
+
+    print(f"\n🧠 Pool Ollama: {args.requests} gerações, concorrência {args.concurrency}")
+    for label in ("single", "balanced", "affinity", "failover"):
+        run_result = results[label]
+        latency = run_result['latency']
+        spread = " ".join(f"{backend['requests']}" + (f"({backend['errors']}✗)" if backend['errors'] else "")
+                          for backend in run_result['backends'])
+        print(f"   {label:<9} {run_result['throughput']:6.1f} ger/s | p50={latency['p50'] * 1000:6.0f}ms "
+              f"p99={latency['p99'] * 1000:6.0f}ms | erros {run_result['errors']} | por host: {spread}")
+    print(f"   Cargas do modelo no host frio: {results['affinity']['cold_loads']}")
+    save_results(results, args.output)
+    ok = not any(results[label]['errors'] for label in ("single", "balanced", "affinity", "failover"))
+    return 0 if ok and not results['affinity']['cold_loads'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Benchmark da degradação sob carga
+
+Satura um Ollama falso com uma geração por vez e compara a latência das
+mensagens sem degradação (LLM_QUEUE_SLO=0) e com o SLO configurado,
+contando as decisões (resposta completa, template da ferramenta ou
+resposta pronta).
+
+Uso:
+    python -m benchmarks.bench_overload
+    python -m benchmarks.bench_overload --chats 30 --slo 1.5
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from typing import Any, Dict
+
+from benchmarks.bench_e2e import BENCH_TOKEN, configure_environment, run_load
+from benchmarks.common import run_metadata, save_results
+from benchmarks.fakes import (
+    FIXTURES_DIR, FakeNewsServer, FakeOllamaServer, FakeOpenWeatherServer, FakeTelegramServer, StandIns
+)
+
+DECISIONS = ("full", "templated", "canned")
+
+
+def decision_counts() -> Dict[str, int]:
+    from utils.metrics import metrics
+
+    return {decision: int(getattr(metrics.counter("llm_shed_decisions_total", decision=decision), "value", 0))
+            for decision in DECISIONS}
+
+
+async def bench(args: argparse.Namespace, telegram: FakeTelegramServer) -> Dict[str, Any]:
+    import main as bot_main
+    from core.load_shedder import load_shedder
+
+    logging.getLogger().setLevel(logging.WARNING)
+    texts = json.loads((FIXTURES_DIR / "messages.json").read_text())
+    chat_ids = list(range(1, args.chats + 1))
+
+    app = bot_main.build_application(BENCH_TOKEN, base_url=telegram.base_url)
+    await app.initialize()
+    runs = {}
+    try:
+        for label, slo in (("sem degradação", 0.0), (f"SLO {args.slo:g}s", args.slo)):
+            load_shedder.slo = slo
+            load_shedder.shedding = False
+            before = decision_counts()
+            result = await run_load(app, chat_ids, args.messages, texts)
+            after = decision_counts()
+            result['decisions'] = {decision: after[decision] - before[decision] for decision in DECISIONS}
+            result['slo'] = slo
+            runs[label] = result
+    finally:
+        await app.shutdown()
+        await bot_main.tools_registry.cleanup()
+    return runs
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark da degradação sob carga")
+    parser.add_argument("--chats", type=int, default=20, help="Chats concorrentes")
+    parser.add_argument("--messages", type=int, default=3, help="Mensagens por chat")
+    parser.add_argument("--slo", type=float, default=2.0, help="Espera máxima na fila do LLM (s)")
+    parser.add_argument("--token-rate", type=float, default=100.0, help="Tokens/s do Ollama falso")
+    parser.add_argument("--llm-tokens", type=int, default=40, help="Tokens por resposta")
+    parser.add_argument("--output", default="benchmarks/results/overload.json", help="Arquivo JSON de saída")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    # Uma geração por vez: a fila cresce com a quantidade de chats
+    ollama = FakeOllamaServer(token_rate=args.token_rate, tokens=args.llm_tokens, parallel=1)
+    news = FakeNewsServer()
+    weather = FakeOpenWeatherServer()
+    telegram = FakeTelegramServer()
+
+    with StandIns(ollama, news, weather, telegram):
+        configure_environment(ollama, news, list(range(1, args.chats + 1)), weather)
+        runs = asyncio.run(bench(args, telegram))
+
+    results = {'runs': runs, 'config': {key: value for key, value in vars(args).items() if key != "output"},
+               'meta': run_metadata()}
+    print(f"\n🚦 Degradação sob carga: {args.chats} chats x {args.messages} mensagens, Ollama com 1 geração por vez")
+    for label, run in runs.items():
+        latency = run['latency']
+        decisions = " ".join(f"{decision}={count}" for decision, count in run['decisions'].items())
+        print(f"   {label:<15} p50={latency['p50'] * 1000:7.0f}ms p99={latency['p99'] * 1000:7.0f}ms | "
+              f"{run['throughput_msgs_per_sec']:5.1f} msg/s | {decisions}")
+    save_results(results, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
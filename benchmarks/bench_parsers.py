@@ -0,0 +1,187 @@
+"""
+Micro-benchmark dos parsers de notícias sobre fixtures gravadas
+
+Mede ops/s, memória de pico e memória retida (tracemalloc) de
+_parse_rss_feed, _extract_site_news (caminho de _scrape_site) e _is_news_link
+para cada backend de parser, e confere se todos produzem o mesmo resultado.
+
+Uso:
+    python -m benchmarks.bench_parsers
+    python -m benchmarks.bench_parsers --check          # falha se abaixo dos limites
+    python -m benchmarks.bench_parsers --update-thresholds
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from benchmarks.common import run_metadata, save_results
+from benchmarks.fakes import FIXTURES_DIR
+from mcp.news_parsers import HTML_BACKENDS, RSS_BACKENDS, iter_links
+from mcp.news_tool import NewsTool
+
+THRESHOLDS_FILE = Path(__file__).parent / "parser_thresholds.json"
+SITES = ("g1", "uol", "terra", "ge")
+QUERIES = ("flamengo", "notícias", "economia")
+
+
+def measure(operation: Callable[[], Any], min_time: float) -> Dict[str, float]:
+    """
+    Mede uma operação: vazão por repetição e memória em uma execução isolada
+
+    Returns:
+        ops_per_sec, peak_kib (pico durante a execução) e retained_kib /
+        retained_blocks (alocações ainda vivas junto com o resultado)
+    """
+    operation()  # aquecimento
+
+    runs = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        operation()
+        runs += 1
+        elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        result = operation()
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    retained_blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+    del result
+
+    return {
+        'ops_per_sec': runs / elapsed,
+        'peak_kib': (peak - baseline) / 1024,
+        'retained_kib': (current - baseline) / 1024,
+        'retained_blocks': retained_blocks,
+    }
+
+
+def build_cases(tool: NewsTool, rss_limit: int) -> Dict[str, Callable[[], Any]]:
+    """Monta as operações medidas, uma por backend/fixture"""
+    rss = (FIXTURES_DIR / "google_news_rss.xml").read_text()
+    pages = {site: (FIXTURES_DIR / f"{site}.html").read_text() for site in SITES}
+    cases: Dict[str, Callable[[], Any]] = {}
+
+    for backend in RSS_BACKENDS:
+        cases[f"parse_rss_feed[{backend}]"] = (
+            lambda backend=backend: tool._parse_rss_feed(rss, rss_limit, backend)
+        )
+
+    for backend in HTML_BACKENDS:
+        def scrape_all(backend=backend):
+            return [tool._extract_site_news(pages[site], f"https://{site}/", query, backend)
+                    for site in SITES for query in QUERIES]
+        cases[f"scrape_site[{backend}]"] = scrape_all
+
+        def all_links(backend=backend):
+            return [list(iter_links(pages[site], backend)) for site in SITES]
+        cases[f"iter_links_full[{backend}]"] = all_links
+
+    links = [link for site in SITES for link in iter_links(pages[site], "html.parser")]
+
+    def is_news_link():
+        return sum(tool._is_news_link(href, title, query) for href, title in links for query in QUERIES)
+    cases["is_news_link"] = is_news_link
+
+    return cases
+
+
+def check_equivalence(cases: Dict[str, Callable[[], Any]]) -> List[str]:
+    """Confere se todos os backends de cada operação produzem o mesmo resultado"""
+    problems = []
+    groups: Dict[str, List[str]] = {}
+    for name in cases:
+        if "[" in name:
+            groups.setdefault(name.split("[")[0], []).append(name)
+    for group, names in groups.items():
+        reference = cases[names[0]]()
+        for name in names[1:]:
+            if cases[name]() != reference:
+                problems.append(f"{name} difere de {names[0]}")
+    return problems
+
+
+def check_thresholds(results: Dict[str, Dict[str, float]], thresholds: Dict[str, Dict[str, float]]) -> List[str]:
+    """Compara os resultados com os limites mínimos/máximos configurados"""
+    failures = []
+    for name, limits in thresholds.items():
+        measured = results.get(name)
+        if measured is None:
+            continue
+        if 'min_ops_per_sec' in limits and measured['ops_per_sec'] < limits['min_ops_per_sec']:
+            failures.append(f"{name}: {measured['ops_per_sec']:.1f} ops/s < {limits['min_ops_per_sec']}")
+        if 'max_peak_kib' in limits and measured['peak_kib'] > limits['max_peak_kib']:
+            failures.append(f"{name}: pico {measured['peak_kib']:.0f} KiB > {limits['max_peak_kib']}")
+    return failures
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Micro-benchmark dos parsers de notícias")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Tempo mínimo por caso (s)")
+    parser.add_argument("--rss-limit", type=int, default=3, help="Itens pedidos ao parser RSS")
+    parser.add_argument("--filter", default="", help="Executa apenas casos contendo este texto")
+    parser.add_argument("--output", default="benchmarks/results/parsers.json", help="Arquivo JSON de saída")
+    parser.add_argument("--check", action="store_true", help="Falha se algum caso violar os limites")
+    parser.add_argument("--update-thresholds", action="store_true",
+                        help="Regrava os limites com margem sobre a medição atual")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    tool = NewsTool()
+    cases = {name: op for name, op in build_cases(tool, args.rss_limit).items() if args.filter in name}
+
+    problems = check_equivalence(cases)
+
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"{'caso':<32} {'ops/s':>10} {'pico KiB':>10} {'retido KiB':>11} {'blocos':>8}")
+    for name, operation in cases.items():
+        measured = results[name] = measure(operation, args.min_time)
+        print(f"{name:<32} {measured['ops_per_sec']:>10.1f} {measured['peak_kib']:>10.0f} "
+              f"{measured['retained_kib']:>11.1f} {measured['retained_blocks']:>8}")
+
+    save_results({'meta': run_metadata(), 'cases': results, 'equivalence_problems': problems}, args.output)
+
+    if problems:
+        print("⚠️  Backends com resultados diferentes:")
+        for problem in problems:
+            print(f"   - {problem}")
+
+    if args.update_thresholds:
+        thresholds = {
+            name: {
+                'min_ops_per_sec': round(measured['ops_per_sec'] * 0.5, 1),
+                'max_peak_kib': round(measured['peak_kib'] * 1.5 + 64),
+            }
+            for name, measured in results.items()
+        }
+        THRESHOLDS_FILE.write_text(json.dumps(thresholds, indent=2) + "\n")
+        print(f"📝 Limites atualizados em {THRESHOLDS_FILE}")
+
+    if args.check:
+        thresholds = json.loads(THRESHOLDS_FILE.read_text())
+        failures = check_thresholds(results, thresholds)
+        if failures or problems:
+            print("❌ Regressões nos parsers:")
+            for failure in failures:
+                print(f"   - {failure}")
+            return 1
+        print("✅ Parsers dentro dos limites")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
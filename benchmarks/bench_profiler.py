@@ -0,0 +1,144 @@
+"""
+Benchmark dos ganchos de diagnóstico
+
+Mede a vazão de uma carga assíncrona (resultados de ferramenta
+desserializados e renderizados por várias tarefas concorrentes) sem
+diagnóstico, durante o /profile, com o tracemalloc ligado e depois de
+desligar tudo, que deve voltar à vazão inicial. Mede também quanto leva um
+/memsnap com um cache cheio em memória e o atraso do event loop enquanto
+ele roda.
+
+Uso:
+    python -m benchmarks.bench_profiler
+    python -m benchmarks.bench_profiler --seconds 3 --tasks 50 --entries 5000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import run_metadata, save_results, summarize
+
+
+def make_payloads(entries: int) -> List[str]:
+    from mcp.tool_result import NewsItem, ToolResult
+
+    return [ToolResult.found(f"consulta {entry}", [
+        NewsItem(f"Notícia {entry}-{i}: chuva forte em *Marte* amanhã", f"https://exemplo.com.br/{entry}/{i}",
+                 "Mon, 06 Jan 2025 10:00:00 GMT", "Google News RSS")
+        for i in range(10)
+    ]).dumps() for entry in range(entries)]
+
+
+async def workload(payloads: List[str], tasks: int, seconds: float) -> float:
+    """Operações por segundo (desserializar e renderizar um resultado) com N tarefas"""
+    from mcp.tool_result import ToolResult, render_markdown, render_prompt
+
+    done = 0
+    deadline = time.perf_counter() + seconds
+
+    async def worker(offset: int) -> None:
+        nonlocal done
+        i = offset
+        while time.perf_counter() < deadline:
+            result = ToolResult.loads(payloads[i % len(payloads)])
+            render_prompt(result)
+            render_markdown(result, "📰 *Últimas Notícias:*", 3)
+            done += 1
+            i += tasks
+            await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(tasks)))
+    return done / (time.perf_counter() - start)
+
+
+async def lag_during(coro) -> Dict[str, Any]:
+    """Duração de uma corrotina e o atraso do event loop enquanto ela roda"""
+    lags: List[float] = []
+    task = asyncio.ensure_future(coro)
+    start = time.perf_counter()
+    while not task.done():
+        tick = time.perf_counter()
+        await asyncio.sleep(0.005)
+        lags.append(max(0.0, time.perf_counter() - tick - 0.005))
+    return {'seconds': time.perf_counter() - start, 'lag': summarize(lags), 'result': task.result()}
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from utils.live_profiler import LiveProfiler
+
+    profiler = LiveProfiler(max_seconds=args.seconds, tracemalloc_max_seconds=0)
+    payloads = make_payloads(args.entries)
+    throughput: Dict[str, float] = {}
+
+    # Aquecimento: a primeira rodada paga caches e especialização do interpretador
+    await workload(payloads, args.tasks, min(args.seconds, 1.0))
+    throughput['off'] = await workload(payloads, args.tasks, args.seconds)
+
+    profile = asyncio.ensure_future(profiler.cpu_profile(args.seconds))
+    await asyncio.sleep(0)
+    throughput['profile'] = await workload(payloads, args.tasks, args.seconds)
+    report = await profile
+
+    # Cache cheio em memória: é o que o snapshot precisa percorrer
+    from mcp.tool_result import ToolResult
+
+    cache = [ToolResult.loads(payload) for payload in payloads]
+    first = await lag_during(profiler.memory_snapshot())
+    throughput['tracemalloc'] = await workload(payloads, args.tasks, args.seconds)
+    cache += [ToolResult.loads(payload) for payload in payloads[: args.entries // 10]]
+    diff = await lag_during(profiler.memory_snapshot())
+    profiler.stop_tracing()
+
+    throughput['after'] = await workload(payloads, args.tasks, args.seconds)
+    loop = await lag_during(profiler.loop_report(samples=10, interval=0.02))
+    del cache
+    return {
+        'ops_per_second': throughput,
+        'profile_top': report['functions'][:5],
+        'memsnap': {
+            'start_seconds': first['seconds'], 'start_lag': first['lag'],
+            'diff_seconds': diff['seconds'], 'diff_lag': diff['lag'],
+            'growth_top': diff['result']['growth'][:3],
+        },
+        'loop_report_seconds': loop['seconds'],
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark dos ganchos de diagnóstico")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Duração de cada medição de vazão")
+    parser.add_argument("--tasks", type=int, default=20, help="Tarefas concorrentes na carga")
+    parser.add_argument("--entries", type=int, default=2000, help="Resultados no cache em memória")
+    parser.add_argument("--output", default="benchmarks/results/profiler.json", help="Arquivo JSON de saída")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+    results['config'] = {key: value for key, value in vars(args).items() if key != "output"}
+    results['meta'] = run_metadata()
+
+    ops = results['ops_per_second']
+    labels = {'off': "sem diagnóstico", 'profile': "durante /profile", 'tracemalloc': "tracemalloc ligado",
+              'after': "depois de desligar"}
+    print(f"\n🔬 Diagnóstico: {args.tasks} tarefas, {args.entries} resultados em cache")
+    for key, label in labels.items():
+        print(f"   {label:<20} {ops[key]:9.0f} op/s ({ops[key] / ops['off'] - 1:+.1%})")
+    memsnap = results['memsnap']
+    print(f"   /memsnap inicial {memsnap['start_seconds'] * 1000:.0f}ms (atraso máx "
+          f"{memsnap['start_lag']['max'] * 1000:.1f}ms) | comparação {memsnap['diff_seconds'] * 1000:.0f}ms "
+          f"(atraso máx {memsnap['diff_lag']['max'] * 1000:.1f}ms)")
+    for entry in memsnap['growth_top']:
+        print(f"      +{entry['size_diff'] / 1024:.0f} KB {entry['location']}")
+    print(f"   /loop {results['loop_report_seconds'] * 1000:.0f}ms")
+    save_results(results, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Benchmark dos resultados tipados das ferramentas
+
+Compara os resultados como dicionários aninhados (formato anterior) com
+NewsItem/ToolResult: memória de um cache cheio, serialização para o cache
+em disco e montagem do contexto do prompt e da resposta do /news.
+
+Uso:
+    python -m benchmarks.bench_results
+    python -m benchmarks.bench_results --entries 5000 --items 10
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from benchmarks.common import run_metadata, save_results
+
+WORDS = ("flamengo", "clima", "marte", "eleição", "chuva", "missão")
+SOURCES = ("Google News RSS", "DuckDuckGo", "https://g1.globo.com", "https://www.uol.com.br", "OpenWeather")
+
+
+def make_dicts(entries: int, items: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """Resultados no formato anterior"""
+    results = []
+    for entry in range(entries):
+        data = [{
+            'title': f"Notícia {entry}-{i}: " + " ".join(rng.choice(WORDS) for _ in range(8)),
+            'url': f"https://exemplo.com.br/{entry}/{i}?utm_source=rss",
+            'published': "Mon, 06 Jan 2025 10:00:00 GMT",
+            'source': rng.choice(SOURCES),
+        } for i in range(items)]
+        results.append({'success': True, 'query': f"consulta {entry}", 'count': len(data), 'data': data,
+                        'timestamp': datetime.now().isoformat()})
+    return results
+
+
+def legacy_prompt(tool_result: Dict[str, Any]) -> str:
+    """_format_tool_result_for_ollama antes dos objetos tipados"""
+    if not tool_result.get('success', False):
+        return f"Ferramenta não conseguiu encontrar informações: {tool_result.get('message', 'Erro desconhecido')}"
+    if tool_result.get('data'):
+        context_parts = []
+        for item in tool_result['data']:
+            title = item.get('title', 'Sem título')
+            url = item.get('url', '')
+            source = item.get('source', 'Fonte desconhecida')
+            context_parts.append(f"📰 {title} (Fonte: {source})")
+        return f"INFORMAÇÕES ENCONTRADAS:\n" + "\n".join(context_parts)
+    return "Nenhuma informação encontrada."
+
+
+def legacy_markdown(result: Dict[str, Any]) -> str:
+    """Resposta do /news antes dos objetos tipados"""
+    from telegram.helpers import escape_markdown
+
+    news_text = "📰 *Últimas Notícias:*\n\n"
+    for i, item in enumerate(result['data'][:3], 1):
+        title = escape_markdown(item.get('title', 'Sem título'))
+        source = escape_markdown(item.get('source', 'Fonte desconhecida'))
+        news_text += f"{i}. {title}\n   📍 {source}\n\n"
+    return news_text
+
+
+def measure(build: Callable[[], Any]) -> Dict[str, Any]:
+    """Memória retida pelo valor construído"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return {'value': value, 'bytes': used}
+
+
+def per_call(function: Callable[[Any], Any], values: List[Any]) -> float:
+    start = time.perf_counter()
+    for value in values:
+        function(value)
+    return (time.perf_counter() - start) / len(values)
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from mcp.tool_result import ToolResult, render_markdown, render_prompt
+
+    # Os dois formatos lidos do mesmo JSON: títulos e URLs são strings novas nos dois casos
+    text = json.dumps(make_dicts(args.entries, args.items, random.Random(1)), ensure_ascii=False)
+    dicts = measure(lambda: json.loads(text))
+    typed = measure(lambda: [ToolResult.coerce(result) for result in json.loads(text)])
+    dict_results, typed_results = dicts['value'], typed['value']
+
+    dict_dumps = [json.dumps(result, ensure_ascii=False, default=str) for result in dict_results]
+    typed_dumps = [result.dumps() for result in typed_results]
+    return {
+        'memory_bytes': {'dict': dicts['bytes'], 'typed': typed['bytes']},
+        'disk_bytes': {'dict': sum(map(len, dict_dumps)), 'typed': sum(map(len, typed_dumps))},
+        'seconds': {
+            'dumps': {'dict': per_call(lambda value: json.dumps(value, ensure_ascii=False, default=str), dict_results),
+                      'typed': per_call(ToolResult.dumps, typed_results)},
+            'loads': {'dict': per_call(json.loads, dict_dumps), 'typed': per_call(ToolResult.loads, typed_dumps)},
+            'prompt': {'dict': per_call(legacy_prompt, dict_results), 'typed': per_call(render_prompt, typed_results)},
+            'markdown': {'dict': per_call(legacy_markdown, dict_results),
+                         'typed': per_call(lambda result: render_markdown(result, "📰 *Últimas Notícias:*", 3),
+                                           typed_results)},
+        },
+        'same_prompt': all(legacy_prompt(a) == render_prompt(b) for a, b in zip(dict_results, typed_results)),
+        'same_markdown': all(legacy_markdown(a) == render_markdown(b, "📰 *Últimas Notícias:*", 3)
+                             for a, b in zip(dict_results, typed_results)),
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark dos resultados tipados das ferramentas")
+    parser.add_argument("--entries", type=int, default=1024, help="Resultados no cache (padrão: tamanho do LRU)")
+    parser.add_argument("--items", type=int, default=10, help="Itens por resultado")
+    parser.add_argument("--output", default="benchmarks/results/results.json", help="Arquivo JSON de saída")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    results = run(args)
+    results['config'] = {key: value for key, value in vars(args).items() if key != "output"}
+    results['meta'] = run_metadata()
+
+    memory, disk = results['memory_bytes'], results['disk_bytes']
+    print(f"\n📦 Resultados tipados: {args.entries} resultados x {args.items} itens")
+    print(f"   Memória   dict {memory['dict'] / 1e6:6.2f} MB | tipado {memory['typed'] / 1e6:6.2f} MB")
+    print(f"   Em disco  dict {disk['dict'] / 1e6:6.2f} MB | tipado {disk['typed'] / 1e6:6.2f} MB")
+    for label, timing in results['seconds'].items():
+        print(f"   {label:<9} dict {timing['dict'] * 1e6:7.1f}µs | tipado {timing['typed'] * 1e6:7.1f}µs")
+    print(f"   Mesmo texto: prompt {'sim' if results['same_prompt'] else 'NÃO'} | "
+          f"markdown {'sim' if results['same_markdown'] else 'NÃO'}")
+    save_results(results, args.output)
+    return 0 if results['same_prompt'] and results['same_markdown'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Benchmark do modo multiprocesso
+
+Sobe os servidores locais, inicia o ShardRouter com N workers e injeta
+updates de vários chats de uma vez (como um pico de tráfego). Mede a vazão
+até a última resposta chegar ao Telegram falso, a distribuição dos chats
+entre os workers e se a ordem das mensagens de cada chat foi preservada.
+
+Verifica também o que os workers dividem entre si: uma pergunta de notícias
+feita num worker e repetida em outro deve sair do cache compartilhado (sem
+nova requisição aos sites), e com o limite de envio dividido (--rate) a
+soma dos envios de todos os workers não pode passar dele em nenhuma janela
+de um segundo.
+
+Uso:
+    python -m benchmarks.bench_sharding --workers 1,2,4
+    python -m benchmarks.bench_sharding --workers 4 --chats 200 --messages 5
+    python -m benchmarks.bench_sharding --workers 2,4 --rate 20 --rate-seconds 5
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from benchmarks.bench_e2e import BENCH_TOKEN, configure_environment, make_update
+from benchmarks.common import run_metadata, save_results
+from benchmarks.fakes import FakeNewsServer, FakeOllamaServer, FakeOpenWeatherServer, FakeTelegramServer, StandIns
+
+
+# Atraso tolerado entre o envio de um worker e a chegada ao Telegram falso (s)
+SCHEDULING_SLACK = 0.1
+
+
+def out_of_order(prompts: List[str]) -> int:
+    """Mensagens que chegaram ao LLM antes de uma mensagem anterior do mesmo chat"""
+    last: Dict[str, int] = {}
+    late = 0
+    for prompt in prompts:
+        # Formato "[Usuario<id>] msg <chat> <seq>"
+        parts = prompt.split()
+        if len(parts) < 4 or parts[1] != "msg":
+            continue
+        chat, seq = parts[2], int(parts[3])
+        if seq < last.get(chat, -1):
+            late += 1
+        last[chat] = max(seq, last.get(chat, -1))
+    return late
+
+
+async def wait_for(condition, timeout: float) -> bool:
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+def peak_rate(times: List[float], window: float = 1.0) -> int:
+    """Maior quantidade de envios dentro de uma janela deslizante"""
+    times = sorted(times)
+    peak = start = 0
+    for end, at in enumerate(times):
+        while at - times[start] >= window:
+            start += 1
+        peak = max(peak, end - start + 1)
+    return peak
+
+
+async def start_router(router, telegram: FakeTelegramServer) -> None:
+    ready = telegram.calls.get("getMe", 0) + router.workers
+    router.start()
+    if not await wait_for(lambda: telegram.calls.get("getMe", 0) >= ready, 60):
+        raise RuntimeError("Workers não ficaram prontos")
+
+
+async def check_shared_cache(router, bot, news: FakeNewsServer, telegram: FakeTelegramServer,
+                             args: argparse.Namespace, update_id: int) -> Optional[bool]:
+    """A mesma pergunta em chats de workers diferentes: a segunda deve sair do cache compartilhado"""
+    chats: Dict[int, int] = {}
+    for chat_id in range(1, args.chats + 1):
+        chats.setdefault(router.ring.node_for(chat_id), chat_id)
+    if len(chats) < 2:
+        return None
+    first, second = chats[0], chats[1]
+    requests = []
+    for chat_id in (first, second):
+        update_id += 1
+        sent_before = len(telegram.sent)
+        requests.append(news.requests)
+        router.dispatch(make_update(bot, update_id, chat_id, "quais as notícias sobre economia?"))
+        if not await wait_for(lambda: any(message["chat_id"] == chat_id for message in telegram.sent[sent_before:]),
+                              args.timeout):
+            return False
+    return news.requests == requests[1] > requests[0]
+
+
+async def run_config(workers: int, args: argparse.Namespace, ollama: FakeOllamaServer, news: FakeNewsServer,
+                     telegram: FakeTelegramServer) -> Dict[str, Any]:
+    from telegram import Bot
+    from services.sharding import ShardRouter
+
+    bot = Bot(BENCH_TOKEN)
+    directory = tempfile.TemporaryDirectory()
+    router = ShardRouter(workers, BENCH_TOKEN, base_url=telegram.base_url,
+                         cache_path=os.path.join(directory.name, "tool-cache.sqlite"))
+    try:
+        await start_router(router, telegram)
+
+        sent_before = len(telegram.sent)
+        prompts_before = len(ollama.prompts)
+        expected = args.chats * args.messages
+        shards: Counter = Counter()
+        update_id = 0
+        started = time.perf_counter()
+        for seq in range(args.messages):
+            for chat_id in range(1, args.chats + 1):
+                update_id += 1
+                update = make_update(bot, update_id, chat_id, f"msg {chat_id} {seq}")
+                index = router.dispatch(update)
+                if seq == 0:
+                    shards[index] += 1
+        completed = await wait_for(lambda: len(telegram.sent) - sent_before >= expected, args.timeout)
+        elapsed = time.perf_counter() - started
+        replies = len(telegram.sent) - sent_before
+        prompts = ollama.prompts[prompts_before:]
+        shared_cache = await check_shared_cache(router, bot, news, telegram, args, update_id)
+    finally:
+        await asyncio.get_running_loop().run_in_executor(None, router.stop)
+        directory.cleanup()
+
+    return {
+        'workers': workers,
+        'completed': completed,
+        'elapsed': elapsed,
+        'replies': replies,
+        'throughput_msgs_per_sec': replies / elapsed if elapsed else 0.0,
+        'chats_per_worker': [shards[index] for index in range(workers)],
+        'out_of_order': out_of_order(prompts),
+        'shared_cache': shared_cache,
+    }
+
+
+async def run_rate_limit(workers: int, args: argparse.Namespace, telegram: FakeTelegramServer) -> Dict[str, Any]:
+    """Envios somados dos workers com o limite global dividido entre eles"""
+    from telegram import Bot
+    from services.sharding import ShardRouter
+
+    bot = Bot(BENCH_TOKEN)
+    router = ShardRouter(workers, BENCH_TOKEN, base_url=telegram.base_url, global_rate=args.rate / workers)
+    expected = int(args.rate * args.rate_seconds)
+    try:
+        await start_router(router, telegram)
+        sent_before = len(telegram.sent)
+        for seq in range(expected):
+            chat_id = seq % args.chats + 1
+            router.dispatch(make_update(bot, 1_000_000 + seq, chat_id, f"msg {chat_id} {seq}"))
+        completed = await wait_for(lambda: len(telegram.sent) - sent_before >= expected,
+                                   args.timeout + args.rate_seconds)
+        times = [message["at"] for message in telegram.sent[sent_before:]]
+    finally:
+        await asyncio.get_running_loop().run_in_executor(None, router.stop)
+
+    # Cada worker pode enviar um token a mais no início da janela (capacidade 1 do bucket), e o
+    # horário é o da chegada ao Telegram falso: o agendamento dos processos aproxima alguns envios
+    limit = args.rate + workers + args.rate * SCHEDULING_SLACK
+    peak = peak_rate(times)
+    return {
+        'workers': workers,
+        'completed': completed,
+        'sent': len(times),
+        'mean_rate': (len(times) - 1) / (max(times) - min(times)) if len(times) > 1 else 0.0,
+        'peak_per_second': peak,
+        'limit': limit,
+        'within_limit': peak <= limit,
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark do modo multiprocesso do Pateta Bot")
+    parser.add_argument("--workers", default="1,2,4", help="Quantidades de workers a comparar (ex.: 1,2,4)")
+    parser.add_argument("--chats", type=int, default=100, help="Chats distintos")
+    parser.add_argument("--messages", type=int, default=3, help="Mensagens por chat")
+    parser.add_argument("--token-rate", type=float, default=2000.0, help="Tokens/s do Ollama falso")
+    parser.add_argument("--llm-latency", type=float, default=0.01, help="Avaliação do prompt (s)")
+    parser.add_argument("--llm-tokens", type=int, default=20, help="Tokens por resposta")
+    parser.add_argument("--llm-parallel", type=int, default=256, help="Gerações simultâneas no Ollama falso")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Tempo máximo por configuração (s)")
+    parser.add_argument("--rate", type=float, default=20.0, help="Limite global de envio na verificação (msg/s)")
+    parser.add_argument("--rate-seconds", type=float, default=3.0, help="Duração da carga na verificação do limite")
+    parser.add_argument("--output", default="benchmarks/results/sharding.json", help="Arquivo JSON de saída")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    counts = [int(value) for value in args.workers.split(",") if value.strip()]
+    logging.getLogger().setLevel(logging.WARNING)
+
+    ollama = FakeOllamaServer(token_rate=args.token_rate, latency=args.llm_latency,
+                              tokens=args.llm_tokens, parallel=args.llm_parallel)
+    news = FakeNewsServer()
+    weather = FakeOpenWeatherServer()
+    # Sem limite de flood: mede a capacidade de processamento, não a fila de envio
+    telegram = FakeTelegramServer()
+
+    runs = []
+    rate_runs = []
+    with StandIns(ollama, news, weather, telegram):
+        configure_environment(ollama, news, list(range(1, args.chats + 1)), weather)
+        # Workers herdam o ambiente: todas as respostas chegam e o log fica enxuto.
+        # Na medição de vazão o limite de envio é alto; a verificação do limite usa --rate
+        os.environ.update({"CANCEL_SUPERSEDED": "false", "LOG_LEVEL": "WARNING", "TELEGRAM_CHAT_INTERVAL": "0",
+                           "NEWS_INGEST_INTERVAL": "0", "MORNING_NEWS_ENABLED": "false",
+                           "TELEGRAM_GLOBAL_RATE": "100000"})
+        for workers in counts:
+            runs.append(asyncio.run(run_config(workers, args, ollama, news, telegram)))
+            rate_runs.append(asyncio.run(run_rate_limit(workers, args, telegram)))
+
+    results = {'runs': runs, 'rate_limit': rate_runs,
+               'config': {key: value for key, value in vars(args).items() if key != "output"},
+               'meta': run_metadata()}
+    print(f"\n🧩 Multiprocesso: {args.chats} chats x {args.messages} mensagens (CPUs: {os.cpu_count()})")
+    for run in runs:
+        status = "" if run['completed'] else " (incompleto)"
+        print(f"   {run['workers']} workers: {run['throughput_msgs_per_sec']:7.1f} msg/s | "
+              f"{run['replies']} respostas em {run['elapsed']:.2f}s{status} | "
+              f"chats por worker {run['chats_per_worker']} | fora de ordem: {run['out_of_order']} | "
+              f"cache compartilhado: {_check_mark(run['shared_cache'])}")
+    print(f"   Limite de envio {args.rate:.0f} msg/s dividido entre os workers:")
+    for run in rate_runs:
+        status = "" if run['completed'] else " (incompleto)"
+        print(f"   {run['workers']} workers: média {run['mean_rate']:5.1f} msg/s | pico {run['peak_per_second']} "
+              f"em 1s (máx. {run['limit']:.0f}) {_check_mark(run['within_limit'])}{status}")
+    save_results(results, args.output)
+    ok = all(run['completed'] and not run['out_of_order'] and run['shared_cache'] is not False for run in runs)
+    ok = ok and all(run['completed'] and run['within_limit'] for run in rate_runs)
+    return 0 if ok else 1
+
+
+def _check_mark(value: Optional[bool]) -> str:
+    return "-" if value is None else ("✅" if value else "❌")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
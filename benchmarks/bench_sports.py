@@ -0,0 +1,97 @@
+"""
+Benchmark da SportsTool contra os portais falsos
+
+Mede a primeira carga dos times acompanhados, as atualizações seguintes
+(sem mudanças: respostas 304; com novo download: apenas a diferença) e a
+latência das consultas respondidas a partir do estado por time.
+
+Uso:
+    python -m benchmarks.bench_sports
+    python -m benchmarks.bench_sports --site-latency 0.2 --queries 5000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import run_metadata, save_results, summarize
+from benchmarks.fakes import FakeNewsServer, StandIns
+
+TEAMS = ("flamengo", "vasco", "fluminense", "botafogo")
+
+
+async def run(args: argparse.Namespace, news: FakeNewsServer) -> Dict[str, Any]:
+    from mcp.sports_tool import GENERAL_TEAM, SportsTool
+
+    tool = SportsTool()
+    try:
+        refreshes = {}
+        for label in ("cold", "unchanged", "redownload"):
+            if label == "redownload":
+                news.touch()
+            requests = news.requests
+            start = time.perf_counter()
+            added = await tool.refresh()
+            refreshes[label] = {
+                'seconds': time.perf_counter() - start,
+                'new_items': added,
+                'requests': news.requests - requests,
+            }
+
+        queries: List[float] = []
+        teams = TEAMS + (GENERAL_TEAM,)
+        for i in range(args.queries):
+            start = time.perf_counter()
+            await tool.execute({'team': teams[i % len(teams)], 'limit': 3})
+            queries.append(time.perf_counter() - start)
+
+        return {
+            'refresh': refreshes,
+            'not_modified': news.not_modified,
+            'items_per_team': {team: len(tool.latest(team, 10 ** 6)) for team in TEAMS},
+            'query': summarize(queries),
+        }
+    finally:
+        await tool.cleanup()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark da ferramenta de esportes")
+    parser.add_argument("--site-latency", type=float, default=0.05, help="Latência dos portais falsos (s)")
+    parser.add_argument("--queries", type=int, default=2000, help="Consultas após a carga inicial")
+    parser.add_argument("--output", default="benchmarks/results/sports.json", help="Arquivo JSON de saída")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    news = FakeNewsServer(latency=args.site_latency)
+
+    with StandIns(news):
+        # As configurações são lidas no import, então o ambiente vem antes da ferramenta
+        os.environ.update({
+            "GOOGLE_NEWS_RSS_BASE": news.rss_url,
+            "SPORTS_SITES": ",".join(news.site_url(name) for name in ("ge", "uol", "terra")),
+            "FAVORITE_TEAMS": ",".join(TEAMS),
+            "SPORTS_POLL_INTERVAL": "0",
+        })
+        results = asyncio.run(run(args, news))
+
+    results['config'] = {'site_latency': args.site_latency, 'queries': args.queries}
+    results['meta'] = run_metadata()
+
+    print(f"\n⚽ Esportes: {', '.join(f'{team}={count}' for team, count in results['items_per_team'].items())} itens")
+    for label, refresh in results['refresh'].items():
+        print(f"   Atualização {label:<10} {refresh['seconds'] * 1000:7.1f} ms | "
+              f"{refresh['new_items']:3} novos | {refresh['requests']} requisições")
+    query = results['query']
+    print(f"   Consulta: p50={query['p50'] * 1e6:.0f}µs p99={query['p99'] * 1e6:.0f}µs")
+    save_results(results, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Benchmark de inicialização a frio
+
+Importa main.py em processos novos, mede o tempo (mediana) e falha se
+ultrapassar a meta ou se alguma dependência pesada for carregada no import.
+
+Uso:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10 --target-ms 300
+"""
+
+import argparse
+import statistics
+import sys
+
+from benchmarks.common import run_metadata, save_results
+from utils.startup_profile import LAZY_MODULES, direct_imports, run_import_probe
+
+# Meta de tempo para `import main` (mediana, em ms) na VM ARM de produção
+DEFAULT_TARGET_MS = 400.0
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização do Pateta Bot")
+    parser.add_argument("--runs", type=int, default=7, help="Processos novos medidos")
+    parser.add_argument("--target-ms", type=float, default=DEFAULT_TARGET_MS,
+                        help="Mediana máxima aceitável para import main (ms)")
+    parser.add_argument("--output", default="benchmarks/results/startup.json", help="Arquivo JSON de saída")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    # Primeira execução descartada (aquece o cache de bytecode e do sistema de arquivos)
+    run_import_probe(importtime=False)
+    samples = [run_import_probe(importtime=False)['import_seconds'] * 1000 for _ in range(args.runs)]
+    profile = run_import_probe()
+
+    median_ms = statistics.median(samples)
+    results = {
+        'meta': run_metadata(),
+        'runs': args.runs,
+        'target_ms': args.target_ms,
+        'import_ms': {'median': median_ms, 'min': min(samples), 'max': max(samples)},
+        'lazy_loaded': profile['lazy_loaded'],
+        'direct_imports': {entry['module']: entry['cumulative_ms']
+                           for entry in direct_imports(profile['entries'], 'main')},
+    }
+
+    print(f"🚀 import main: mediana {median_ms:.0f} ms (min {min(samples):.0f}, max {max(samples):.0f}) "
+          f"| meta {args.target_ms:.0f} ms")
+    save_results(results, args.output)
+
+    failures = []
+    if median_ms > args.target_ms:
+        failures.append(f"mediana {median_ms:.0f} ms acima da meta de {args.target_ms:.0f} ms")
+    if profile['lazy_loaded']:
+        failures.append(f"dependências carregadas no import: {', '.join(profile['lazy_loaded'])} "
+                        f"(esperado sob demanda: {', '.join(LAZY_MODULES)})")
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+    print("✅ Inicialização dentro da meta")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
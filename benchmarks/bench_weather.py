@@ -0,0 +1,96 @@
+"""
+Benchmark da WeatherTool contra a OpenWeather falsa
+
+Mede uma consulta em lote (como a do resumo matinal) a frio e com cache,
+quantas requisições chegam à API para N cidades e a latência de consultas
+avulsas a bairros que compartilham a mesma coordenada arredondada.
+
+Uso:
+    python -m benchmarks.bench_weather
+    python -m benchmarks.bench_weather --api-latency 0.2 --repeat 50
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import run_metadata, save_results, summarize
+from benchmarks.fakes import FakeOpenWeatherServer, StandIns
+
+# Capitais, bairros vizinhos (mesma coordenada arredondada), erros de digitação e uma cidade fora do índice
+DIGEST_CITIES = [
+    "Rio de Janeiro", "São Paulo", "Belo Horizonte", "Brasília", "Salvador", "Recife",
+    "Porto Alegre", "Curitiba", "Manaus", "Fortaleza", "Copacabana", "Ipanema", "Leblon",
+    "Botafogo", "Niteroi", "sao paulo", "floripa", "Barra da Tijca", "Itacaré",
+]
+
+
+async def run(args: argparse.Namespace, server: FakeOpenWeatherServer) -> Dict[str, Any]:
+    from mcp.weather_tool import WeatherTool
+
+    tool = WeatherTool()
+    try:
+        start = time.perf_counter()
+        cold = await tool.fetch_many(DIGEST_CITIES)
+        cold_elapsed = time.perf_counter() - start
+        cold_requests = server.requests
+
+        start = time.perf_counter()
+        await tool.fetch_many(DIGEST_CITIES)
+        warm_elapsed = time.perf_counter() - start
+
+        single: List[float] = []
+        for i in range(args.repeat):
+            start = time.perf_counter()
+            await tool.execute({'city': DIGEST_CITIES[i % len(DIGEST_CITIES)]})
+            single.append(time.perf_counter() - start)
+
+        return {
+            'cities': len(DIGEST_CITIES),
+            'resolved': sum(1 for report in cold if report),
+            'cold_batch_seconds': cold_elapsed,
+            'cold_api_requests': cold_requests,
+            'warm_batch_seconds': warm_elapsed,
+            'warm_api_requests': server.requests - cold_requests,
+            'cached_single_lookup': summarize(single),
+        }
+    finally:
+        await tool.cleanup()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark da ferramenta de clima")
+    parser.add_argument("--api-latency", type=float, default=0.1, help="Latência da OpenWeather falsa (s)")
+    parser.add_argument("--repeat", type=int, default=200, help="Consultas avulsas após o aquecimento")
+    parser.add_argument("--output", default="benchmarks/results/weather.json", help="Arquivo JSON de saída")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    server = FakeOpenWeatherServer(latency=args.api_latency)
+
+    with StandIns(server):
+        # As configurações são lidas no import, então o ambiente vem antes da ferramenta
+        os.environ.update({"OPENWEATHER_API_URL": server.weather_url, "OPENWEATHER_API_KEY": "benchmark"})
+        results = asyncio.run(run(args, server))
+
+    results['config'] = {'api_latency': args.api_latency, 'repeat': args.repeat}
+    results['meta'] = run_metadata()
+
+    single = results['cached_single_lookup']
+    print(f"\n🌤️  Clima em lote: {results['cities']} cidades ({results['resolved']} encontradas)")
+    print(f"   A frio: {results['cold_batch_seconds'] * 1000:.0f} ms, "
+          f"{results['cold_api_requests']} requisições à API")
+    print(f"   Com cache: {results['warm_batch_seconds'] * 1000:.2f} ms, "
+          f"{results['warm_api_requests']} requisições à API")
+    print(f"   Consulta avulsa com cache: p50={single['p50'] * 1e6:.0f}µs p99={single['p99'] * 1e6:.0f}µs")
+    save_results(results, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Utilitários compartilhados pelos benchmarks
+Percentis, metadados da execução e comparação com resultados anteriores
+"""
+
+import json
+import platform
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Percentil por vizinho mais próximo (q entre 0 e 1)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(values: Sequence[float]) -> Dict[str, float]:
+    """Resumo de uma série de latências (segundos)"""
+    if not values:
+        return {'count': 0, 'mean': 0.0, 'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+    return {
+        'count': len(values),
+        'mean': sum(values) / len(values),
+        'p50': percentile(values, 0.50),
+        'p99': percentile(values, 0.99),
+        'max': max(values),
+    }
+
+
+def run_metadata() -> Dict[str, Any]:
+    """Informações da versão e da máquina que gerou o resultado"""
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+            capture_output=True, text=True, timeout=10
+        ).stdout.strip()
+    except Exception:
+        revision = ""
+    return {
+        'revision': revision or 'desconhecida',
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+    }
+
+
+def save_results(results: Dict[str, Any], output: str) -> None:
+    """Grava o resultado em JSON (criando o diretório se necessário)"""
+    path = Path(output)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, ensure_ascii=False) + "\n")
+    print(f"💾 Resultado salvo em {path}")
+
+
+def _lookup(data: Dict[str, Any], dotted: str) -> Any:
+    for part in dotted.split("."):
+        data = data[part]
+    return data
+
+
+def compare_with_baseline(results: Dict[str, Any], baseline_path: str,
+                          checks: List[Tuple[str, str]], tolerance: float) -> List[str]:
+    """
+    Compara métricas com um resultado anterior
+
+    Args:
+        results: Resultado atual
+        baseline_path: Arquivo JSON de uma execução anterior
+        checks: Pares (métrica, direção), direção 'higher' ou 'lower' é melhor
+        tolerance: Piora relativa aceitável (0.1 = 10%)
+
+    Returns:
+        Lista de regressões encontradas (vazia se nenhuma)
+    """
+    baseline = json.loads(Path(baseline_path).read_text())
+    regressions = []
+    for metric, better in checks:
+        try:
+            old = _lookup(baseline, metric)
+            new = _lookup(results, metric)
+        except (KeyError, TypeError):
+            continue
+        if not old:
+            continue
+        if better == 'higher' and new < old * (1 - tolerance):
+            regressions.append(f"{metric}: {new:.4g} < {old:.4g} (-{(1 - new / old):.0%})")
+        elif better == 'lower' and new > old * (1 + tolerance):
+            regressions.append(f"{metric}: {new:.4g} > {old:.4g} (+{(new / old - 1):.0%})")
+    return regressions
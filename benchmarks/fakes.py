@@ -0,0 +1,494 @@
+"""
+Servidores locais que substituem Ollama, sites de notícias e a Bot API do Telegram
+Usados pelos benchmarks para medir o bot sem internet e sem um Ollama real
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from aiohttp import web
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# Vocabulário usado pelo Ollama falso para montar as respostas
+_WORDS = (
+    "Gawrsh! Olha só o que eu encontrei por aqui, parece que o dia foi agitado "
+    "e eu continuo sendo o computador mais simpático da nave :-)"
+).split()
+
+# Dimensão dos embeddings do Ollama falso
+EMBED_DIM = 256
+
+
+def fake_embedding(text: str, dim: int = EMBED_DIM) -> List[float]:
+    """
+    Embedding determinístico por hashing de palavras e trigramas
+
+    Textos com palavras (ou radicais) em comum ficam próximos, o bastante
+    para exercitar o roteamento por similaridade sem um modelo real.
+    """
+    normalized = "".join(char for char in unicodedata.normalize("NFKD", text.lower())
+                         if not unicodedata.combining(char))
+    vector = [0.0] * dim
+    for word in re.findall(r"\w+", normalized):
+        features = [(word, 1.0)]
+        if len(word) > 3:
+            features += [(f"#{word[i:i + 3]}", 0.5) for i in range(len(word) - 2)]
+        for feature, weight in features:
+            digest = zlib.crc32(feature.encode())
+            vector[digest % dim] += weight if digest & 1 else -weight
+    norm = sum(value * value for value in vector) ** 0.5 or 1.0
+    return [value / norm for value in vector]
+
+
+class FakeServer:
+    """Servidor aiohttp em porta efêmera"""
+
+    def __init__(self, host: str = "127.0.0.1"):
+        self.host = host
+        self.port: Optional[int] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    def build_app(self) -> web.Application:
+        """Cria a aplicação aiohttp com as rotas do servidor"""
+        raise NotImplementedError
+
+    @property
+    def url(self) -> str:
+        """URL base do servidor"""
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        """Inicia o servidor em uma porta livre"""
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Encerra o servidor"""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+class FakeOllamaServer(FakeServer):
+    """
+    Ollama falso com taxa de tokens e latência configuráveis
+
+    Args:
+        token_rate: Tokens por segundo na geração
+        latency: Tempo de avaliação do prompt (segundos) antes do primeiro token
+        tokens: Quantidade de tokens por resposta
+        parallel: Gerações simultâneas (como OLLAMA_NUM_PARALLEL); o resto espera na fila
+        model: Nome do modelo anunciado em /api/tags e /api/ps
+        load_time: Tempo de carga de um modelo que ainda não está na memória (segundos)
+        preloaded: Se o modelo já começa carregado (aparece em /api/ps)
+        embed_latency: Tempo de cada requisição a /api/embed (segundos)
+        models: Outros modelos instalados (listados em /api/tags)
+        prompt_rate: Tokens/s na avaliação do prompt, somados à latência (0: só a latência)
+
+    Um /api/chat sem mensagens e com keep_alive=0 descarrega o modelo, como no Ollama.
+    """
+
+    def __init__(self, token_rate: float = 50.0, latency: float = 0.05, tokens: int = 40,
+                 parallel: int = 1, model: str = "llama3.2", host: str = "127.0.0.1",
+                 load_time: float = 0.0, preloaded: bool = True, embed_latency: float = 0.005,
+                 models: Sequence[str] = (), prompt_rate: float = 0.0):
+        super().__init__(host)
+        self.token_rate = token_rate
+        self.latency = latency
+        self.tokens = tokens
+        self.parallel = parallel
+        self.model = model
+        self.models = [model, *(name for name in models if name != model)]
+        self.prompt_rate = prompt_rate
+        self.load_time = load_time
+        self.loaded = {model} if preloaded else set()
+        # Status HTTP devolvido a todas as requisições (ex.: 503 para simular um host com falha)
+        self.fail_status: Optional[int] = None
+        self.embed_latency = embed_latency
+        self.requests = 0
+        self.embed_requests = 0
+        self.cancelled = 0
+        self.loads = 0
+        # Última mensagem de cada requisição, na ordem de chegada
+        self.prompts: List[str] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def build_app(self) -> web.Application:
+        self._slots = asyncio.Semaphore(self.parallel)
+        app = web.Application()
+        app.router.add_post("/api/chat", self._handle_chat)
+        app.router.add_get("/api/tags", self._handle_tags)
+        app.router.add_get("/api/ps", self._handle_ps)
+        app.router.add_post("/api/embed", self._handle_embed)
+        return app
+
+    def _model_entry(self, name: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "name": name or self.model,
+            "model": name or self.model,
+            "size": 2019393189,
+            "digest": "a80c4f17acd55265feec403c7aef86be0c25983ab279d83f3bcd3abbcb5b8b72",
+            "modified_at": "2026-09-01T12:00:00Z",
+            "details": {"format": "gguf", "family": "llama", "parameter_size": "3.2B",
+                        "quantization_level": "Q4_K_M"},
+        }
+
+    async def _handle_tags(self, request: web.Request) -> web.Response:
+        return web.json_response({"models": [self._model_entry(name) for name in self.models]})
+
+    async def _handle_ps(self, request: web.Request) -> web.Response:
+        if self.fail_status:
+            return web.json_response({"error": "indisponível"}, status=self.fail_status)
+        models = [self._model_entry(name) for name in sorted(self.loaded)]
+        for entry in models:
+            # Modelo inteiro na GPU
+            entry["size_vram"] = entry["size"]
+        return web.json_response({"models": models})
+
+    async def _handle_embed(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        self.embed_requests += 1
+        if self.fail_status:
+            return web.json_response({"error": "indisponível"}, status=self.fail_status)
+        inputs = body.get("input") or []
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        await asyncio.sleep(self.embed_latency)
+        return web.json_response({
+            "model": body.get("model") or self.model,
+            "embeddings": [fake_embedding(text) for text in inputs],
+            "total_duration": int(self.embed_latency * 1e9),
+            "prompt_eval_count": sum(len(text.split()) for text in inputs),
+        })
+
+    def _chunk(self, content: str, done: bool, **extra: Any) -> Dict[str, Any]:
+        chunk = {
+            "model": self.model,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "message": {"role": "assistant", "content": content},
+            "done": done,
+        }
+        chunk.update(extra)
+        return chunk
+
+    async def _handle_chat(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        self.requests += 1
+        if self.fail_status:
+            return web.json_response({"error": "indisponível"}, status=self.fail_status)
+        if not body.get("messages") and body.get("keep_alive") == 0:
+            self.loaded.discard(body.get("model") or self.model)
+            return web.json_response(self._chunk("", True, done_reason="unload"))
+        messages = body.get("messages") or [{}]
+        self.prompts.append(messages[-1].get("content", ""))
+        prompt_chars = sum(len(m.get("content", "")) for m in body.get("messages", []))
+        num_predict = (body.get("options") or {}).get("num_predict") or self.tokens
+        tokens = min(self.tokens, num_predict)
+
+        async with self._slots:
+            start = time.perf_counter()
+            load = 0.0
+            model = body.get("model") or self.model
+            if model not in self.loaded:
+                await asyncio.sleep(self.load_time)
+                self.loaded.add(model)
+                self.loads += 1
+                load = time.perf_counter() - start
+            await asyncio.sleep(self.latency + (prompt_chars // 4 / self.prompt_rate if self.prompt_rate else 0.0))
+            prompt_eval = time.perf_counter() - start - load
+            words = [_WORDS[i % len(_WORDS)] + " " for i in range(tokens)]
+            stats = dict(
+                done_reason="stop",
+                load_duration=int(load * 1e9),
+                prompt_eval_count=prompt_chars // 4,
+                prompt_eval_duration=int(prompt_eval * 1e9),
+                eval_count=tokens,
+            )
+
+            if not body.get("stream", True):
+                await asyncio.sleep(tokens / self.token_rate)
+                total = time.perf_counter() - start
+                return web.json_response(self._chunk(
+                    "".join(words), True, total_duration=int(total * 1e9),
+                    eval_duration=int((total - load - prompt_eval) * 1e9), **stats
+                ))
+
+            response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+            await response.prepare(request)
+            try:
+                # Envia os tokens em lotes de ~20 ms para não saturar o servidor falso
+                batch = max(1, int(self.token_rate * 0.02))
+                for i in range(0, tokens, batch):
+                    piece = words[i:i + batch]
+                    await asyncio.sleep(len(piece) / self.token_rate)
+                    await response.write((json.dumps(self._chunk("".join(piece), False)) + "\n").encode())
+                total = time.perf_counter() - start
+                final = self._chunk("", True, total_duration=int(total * 1e9),
+                                    eval_duration=int((total - load - prompt_eval) * 1e9), **stats)
+                await response.write((json.dumps(final) + "\n").encode())
+                await response.write_eof()
+            except ConnectionResetError:
+                # Cliente cancelou a geração (ex.: mensagem superada)
+                self.cancelled += 1
+            return response
+
+
+class FakeNewsServer(FakeServer):
+    """
+    Google News RSS, DuckDuckGo e portais servindo fixtures gravadas
+
+    Rotas:
+        /rss/search   -> fixtures/google_news_rss.xml
+        /ddg/         -> fixtures/duckduckgo.json
+        /sites/<nome>/ -> fixtures/<nome>.html
+
+    RSS e portais enviam ETag e respondem 304 a requisições condicionais.
+    """
+
+    def __init__(self, latency: float = 0.02, host: str = "127.0.0.1"):
+        super().__init__(host)
+        self.latency = latency
+        self.requests = 0
+        self.not_modified = 0
+        self._version = 0
+        self._rss = (FIXTURES_DIR / "google_news_rss.xml").read_bytes()
+        self._ddg = (FIXTURES_DIR / "duckduckgo.json").read_bytes()
+        self._sites = {path.stem: path.read_bytes() for path in FIXTURES_DIR.glob("*.html")}
+
+    def touch(self) -> None:
+        """Muda o ETag de todas as páginas sem mudar o conteúdo (força novo download)"""
+        self._version += 1
+
+    def _etag(self, body: bytes) -> str:
+        return f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}-{self._version}"'
+
+    def _conditional(self, request: web.Request, body: bytes, content_type: str) -> web.Response:
+        etag = self._etag(body)
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(body=body, content_type=content_type, charset="utf-8", headers={"ETag": etag})
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/rss/search", self._handle_rss)
+        app.router.add_get("/ddg/", self._handle_ddg)
+        app.router.add_get("/sites/{name}/", self._handle_site)
+        return app
+
+    @property
+    def rss_url(self) -> str:
+        return f"{self.url}/rss/search"
+
+    @property
+    def ddg_url(self) -> str:
+        return f"{self.url}/ddg/"
+
+    def site_url(self, name: str) -> str:
+        return f"{self.url}/sites/{name}/"
+
+    async def _delay(self) -> None:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def _handle_rss(self, request: web.Request) -> web.Response:
+        await self._delay()
+        return self._conditional(request, self._rss, "application/xml")
+
+    async def _handle_ddg(self, request: web.Request) -> web.Response:
+        await self._delay()
+        return web.Response(body=self._ddg, content_type="application/json", charset="utf-8")
+
+    async def _handle_site(self, request: web.Request) -> web.Response:
+        await self._delay()
+        content = self._sites.get(request.match_info["name"])
+        if content is None:
+            raise web.HTTPNotFound()
+        return self._conditional(request, content, "text/html")
+
+
+class FakeOpenWeatherServer(FakeServer):
+    """
+    API de clima atual da OpenWeather falsa (/data/2.5/weather)
+
+    Aceita lat/lon ou q=cidade,país. Os valores são determinísticos por
+    coordenada; cidades cujo nome contém "inexistente" retornam 404.
+    """
+
+    def __init__(self, latency: float = 0.02, host: str = "127.0.0.1"):
+        super().__init__(host)
+        self.latency = latency
+        self.requests = 0
+        self.queries: List[Dict[str, str]] = []
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/data/2.5/weather", self._handle_weather)
+        return app
+
+    @property
+    def weather_url(self) -> str:
+        return f"{self.url}/data/2.5/weather"
+
+    def _coords_for(self, name: str) -> Dict[str, float]:
+        digest = hashlib.blake2b(name.lower().encode(), digest_size=4).digest()
+        return {"lat": round(-33 + digest[0] / 255 * 38, 4), "lon": round(-73 + digest[1] / 255 * 39, 4)}
+
+    async def _handle_weather(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        query = dict(request.query)
+        self.queries.append(query)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if "q" in query:
+            name = query["q"].split(",")[0]
+            if "inexistente" in name.lower():
+                return web.json_response({"cod": "404", "message": "city not found"}, status=404)
+            coord = self._coords_for(name)
+        else:
+            coord = {"lat": float(query["lat"]), "lon": float(query["lon"])}
+            name = f"{coord['lat']:.2f},{coord['lon']:.2f}"
+
+        seed = int(abs(coord["lat"] * 100 + coord["lon"] * 10))
+        return web.json_response({
+            "coord": coord,
+            "weather": [{"id": 800, "main": "Clear", "description": ("céu limpo", "nublado", "chuva leve")[seed % 3]}],
+            "main": {"temp": 18 + seed % 15, "feels_like": 19 + seed % 15, "humidity": 50 + seed % 40},
+            "wind": {"speed": round(1 + seed % 7 * 0.8, 1)},
+            "name": name,
+            "cod": 200,
+        })
+
+
+def _balanced_markdown(text: str) -> bool:
+    """Aproximação da validação do Markdown legado: marcadores não escapados em pares"""
+    unescaped = re.sub(r"\\.", "", text)
+    return all(unescaped.count(marker) % 2 == 0 for marker in "*_`")
+
+
+class FakeTelegramServer(FakeServer):
+    """
+    Bot API do Telegram falsa: aceita qualquer método e registra os envios
+
+    Args:
+        flood_rate: Se definido, responde 429 (retry_after=1) acima dessa
+            quantidade de mensagens por segundo somando todos os chats
+        chat_interval: Se definido, responde 429 quando o mesmo chat recebe
+            mensagens com intervalo menor que esse (s)
+    """
+
+    def __init__(self, flood_rate: Optional[float] = None, chat_interval: Optional[float] = None,
+                 host: str = "127.0.0.1"):
+        super().__init__(host)
+        self.flood_rate = flood_rate
+        self.chat_interval = chat_interval
+        self.sent: List[Dict[str, Any]] = []
+        self.calls: Dict[str, int] = {}
+        self.flood_errors = 0
+        self.parse_errors = 0
+        self._message_id = 0
+        self._recent: List[float] = []
+        self._last_by_chat: Dict[int, float] = {}
+
+    def _flooded(self, chat_id: int) -> bool:
+        """Aplica os limites configurados (False quando a mensagem pode passar)"""
+        now = time.monotonic()
+        if self.flood_rate:
+            self._recent = [at for at in self._recent if now - at < 1.0]
+            if len(self._recent) >= self.flood_rate:
+                return True
+        # Tolerância de 50 ms para o agendamento do cliente
+        if self.chat_interval and now - self._last_by_chat.get(chat_id, -1e9) < self.chat_interval - 0.05:
+            return True
+        self._recent.append(now)
+        self._last_by_chat[chat_id] = now
+        return False
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route("*", "/bot{token}/{method}", self._handle_method)
+        return app
+
+    @property
+    def base_url(self) -> str:
+        """Valor para Application.builder().base_url()"""
+        return f"{self.url}/bot"
+
+    async def _params(self, request: web.Request) -> Dict[str, Any]:
+        if request.content_type == "application/json":
+            return await request.json()
+        data = await request.post()
+        return dict(data)
+
+    async def _handle_method(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = await self._params(request)
+        self.calls[method] = self.calls.get(method, 0) + 1
+
+        if method == "getMe":
+            result: Any = {"id": 1000, "is_bot": True, "first_name": "Pateta",
+                           "username": "pateta_bench_bot", "can_join_groups": True,
+                           "can_read_all_group_messages": False, "supports_inline_queries": False}
+        elif method in ("sendMessage", "editMessageText"):
+            chat_id = int(params.get("chat_id", 0))
+            if method == "sendMessage" and self._flooded(chat_id):
+                self.flood_errors += 1
+                return web.json_response({"ok": False, "error_code": 429,
+                                          "description": "Too Many Requests: retry after 1",
+                                          "parameters": {"retry_after": 1}}, status=429)
+            if params.get("parse_mode") == "Markdown" and not _balanced_markdown(params.get("text", "")):
+                self.parse_errors += 1
+                return web.json_response({"ok": False, "error_code": 400,
+                                          "description": "Bad Request: can't parse entities"}, status=400)
+            self._message_id += 1
+            self.sent.append({"chat_id": chat_id, "text": params.get("text", ""), "at": time.time()})
+            result = {"message_id": self._message_id, "date": int(time.time()),
+                      "chat": {"id": chat_id, "type": "private"}, "text": params.get("text", "")}
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+
+class StandIns:
+    """
+    Executa os servidores falsos em uma thread com event loop próprio
+
+    Assim o trabalho dos servidores não interfere na medição do event loop do bot.
+    """
+
+    def __init__(self, *servers: FakeServer):
+        self.servers = servers
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    def start(self) -> "StandIns":
+        self._thread.start()
+        for server in self.servers:
+            asyncio.run_coroutine_threadsafe(server.start(), self._loop).result()
+        return self
+
+    def stop(self) -> None:
+        for server in self.servers:
+            asyncio.run_coroutine_threadsafe(server.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def __enter__(self) -> "StandIns":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
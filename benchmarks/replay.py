@@ -0,0 +1,208 @@
+"""
+Replay de tráfego gravado contra o bot ligado aos servidores locais
+
+Lê um arquivo gravado com TRAFFIC_RECORD_PATH e reenvia os updates
+respeitando os intervalos originais, acelerados pelo fator --speed.
+Reporta a distribuição de latência (geral e por rota), o atraso em relação
+ao agendamento e o comportamento da fila de updates em andamento.
+
+Uso:
+    python -m benchmarks.replay trafego.jsonl --speed 10
+    python -m benchmarks.replay benchmarks/fixtures/traffic_sample.jsonl --speed 100
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from typing import Any, Dict, List
+
+from benchmarks.bench_e2e import BENCH_TOKEN, _monitor_loop_lag, configure_environment, make_update
+from benchmarks.common import run_metadata, save_results, summarize
+from benchmarks.fakes import (
+    FakeNewsServer, FakeOllamaServer, FakeOpenWeatherServer, FakeTelegramServer, StandIns
+)
+
+# Mensagens usadas quando o tráfego foi gravado sem texto (TRAFFIC_RECORD_TEXT=false)
+ROUTE_TEMPLATES = {
+    "news_tool": "quais as notícias de hoje?",
+    "sports_tool": "como foi o jogo do flamengo?",
+    "weather_tool": "como está o clima hoje?",
+    None: "oi pateta, tudo bem?",
+}
+
+
+def load_records(path: str, max_duration: float = 0.0) -> List[Dict[str, Any]]:
+    """Carrega o arquivo gravado ordenado por tempo"""
+    records = []
+    with open(path, encoding="utf-8") as traffic:
+        for line in traffic:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    records.sort(key=lambda record: record["t"])
+    if records and max_duration:
+        limit = records[0]["t"] + max_duration
+        records = [record for record in records if record["t"] <= limit]
+    return records
+
+
+def assign_ids(records: List[Dict[str, Any]]) -> None:
+    """Troca os hashes gravados por IDs numéricos estáveis (grupos negativos)"""
+    chats: Dict[str, int] = {}
+    users: Dict[str, int] = {}
+    for record in records:
+        if record["c"] not in chats:
+            index = len(chats) + 1
+            chats[record["c"]] = -1000000000000 - index if record.get("g") else index
+        record["chat_id"] = chats[record["c"]]
+        user = record.get("u", record["c"])
+        record["user_id"] = users.setdefault(user, 10 ** 6 + len(users))
+        record["text"] = record.get("x") or ROUTE_TEMPLATES.get(record.get("r"), ROUTE_TEMPLATES[None])
+
+
+async def replay(app, bot_main, records: List[Dict[str, Any]], speed: float) -> Dict[str, Any]:
+    """Reenvia os updates no ritmo gravado e coleta as medições"""
+    latencies: List[float] = []
+    by_route: Dict[str, List[float]] = {}
+    lateness: List[float] = []
+    in_flight_samples: List[int] = []
+    generation_samples: List[int] = []
+    lag_samples: List[float] = []
+    in_flight = 0
+
+    async def deliver(record: Dict[str, Any], update_id: int, scheduled: float) -> None:
+        nonlocal in_flight
+        lateness.append(max(0.0, time.perf_counter() - scheduled))
+        update = make_update(app.bot, update_id, record["chat_id"], record["text"],
+                             user_id=record["user_id"], group=bool(record.get("g")))
+        in_flight += 1
+        start = time.perf_counter()
+        try:
+            await app.process_update(update)
+        finally:
+            in_flight -= 1
+        elapsed = time.perf_counter() - start
+        latencies.append(elapsed)
+        by_route.setdefault(record.get("r") or "chat", []).append(elapsed)
+
+    async def sample_queue(stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            in_flight_samples.append(in_flight)
+            generation_samples.append(len(bot_main._inflight))
+            await asyncio.sleep(0.05)
+
+    stop = asyncio.Event()
+    monitors = [asyncio.create_task(_monitor_loop_lag(lag_samples, stop)),
+                asyncio.create_task(sample_queue(stop))]
+
+    t0 = records[0]["t"]
+    started = time.perf_counter()
+    tasks = []
+    for update_id, record in enumerate(records, 1):
+        scheduled = started + (record["t"] - t0) / speed
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(deliver(record, update_id, scheduled)))
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await asyncio.gather(*monitors)
+
+    return {
+        'elapsed': elapsed,
+        'updates': len(records),
+        'errors': sum(1 for result in results if isinstance(result, Exception)),
+        'recorded_span': records[-1]["t"] - t0,
+        'throughput_msgs_per_sec': len(records) / elapsed if elapsed else 0.0,
+        'latency': summarize(latencies),
+        'latency_by_route': {route: summarize(values) for route, values in by_route.items()},
+        'schedule_lateness': summarize(lateness),
+        'in_flight': summarize(in_flight_samples),
+        'inflight_generations': summarize(generation_samples),
+        'loop_lag': summarize(lag_samples),
+    }
+
+
+async def run(args: argparse.Namespace, records: List[Dict[str, Any]], telegram: FakeTelegramServer) -> Dict[str, Any]:
+    import main as bot_main
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    app = bot_main.build_application(BENCH_TOKEN, base_url=telegram.base_url)
+    await app.initialize()
+    try:
+        return await replay(app, bot_main, records, args.speed)
+    finally:
+        await app.shutdown()
+        await bot_main.tools_registry.cleanup()
+
+
+def print_report(results: Dict[str, Any], speed: float) -> None:
+    """Exibe o resumo no terminal"""
+    def ms(summary: Dict[str, float]) -> str:
+        return f"p50={summary['p50'] * 1000:.0f}ms p99={summary['p99'] * 1000:.0f}ms max={summary['max'] * 1000:.0f}ms"
+
+    print(f"\n🔁 Replay a {speed:g}x: {results['updates']} updates "
+          f"({results['recorded_span']:.0f}s gravados em {results['elapsed']:.1f}s)")
+    print(f"   Respostas enviadas: {results['replies']} | Erros: {results['errors']} | "
+          f"Gerações no LLM: {results['llm_requests']} ({results['llm_cancelled']} canceladas)")
+    print(f"   Latência: {ms(results['latency'])}")
+    for route, summary in sorted(results['latency_by_route'].items()):
+        print(f"     {route:<14} n={summary['count']:<5} {ms(summary)}")
+    print(f"   Atraso no agendamento: {ms(results['schedule_lateness'])}")
+    print(f"   Updates em andamento: p50={results['in_flight']['p50']:.0f} "
+          f"p99={results['in_flight']['p99']:.0f} max={results['in_flight']['max']:.0f}")
+    print(f"   Atraso do event loop: {ms(results['loop_lag'])}")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay de tráfego gravado do Pateta Bot")
+    parser.add_argument("traffic", help="Arquivo gravado com TRAFFIC_RECORD_PATH")
+    parser.add_argument("--speed", type=float, default=1.0, help="Fator de aceleração (1, 10, 100...)")
+    parser.add_argument("--max-duration", type=float, default=0.0,
+                        help="Usa apenas os primeiros N segundos gravados (0 = tudo)")
+    parser.add_argument("--token-rate", type=float, default=30.0, help="Tokens/s do Ollama falso")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Avaliação do prompt (s)")
+    parser.add_argument("--llm-tokens", type=int, default=60, help="Tokens por resposta")
+    parser.add_argument("--llm-parallel", type=int, default=1, help="Gerações simultâneas no Ollama falso")
+    parser.add_argument("--site-latency", type=float, default=0.1, help="Latência dos sites falsos (s)")
+    parser.add_argument("--output", default="benchmarks/results/replay.json", help="Arquivo JSON de saída")
+    parser.add_argument("--verbose", action="store_true", help="Mantém os logs INFO do bot")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    records = load_records(args.traffic, args.max_duration)
+    if not records:
+        print("Nenhum update no arquivo gravado")
+        return 1
+    assign_ids(records)
+
+    ollama = FakeOllamaServer(token_rate=args.token_rate, latency=args.llm_latency,
+                              tokens=args.llm_tokens, parallel=args.llm_parallel)
+    news = FakeNewsServer(latency=args.site_latency)
+    weather = FakeOpenWeatherServer(latency=args.site_latency)
+    telegram = FakeTelegramServer()
+
+    with StandIns(ollama, news, weather, telegram):
+        configure_environment(ollama, news, sorted({record["chat_id"] for record in records}), weather)
+        results = asyncio.run(run(args, records, telegram))
+        results['replies'] = len(telegram.sent)
+        results['llm_requests'] = ollama.requests
+        results['llm_cancelled'] = ollama.cancelled
+
+    results['config'] = {key: value for key, value in vars(args).items() if key not in ("output", "verbose")}
+    results['meta'] = run_metadata()
+    print_report(results, args.speed)
+    save_results(results, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
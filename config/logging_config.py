@@ -0,0 +1,198 @@
+"""
+Configuração de logging
+Aplica LOG_LEVEL e LOG_FORMAT (um formato do logging ou "json", com um
+objeto por linha) e, com LOG_ASYNC, tira a escrita do event loop: os
+registros entram numa fila limitada e uma thread os formata e grava.
+Cada registro leva o update_id e o chat_id do update em andamento, e as
+linhas abaixo de WARNING podem ser amostradas por logger
+(LOG_SAMPLE_RATES).
+"""
+
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from config.settings import LOG_ASYNC, LOG_FORMAT, LOG_LEVEL, LOG_QUEUE_SIZE, LOG_SAMPLE_RATES
+
+# Listener da fila (um por processo)
+_listener: Optional[QueueListener] = None
+# Argumentos que podem ser formatados depois, na thread do listener, sem risco de terem mudado
+_IMMUTABLE_ARGS = (str, int, float, bytes, type(None))
+
+
+def parse_sample_rates(text: str) -> Dict[str, float]:
+    """Converte "httpx=0.05,mcp.news_tool=0.5" em {logger: fração mantida}"""
+    rates = {}
+    for entry in text.split(","):
+        name, _, rate = entry.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+class UpdateContextFilter(logging.Filter):
+    """Anota o update e o chat em andamento (None fora de um update)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        from utils.tracing import current_trace
+
+        trace = current_trace()
+        record.update_id = trace.update_id if trace else None
+        record.chat_id = trace.chat_id if trace else None
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Mantém 1 a cada N registros abaixo de WARNING dos loggers configurados
+
+    Args:
+        rates: Fração mantida por logger; vale o nome mais específico
+            (ex.: "httpx" também cobre "httpx._client")
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        # logger -> manter 1 a cada N (0: descartar tudo)
+        self._every: Dict[str, int] = {}
+        self._seen: Dict[str, int] = {}
+
+    def _every_for(self, name: str) -> int:
+        every = self._every.get(name)
+        if every is None:
+            rate, prefix = 1.0, name
+            while True:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                if "." not in prefix:
+                    break
+                prefix = prefix.rsplit(".", 1)[0]
+            every = self._every[name] = max(1, round(1 / rate)) if rate > 0 else 0
+        return every
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        every = self._every_for(record.name)
+        if every == 1:
+            return True
+        if every == 0:
+            return False
+        seen = self._seen.get(record.name, 0)
+        self._seen[record.name] = seen + 1
+        return seen % every == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """Um objeto JSON por linha"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+        }
+        update_id = getattr(record, "update_id", None)
+        if update_id is not None:
+            entry['update_id'] = update_id
+        chat_id = getattr(record, "chat_id", None)
+        if chat_id is not None:
+            entry['chat_id'] = chat_id
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """Enfileira sem formatar quando possível: a mensagem é montada na thread do listener"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if (isinstance(record.msg, str) and not record.exc_info
+                and (not args or isinstance(args, tuple) and all(isinstance(arg, _IMMUTABLE_ARGS) for arg in args))):
+            # Só escalares imutáveis: seguem como estão (sem cópia nem pré-formatação)
+            return record
+        # Listas, dicts e objetos podem mudar até o listener formatar: a mensagem é montada agora
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Fila cheia: descarta em vez de bloquear o event loop
+            from utils.metrics import metrics
+
+            metrics.counter("log_records_dropped_total").inc()
+
+
+def build_formatter(fmt: str) -> logging.Formatter:
+    return JsonFormatter() if fmt.strip().lower() == "json" else logging.Formatter(fmt)
+
+
+def setup_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT, use_queue: bool = LOG_ASYNC,
+                  queue_size: int = LOG_QUEUE_SIZE, sample_rates: str = LOG_SAMPLE_RATES,
+                  stream=None) -> logging.Handler:
+    """
+    Configura o logger raiz (chamadas seguintes substituem a configuração anterior)
+
+    Args:
+        level: Nível mínimo (ex.: INFO, DEBUG)
+        fmt: Formato do logging ou "json"
+        use_queue: Grava numa thread separada, por uma fila limitada
+        queue_size: Registros na fila antes de começar a descartar
+        sample_rates: Amostragem por logger (ex.: "httpx=0.05")
+        stream: Destino (padrão: stderr)
+
+    Returns:
+        Handler instalado no logger raiz
+    """
+    shutdown_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(build_formatter(fmt))
+    if use_queue:
+        handler: logging.Handler = _NonBlockingQueueHandler(queue.Queue(queue_size))
+        global _listener
+        _listener = QueueListener(handler.queue, output, respect_handler_level=True)
+        _listener.start()
+    else:
+        handler = output
+    # Filtros no handler do processo que registra: o contexto do update só existe nele
+    handler.addFilter(UpdateContextFilter())
+    handler.addFilter(SamplingFilter(parse_sample_rates(sample_rates)))
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+    return handler
+
+
+def shutdown_logging() -> None:
+    """Grava os registros pendentes e para a thread do listener"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -12,23 +12,63 @@ load_dotenv()
 # Configurações do Bot
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 ALLOWED_CHAT_IDS: Set[str] = {cid.strip() for cid in os.getenv("ALLOWED_CHAT_IDS", "").split(",") if cid.strip()}
+ADMIN_USER_IDS: Set[str] = {uid.strip() for uid in os.getenv("ADMIN_USER_IDS", "").split(",") if uid.strip()}
 
 # Configurações do Ollama
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2")
 OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+# Pool de servidores: lista separada por vírgulas (vazio: só OLLAMA_HOST)
+OLLAMA_HOSTS = [host.strip() for host in os.getenv("OLLAMA_HOSTS", "").split(",") if host.strip()] or [OLLAMA_HOST]
+OLLAMA_HEALTH_INTERVAL = float(os.getenv("OLLAMA_HEALTH_INTERVAL", "15"))  # segundos; 0 desativa
+OLLAMA_AFFINITY_SLACK = int(os.getenv("OLLAMA_AFFINITY_SLACK", "2"))  # requisições a mais num host com o modelo carregado
+OLLAMA_NUM_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", "1"))  # gerações simultâneas por servidor
+# Opções de geração (compare modelos e valores com benchmarks/bench_models.py)
+OLLAMA_TEMPERATURE = float(os.getenv("OLLAMA_TEMPERATURE", "0.2"))
+OLLAMA_NUM_PREDICT = int(os.getenv("OLLAMA_NUM_PREDICT", "800"))  # máximo de tokens por resposta
+OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "0"))  # janela de contexto; 0 usa a do modelo
+
+# Memória de conversa por chat (trocas recentes + resumo das antigas)
+CHAT_MEMORY_TURNS = int(os.getenv("CHAT_MEMORY_TURNS", "6"))  # trocas por chat; 0 desativa
+CHAT_MEMORY_TOKENS = int(os.getenv("CHAT_MEMORY_TOKENS", "1500"))  # tokens estimados das trocas por chat
+CHAT_MEMORY_MAX_CHATS = int(os.getenv("CHAT_MEMORY_MAX_CHATS", "1000"))  # chats em memória (LRU)
+CHAT_MEMORY_SUMMARY_TOKENS = int(os.getenv("CHAT_MEMORY_SUMMARY_TOKENS", "200"))  # tamanho máximo do resumo
+
+# Roteamento de intenção por embeddings dos exemplos do manifesto (palavras-chave como fallback)
+INTENT_ROUTER = os.getenv("INTENT_ROUTER", "true").lower() == "true"
+OLLAMA_EMBED_MODEL = os.getenv("OLLAMA_EMBED_MODEL", "nomic-embed-text")
+INTENT_CACHE_PATH = os.getenv("INTENT_CACHE_PATH", ".cache/intent_vectors.npz")  # vetores dos exemplos
+INTENT_THRESHOLD = float(os.getenv("INTENT_THRESHOLD", "0.5"))  # similaridade mínima; abaixo usa palavras-chave
+INTENT_LRU_SIZE = int(os.getenv("INTENT_LRU_SIZE", "2048"))  # embeddings de mensagens mantidos em memória
+INTENT_EMBED_TIMEOUT = float(os.getenv("INTENT_EMBED_TIMEOUT", "2"))  # segundos por mensagem
+INTENT_RETRY_INTERVAL = float(os.getenv("INTENT_RETRY_INTERVAL", "300"))  # nova tentativa após falha
+
+# Degradação sob carga: acima da espera estimada na fila do LLM, respostas sem o modelo
+LLM_QUEUE_SLO = float(os.getenv("LLM_QUEUE_SLO", "15"))  # segundos; 0 desativa
+LLM_SHED_RESUME_RATIO = float(os.getenv("LLM_SHED_RESUME_RATIO", "0.5"))  # volta ao normal abaixo de SLO x razão
 
 # Configurações de Cache
 CACHE_TTL_NEWS = int(os.getenv("CACHE_TTL_NEWS", "3600"))  # 1 hora
 CACHE_TTL_SPORTS = int(os.getenv("CACHE_TTL_SPORTS", "1800"))  # 30 minutos
 CACHE_TTL_WEATHER = int(os.getenv("CACHE_TTL_WEATHER", "900"))  # 15 minutos
+TOOL_CACHE_PATH = os.getenv("TOOL_CACHE_PATH", "")  # SQLite compartilhado entre processos (vazio: só memória)
+
+# Modo multiprocesso: updates distribuídos por chat entre N workers (1 = processo único)
+BOT_WORKERS = int(os.getenv("BOT_WORKERS", "1"))
 
 # Configurações de Rate Limiting
 RATE_LIMIT_PER_MINUTE = int(os.getenv("RATE_LIMIT_PER_MINUTE", "1"))
 REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "10"))
 
+# Configurações de Deadline por update
+UPDATE_DEADLINE = float(os.getenv("UPDATE_DEADLINE", "60"))  # segundos por mensagem
+CANCEL_SUPERSEDED = os.getenv("CANCEL_SUPERSEDED", "true").lower() == "true"  # por usuário em cada chat
+
 # Configurações de Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-LOG_FORMAT = os.getenv("LOG_FORMAT", "%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "%(asctime)s - %(name)s - %(levelname)s - %(message)s")  # ou "json"
+LOG_ASYNC = os.getenv("LOG_ASYNC", "true").lower() == "true"  # grava numa thread, fora do event loop
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # registros na fila antes de descartar
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "httpx=0.05")  # fração mantida abaixo de WARNING, por logger
 
 # Configurações de APIs
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY", "")
@@ -40,27 +80,51 @@ DEFAULT_COUNTRY = os.getenv("DEFAULT_COUNTRY", "BR")
 
 # Configurações de Times Favoritos
 FAVORITE_TEAMS = os.getenv("FAVORITE_TEAMS", "flamengo,vasco,fluminense,botafogo").split(",")
+SPORTS_POLL_INTERVAL = int(os.getenv("SPORTS_POLL_INTERVAL", "300"))  # segundos; 0 atualiza só sob demanda
+SPORTS_ITEMS_PER_TEAM = int(os.getenv("SPORTS_ITEMS_PER_TEAM", "50"))
+
+# Índice local de notícias (carga em segundo plano dos feeds e de NEWS_SITES)
+NEWS_FEEDS = [feed.strip() for feed in os.getenv("NEWS_FEEDS", "").split(",") if feed.strip()] or [
+    "https://news.google.com/rss?hl=pt-BR&gl=BR&ceid=BR:pt-419",
+    "https://g1.globo.com/rss/g1/"
+]
+NEWS_INGEST_INTERVAL = int(os.getenv("NEWS_INGEST_INTERVAL", "600"))  # segundos; 0 desativa o índice
+NEWS_INDEX_MAX_ITEMS = int(os.getenv("NEWS_INDEX_MAX_ITEMS", "5000"))
+NEWS_INDEX_MAX_AGE_HOURS = float(os.getenv("NEWS_INDEX_MAX_AGE_HOURS", "48"))
+NEWS_DEDUP_THRESHOLD = float(os.getenv("NEWS_DEDUP_THRESHOLD", "0.6"))  # similaridade (0-1) para agrupar títulos
 
 # Configurações de Resumo Matinal
 MORNING_NEWS_ENABLED = os.getenv("MORNING_NEWS_ENABLED", "true").lower() == "true"
 MORNING_NEWS_TIME = os.getenv("MORNING_NEWS_TIME", "08:00")
 MORNING_NEWS_TOPICS = os.getenv("MORNING_NEWS_TOPICS", "notícias,esportes,clima").split(",")
+MORNING_NEWS_TIMEZONE = os.getenv("MORNING_NEWS_TIMEZONE", "America/Sao_Paulo")
+MORNING_NEWS_LEAD_MINUTES = int(os.getenv("MORNING_NEWS_LEAD_MINUTES", "10"))  # preparo antecipado
+MORNING_NEWS_BUDGET = float(os.getenv("MORNING_NEWS_BUDGET", "240"))  # segundos para buscar e resumir
+MORNING_NEWS_ITEMS = int(os.getenv("MORNING_NEWS_ITEMS", "5"))  # itens por tópico enviados ao resumo
 
 # Configurações de Web Scraping
 USER_AGENT = os.getenv("USER_AGENT", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
 MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
+RSS_PARSER = os.getenv("RSS_PARSER", "bs4-xml")  # bs4-xml, lxml ou streaming
+HTML_PARSER = os.getenv("HTML_PARSER", "html.parser")  # html.parser, lxml ou streaming
 
 # Configurações de Segurança
 MAX_MESSAGE_LENGTH = int(os.getenv("MAX_MESSAGE_LENGTH", "4096"))
 MAX_TOOL_EXECUTIONS_PER_MINUTE = int(os.getenv("MAX_TOOL_EXECUTIONS_PER_MINUTE", "5"))
 
-# URLs de APIs e Sites
-GOOGLE_NEWS_RSS_BASE = "https://news.google.com/rss/search"
-DUCKDUCKGO_API_URL = "https://api.duckduckgo.com/"
-OPENWEATHER_API_URL = "https://api.openweathermap.org/data/2.5/weather"
+# Limites de envio ao Telegram (abaixo dos ~30 msg/s globais, 1 msg/s por chat e 20 msg/min por grupo)
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "25"))
+TELEGRAM_CHAT_INTERVAL = float(os.getenv("TELEGRAM_CHAT_INTERVAL", "1.0"))
+TELEGRAM_GROUP_INTERVAL = float(os.getenv("TELEGRAM_GROUP_INTERVAL", "3.0"))
+
+# URLs de APIs e Sites (sobrescrevíveis para apontar para servidores locais em benchmarks)
+GOOGLE_NEWS_RSS_BASE = os.getenv("GOOGLE_NEWS_RSS_BASE", "https://news.google.com/rss/search")
+DUCKDUCKGO_API_URL = os.getenv("DUCKDUCKGO_API_URL", "https://api.duckduckgo.com/")
+OPENWEATHER_API_URL = os.getenv("OPENWEATHER_API_URL", "https://api.openweathermap.org/data/2.5/weather")
+WEATHER_COORD_PRECISION = int(os.getenv("WEATHER_COORD_PRECISION", "1"))  # casas decimais (~11 km)
 
 # Sites de notícias para scraping
-NEWS_SITES = [
+NEWS_SITES = [site.strip() for site in os.getenv("NEWS_SITES", "").split(",") if site.strip()] or [
     "https://g1.globo.com/",
     "https://www.uol.com.br/",
     "https://www.terra.com.br/",
@@ -69,13 +133,16 @@ NEWS_SITES = [
 ]
 
 # Sites esportivos
-SPORTS_SITES = [
+SPORTS_SITES = [site.strip() for site in os.getenv("SPORTS_SITES", "").split(",") if site.strip()] or [
     "https://ge.globo.com/",
     "https://www.lance.com.br/",
     "https://www.espn.com.br/",
     "https://www.uol.com.br/esporte/"
 ]
 
+# Manifesto de ferramentas MCP (carregadas sob demanda)
+TOOLS_MANIFEST = os.getenv("TOOLS_MANIFEST", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mcp", "tools_manifest.json"))
+
 # Validações
 def validate_config():
     """Valida as configurações obrigatórias"""
@@ -85,6 +152,9 @@ def validate_config():
     if not ALLOWED_CHAT_IDS:
         print("⚠️  AVISO: ALLOWED_CHAT_IDS está vazio. Adicione IDs de chat permitidos.")
     
+    if TRAFFIC_RECORD_PATH and len(TRAFFIC_RECORD_SALT) < 16:
+        raise ValueError("TRAFFIC_RECORD_SALT (16+ caracteres) é obrigatório com TRAFFIC_RECORD_PATH")
+    
     return True
 
 # Configurações de desenvolvimento
@@ -94,3 +164,19 @@ TESTING = os.getenv("TESTING", "false").lower() == "true"
 # Configurações de monitoramento
 ENABLE_METRICS = os.getenv("ENABLE_METRICS", "true").lower() == "true"
 METRICS_INTERVAL = int(os.getenv("METRICS_INTERVAL", "300"))  # 5 minutos
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))  # 0 desativa o endpoint HTTP
+TRACE_WINDOW = int(os.getenv("TRACE_WINDOW", "512"))  # amostras por etapa para percentis
+SLOW_UPDATE_THRESHOLD = float(os.getenv("SLOW_UPDATE_THRESHOLD", "5"))  # segundos
+SLOW_UPDATES_KEPT = int(os.getenv("SLOW_UPDATES_KEPT", "50"))
+
+# Diagnóstico em produção (/profile, /memsnap e /loop, somente administradores)
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))  # duração máxima do /profile
+PROFILE_TOP = int(os.getenv("PROFILE_TOP", "15"))  # linhas por relatório
+TRACEMALLOC_FRAMES = int(os.getenv("TRACEMALLOC_FRAMES", "1"))  # quadros da pilha por alocação
+TRACEMALLOC_MAX_SECONDS = float(os.getenv("TRACEMALLOC_MAX_SECONDS", "1800"))  # desliga sozinho (0: nunca)
+
+# Gravação de tráfego para replay (vazio desativa)
+TRAFFIC_RECORD_PATH = os.getenv("TRAFFIC_RECORD_PATH", "")
+TRAFFIC_RECORD_TEXT = os.getenv("TRAFFIC_RECORD_TEXT", "false").lower() == "true"  # padrão: só tamanho e rota
+TRAFFIC_RECORD_SALT = os.getenv("TRAFFIC_RECORD_SALT", "")  # obrigatório com TRAFFIC_RECORD_PATH (16+ caracteres)
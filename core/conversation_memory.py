@@ -0,0 +1,155 @@
+"""
+Memória de conversa por chat
+Cada chat guarda as últimas trocas (pergunta e resposta) num buffer
+limitado por quantidade de trocas e por tokens estimados. As trocas que
+saem do buffer são condensadas num resumo, atualizado em segundo plano
+fora do caminho da resposta. Chats ociosos saem por LRU, então a memória
+total fica limitada qualquer que seja a quantidade de chats.
+"""
+
+import asyncio
+import contextvars
+import logging
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from config.settings import CHAT_MEMORY_MAX_CHATS, CHAT_MEMORY_SUMMARY_TOKENS, CHAT_MEMORY_TOKENS, CHAT_MEMORY_TURNS
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# (pergunta, resposta, tokens estimados)
+Turn = Tuple[str, str, int]
+# Recebe o resumo anterior e as trocas a incorporar; None adia a atualização
+Summarizer = Callable[[str, List[Turn]], Awaitable[Optional[str]]]
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa de tokens (~4 caracteres por token em português)"""
+    return len(text) // 4 + 1
+
+
+class ChatMemory:
+    """Histórico de um chat: trocas recentes, resumo e trocas aguardando o resumo"""
+
+    __slots__ = ("turns", "tokens", "summary", "pending", "summarizing")
+
+    def __init__(self):
+        self.turns: Deque[Turn] = deque()
+        self.tokens = 0
+        self.summary = ""
+        self.pending: List[Turn] = []
+        self.summarizing = False
+
+
+class ConversationMemory:
+    """
+    Memória das conversas com LRU de chats
+
+    Args:
+        summarizer: Função que atualiza o resumo (opcional; sem ela as trocas antigas são descartadas)
+        max_turns: Trocas mantidas por chat (0 desativa a memória)
+        max_tokens: Tokens estimados das trocas mantidas por chat
+        max_chats: Chats mantidos em memória (os ociosos há mais tempo saem primeiro)
+        summary_tokens: Tamanho máximo do resumo em tokens estimados
+    """
+
+    def __init__(self, summarizer: Optional[Summarizer] = None, max_turns: int = CHAT_MEMORY_TURNS,
+                 max_tokens: int = CHAT_MEMORY_TOKENS, max_chats: int = CHAT_MEMORY_MAX_CHATS,
+                 summary_tokens: int = CHAT_MEMORY_SUMMARY_TOKENS):
+        self.summarizer = summarizer
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self.max_chats = max_chats
+        self.summary_tokens = summary_tokens
+        self._chats: "OrderedDict[int, ChatMemory]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_turns > 0 and self.max_chats > 0
+
+    def __len__(self) -> int:
+        return len(self._chats)
+
+    def messages(self, chat_id: int) -> List[Dict[str, str]]:
+        """Resumo e trocas recentes do chat no formato de mensagens do Ollama"""
+        memory = self._chats.get(chat_id)
+        if memory is None:
+            return []
+        self._chats.move_to_end(chat_id)
+        messages = []
+        if memory.summary:
+            messages.append({"role": "system", "content": f"Resumo da conversa até aqui: {memory.summary}"})
+        for question, answer, _ in memory.turns:
+            messages.append({"role": "user", "content": question})
+            messages.append({"role": "assistant", "content": answer})
+        return messages
+
+    def append(self, chat_id: int, question: str, answer: str) -> None:
+        """Registra uma troca; as mais antigas que excederem os limites vão para o resumo"""
+        if not self.enabled:
+            return
+        memory = self._chats.get(chat_id)
+        if memory is None:
+            memory = self._chats[chat_id] = ChatMemory()
+            while len(self._chats) > self.max_chats:
+                self._chats.popitem(last=False)
+                metrics.counter("chat_memory_evictions_total").inc()
+        else:
+            self._chats.move_to_end(chat_id)
+
+        tokens = estimate_tokens(question) + estimate_tokens(answer)
+        memory.turns.append((question, answer, tokens))
+        memory.tokens += tokens
+        while memory.turns and (len(memory.turns) > self.max_turns or memory.tokens > self.max_tokens):
+            old = memory.turns.popleft()
+            memory.tokens -= old[2]
+            memory.pending.append(old)
+        if memory.pending:
+            self._compact(chat_id, memory)
+        metrics.gauge("chat_memory_chats").set(len(self._chats))
+
+    def _compact(self, chat_id: int, memory: ChatMemory) -> None:
+        if self.summarizer is None:
+            memory.pending.clear()
+            return
+        # Trocas esperando um resumo adiado também são limitadas
+        if len(memory.pending) > self.max_turns:
+            del memory.pending[:len(memory.pending) - self.max_turns]
+        if memory.summarizing:
+            return
+        memory.summarizing = True
+        # Contexto vazio: o resumo não herda o deadline nem o trace do update que o disparou
+        contextvars.Context().run(asyncio.ensure_future, self._summarize(chat_id, memory))
+
+    async def _summarize(self, chat_id: int, memory: ChatMemory) -> None:
+        try:
+            while memory.pending:
+                turns, memory.pending = memory.pending, []
+                try:
+                    with metrics.timer("chat_memory_summary_seconds"):
+                        summary = await self.summarizer(memory.summary, turns)
+                except Exception as e:
+                    logger.warning(f"Erro ao resumir a conversa do chat {chat_id}: {e}")
+                    summary = None
+                if summary is None:
+                    # Adiado (ex.: LLM sobrecarregado): as trocas esperam a próxima compactação
+                    memory.pending[:0] = turns
+                    return
+                memory.summary = summary.strip()[:self.summary_tokens * 4]
+                metrics.counter("chat_memory_summaries_total").inc()
+        finally:
+            memory.summarizing = False
+
+    def forget(self, chat_id: int) -> None:
+        """Apaga a memória de um chat"""
+        self._chats.pop(chat_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Chats em memória e tamanho total das trocas guardadas"""
+        return {
+            'chats': len(self._chats),
+            'turns': sum(len(memory.turns) for memory in self._chats.values()),
+            'tokens': sum(memory.tokens for memory in self._chats.values()),
+            'summaries': sum(1 for memory in self._chats.values() if memory.summary),
+        }
@@ -0,0 +1,93 @@
+"""
+Degradação sob carga
+Quando a espera estimada na fila do Ollama passa do SLO (LLM_QUEUE_SLO),
+perguntas atendidas por ferramentas recebem o resultado formatado por
+um template e o papo livre recebe uma resposta curta pronta. As respostas
+completas voltam quando a espera cai abaixo de SLO x LLM_SHED_RESUME_RATIO.
+"""
+
+import logging
+import random
+
+from config.settings import LLM_QUEUE_SLO, LLM_SHED_RESUME_RATIO
+from core.ollama_pool import OllamaPool, ollama_pool
+from mcp.tool_result import ToolResult, render_plain
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Respostas para papo livre enquanto o modelo está sobrecarregado
+CANNED_REPLIES = (
+    "Gawrsh! Meus circuitos estão lotados agora, me chama daqui a pouquinho! :-)",
+    "Hmm, tem muita gente falando comigo ao mesmo tempo. Tenta de novo em alguns instantes!",
+    "Estou processando a nave inteira neste momento... já já eu volto a conversar direito!",
+)
+
+# Cabeçalho dos templates por ferramenta
+TOOL_HEADERS = {
+    'news_tool': "📰 Últimas notícias:",
+    'sports_tool': "⚽ Notícias de esporte:",
+    'weather_tool': "🌤️ Clima agora:",
+}
+
+
+def templated_reply(tool_name: str, tool_result: ToolResult, limit: int = 5) -> str:
+    """Resposta em texto simples montada direto do resultado da ferramenta"""
+    if not tool_result.success or not tool_result.items:
+        return "Gawrsh! Não consegui encontrar nada sobre isso agora!"
+    return render_plain(tool_result, TOOL_HEADERS.get(tool_name, "🔎 Encontrei isto:"), limit,
+                        with_source=tool_name != 'weather_tool')
+
+
+def canned_reply() -> str:
+    """Resposta curta para papo livre"""
+    return random.choice(CANNED_REPLIES)
+
+
+class LoadShedder:
+    """
+    Decide se as respostas passam pelo LLM ou são degradadas
+
+    Args:
+        pool: Pool cujos servidores fornecem a espera estimada
+        slo: Espera máxima aceitável na fila do LLM em segundos (0 desativa)
+        resume_ratio: Fração do SLO abaixo da qual as respostas completas voltam
+    """
+
+    def __init__(self, pool: OllamaPool = ollama_pool, slo: float = LLM_QUEUE_SLO,
+                 resume_ratio: float = LLM_SHED_RESUME_RATIO):
+        self.pool = pool
+        self.slo = slo
+        self.resume_ratio = resume_ratio
+        self.shedding = False
+
+    def overloaded(self) -> bool:
+        """Atualiza o estado pela espera estimada atual e informa se deve degradar"""
+        if self.slo <= 0:
+            return False
+        wait = self.pool.estimated_wait()
+        if wait is None:
+            # Nenhum servidor saudável não é sobrecarga: as requisições seguem e servem de sondagem
+            if self.shedding:
+                self.shedding = False
+                logger.info("Nenhum servidor Ollama saudável; respostas completas retomadas para sondar os hosts")
+            metrics.gauge("llm_shedding").set(0)
+            return False
+        metrics.gauge("llm_queue_wait_estimate_seconds").set(wait)
+        # Histerese: entra acima do SLO e só sai bem abaixo dele, sem alternar a cada mensagem
+        if not self.shedding and wait > self.slo:
+            self.shedding = True
+            logger.warning(f"LLM sobrecarregado (espera estimada {wait:.1f}s > {self.slo:.1f}s); degradando respostas")
+        elif self.shedding and wait <= self.slo * self.resume_ratio:
+            self.shedding = False
+            logger.info(f"Fila do LLM normalizada (espera estimada {wait:.1f}s); respostas completas retomadas")
+        metrics.gauge("llm_shedding").set(1 if self.shedding else 0)
+        return self.shedding
+
+    def record(self, decision: str) -> None:
+        """Conta a decisão: full, templated ou canned"""
+        metrics.counter("llm_shed_decisions_total", decision=decision).inc()
+
+
+# Instância global
+load_shedder = LoadShedder()
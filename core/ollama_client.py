@@ -3,20 +3,55 @@ Cliente Ollama integrado com MCP
 Gerencia comunicação com Ollama e execução de ferramentas
 """
 
+import asyncio
+import contextlib
 import logging
 import json
-from typing import Any, Dict, List, Optional
-import ollama
+import time
+import weakref
+from typing import Any, AsyncIterator, Dict, List, Optional
+from config.settings import OLLAMA_MODEL, OLLAMA_NUM_CTX, OLLAMA_NUM_PREDICT, OLLAMA_TEMPERATURE
+from core.conversation_memory import ConversationMemory, Turn
+from core.load_shedder import LoadShedder, canned_reply, load_shedder, templated_reply
+from core.ollama_pool import OllamaPool, ollama_pool
+from mcp.tool_result import ToolResult, render_prompt
 from mcp.tools_registry import tools_registry
+from utils.deadline import Deadline, deadline_scope, remaining_timeout
+from utils.metrics import metrics
+from utils.tracing import record_span, span
 
 logger = logging.getLogger(__name__)
 
+# Contagens e durações (nanossegundos) do último trecho de uma geração
+OLLAMA_TIMINGS = ("load_duration", "prompt_eval_count", "prompt_eval_duration", "eval_count", "eval_duration")
+
+
+def default_options() -> Dict[str, Any]:
+    """Opções de geração configuradas (num_ctx só quando definido)"""
+    options: Dict[str, Any] = {"temperature": OLLAMA_TEMPERATURE, "num_predict": OLLAMA_NUM_PREDICT}
+    if OLLAMA_NUM_CTX:
+        options["num_ctx"] = OLLAMA_NUM_CTX
+    return options
+
+
+def context_prompt(message: str, context: str) -> str:
+    """Pergunta acompanhada do resultado de uma ferramenta"""
+    return f"{message}\n\nContexto das informações:\n{context}\n\nResponda como Pateta usando essas informações:"
+
 
 class OllamaClient:
     """Cliente Ollama com integração MCP"""
     
-    def __init__(self, model: str = "llama3.2"):
+    def __init__(self, model: str = OLLAMA_MODEL, pool: OllamaPool = ollama_pool,
+                 shedder: LoadShedder = load_shedder, memory: Optional[ConversationMemory] = None,
+                 options: Optional[Dict[str, Any]] = None):
         self.model = model
+        self.options = options if options is not None else default_options()
+        self.pool = pool
+        self.shedder = shedder
+        self.memory = memory or ConversationMemory(self._summarize_turns)
+        # Vez de cada chat (a trava some quando o chat não tem mensagem pendente)
+        self._turns: "weakref.WeakValueDictionary[int, asyncio.Lock]" = weakref.WeakValueDictionary()
         self.system_prompt = self._build_system_prompt()
         
     def _build_system_prompt(self) -> str:
@@ -58,43 +93,93 @@ Lembre-se: Você é o Pateta! Seja engraçado, desajeitado mas sempre prestativo
         tools_desc = tools_registry.get_tool_descriptions()
         return base_prompt.format(tools_description=tools_desc)
         
-    async def chat(self, message: str, user: Optional[str] = None) -> str:
+    async def chat(self, message: str, user: Optional[str] = None,
+                   deadline: Optional[Deadline] = None, chat_id: Optional[int] = None) -> str:
         """
         Processa uma mensagem do usuário com integração MCP
         
         Args:
             message: Mensagem do usuário
             user: Nome do usuário (opcional)
+            deadline: Orçamento de tempo do update (opcional)
+            chat_id: Chat da conversa (opcional; sem ele a mensagem não usa nem alimenta a memória)
             
         Returns:
             Resposta do Pateta
         """
         try:
-            logger.info(f"Processando mensagem: {message[:50]}...")
+            logger.debug("Processando mensagem: %.50s...", message)
             
-            # Detectar se precisa de ferramenta
-            tool_info = tools_registry.detect_tool_needed(message)
-            
-            if tool_info:
-                # Executar ferramenta
-                result = await self._execute_tool_and_respond(message, tool_info, user)
-            else:
-                # Resposta normal sem ferramenta
-                result = await self._simple_chat(message, user)
-                
-            return result
+            with deadline_scope(deadline):
+                async with self._turn(chat_id, deadline):
+                    return await self._respond(message, user, chat_id)
             
         except Exception as e:
             logger.error(f"Erro no chat: {e}")
             return "Gawrsh! Algo deu errado aqui! Tente novamente mais tarde!"
             
-    async def _execute_tool_and_respond(self, message: str, tool_info: Dict[str, Any], user: Optional[str] = None) -> str:
+    @contextlib.asynccontextmanager
+    async def _turn(self, chat_id: Optional[int], deadline: Optional[Deadline]) -> AsyncIterator[None]:
+        """
+        Vez do chat: as mensagens de um chat são respondidas uma de cada vez
+        
+        Mantém a ordem de chegada até o modelo (o roteamento e o cliente HTTP
+        podem inverter duas mensagens concorrentes) e garante que cada
+        pergunta veja a resposta anterior na memória da conversa. A espera
+        vira o span chat_turn_wait e não consome o orçamento do update.
+        """
+        if chat_id is None:
+            yield
+            return
+        lock = self._turns.get(chat_id)
+        if lock is None:
+            lock = self._turns[chat_id] = asyncio.Lock()
+        start = time.monotonic()
+        with span("chat_turn_wait"):
+            await lock.acquire()
+        try:
+            if deadline is not None:
+                deadline.extend(time.monotonic() - start)
+            yield
+        finally:
+            lock.release()
+            
+    async def _respond(self, message: str, user: Optional[str], chat_id: Optional[int]) -> str:
+        # Detectar se precisa de ferramenta
+        with span("intent"):
+            tool_info = await tools_registry.route(message)
+        
+        if self.shedder.overloaded():
+            # Fila do LLM acima do SLO: responde sem o modelo
+            return await self._degraded_reply(tool_info)
+        self.shedder.record("full")
+        
+        if tool_info:
+            # Executar ferramenta
+            return await self._execute_tool_and_respond(message, tool_info, user, chat_id)
+        # Resposta normal sem ferramenta
+        return await self._simple_chat(message, user, chat_id)
+            
+    async def _degraded_reply(self, tool_info: Optional[Dict[str, Any]]) -> str:
+        """Resposta sem o LLM: resultado da ferramenta por template ou resposta pronta"""
+        if tool_info:
+            try:
+                tool_result = await tools_registry.execute_tool(tool_info['tool'], tool_info['params'])
+                self.shedder.record("templated")
+                return templated_reply(tool_info['tool'], tool_result)
+            except Exception as e:
+                logger.error(f"Erro ao executar ferramenta sob sobrecarga: {e}")
+        self.shedder.record("canned")
+        return canned_reply()
+            
+    async def _execute_tool_and_respond(self, message: str, tool_info: Dict[str, Any], user: Optional[str] = None,
+                                        chat_id: Optional[int] = None) -> str:
         """Executa ferramenta e gera resposta contextualizada"""
         try:
             tool_name = tool_info['tool']
             params = tool_info['params']
             
-            logger.info(f"Executando ferramenta: {tool_name} com parâmetros: {params}")
+            logger.info("Executando ferramenta: %s com parâmetros: %s", tool_name, params)
             
             # Executar ferramenta
             tool_result = await tools_registry.execute_tool(tool_name, params)
@@ -103,77 +188,137 @@ Lembre-se: Você é o Pateta! Seja engraçado, desajeitado mas sempre prestativo
             context = self._format_tool_result_for_ollama(tool_result)
             
             # Gerar resposta com contexto
-            response = await self._chat_with_context(message, context, user)
+            response = await self._chat_with_context(message, context, user, chat_id)
             
             return response
             
         except Exception as e:
             logger.error(f"Erro ao executar ferramenta: {e}")
             # Fallback para resposta simples
-            return await self._simple_chat(message, user)
+            return await self._simple_chat(message, user, chat_id)
             
-    def _format_tool_result_for_ollama(self, tool_result: Dict[str, Any]) -> str:
+    def _format_tool_result_for_ollama(self, tool_result: ToolResult) -> str:
         """Formata resultado da ferramenta para o Ollama"""
-        if not tool_result.get('success', False):
-            return f"Ferramenta não conseguiu encontrar informações: {tool_result.get('message', 'Erro desconhecido')}"
-            
-        if tool_result.get('data'):
-            context_parts = []
-            for item in tool_result['data']:
-                title = item.get('title', 'Sem título')
-                url = item.get('url', '')
-                source = item.get('source', 'Fonte desconhecida')
-                
-                context_parts.append(f"📰 {title} (Fonte: {source})")
-                
-            return f"INFORMAÇÕES ENCONTRADAS:\n" + "\n".join(context_parts)
-        else:
-            return "Nenhuma informação encontrada."
-            
-    async def _chat_with_context(self, message: str, context: str, user: Optional[str] = None) -> str:
+        return render_prompt(tool_result)
+            
+    async def _chat_with_context(self, message: str, context: str, user: Optional[str] = None,
+                                 chat_id: Optional[int] = None) -> str:
         """Chat com contexto de ferramenta"""
-        prompt = f"{message}\n\nContexto das informações:\n{context}\n\nResponda como Pateta usando essas informações:"
+        prompt = context_prompt(message, context)
         
         try:
-            response = ollama.chat(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": prompt if not user else f"[{user}] {prompt}"}
-                ],
-                options={
-                    "temperature": 0.2,
-                    "num_predict": 800,
-                }
-            )
-            
-            return response["message"]["content"].strip()
+            answer = await self._generate(prompt if not user else f"[{user}] {prompt}", self._history(chat_id))
+            # A memória guarda só a pergunta: o contexto da ferramenta já está resumido na resposta
+            self._remember(chat_id, message if not user else f"[{user}] {message}", answer)
+            return answer
             
         except Exception as e:
             logger.error(f"Erro no chat com contexto: {e}")
             return "Gawrsh! Tive um problema técnico aqui! Mas aqui estão as informações que encontrei:\n\n" + context
             
-    async def _simple_chat(self, message: str, user: Optional[str] = None) -> str:
+    async def summarize(self, topic: str, tool_result: ToolResult) -> str:
+        """
+        Resume o resultado de uma ferramenta para o resumo matinal
+        
+        Args:
+            topic: Tópico do resumo (ex.: notícias, esportes, clima)
+            tool_result: Resultado de tools_registry.execute_tool
+            
+        Returns:
+            Resumo curto; lista dos títulos se o modelo falhar
+        """
+        context = self._format_tool_result_for_ollama(tool_result)
+        prompt = (f"Contexto das informações:\n{context}\n\n"
+                  f"Escreva o trecho sobre {topic} do resumo matinal em até 3 frases curtas, "
+                  f"sem inventar fatos fora do contexto:")
+        try:
+            return await self._generate(prompt)
+        except Exception as e:
+            logger.error(f"Erro ao resumir '{topic}': {e}")
+            return "\n".join(f"• {item.title}" for item in tool_result.items if item.title) or "Sem novidades por aqui."
+            
+    async def _simple_chat(self, message: str, user: Optional[str] = None, chat_id: Optional[int] = None) -> str:
         """Chat simples sem ferramentas"""
         try:
-            response = ollama.chat(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": message if not user else f"[{user}] {message}"}
-                ],
-                options={
-                    "temperature": 0.2,
-                    "num_predict": 800,
-                }
-            )
-            
-            return response["message"]["content"].strip()
+            content = message if not user else f"[{user}] {message}"
+            answer = await self._generate(content, self._history(chat_id))
+            self._remember(chat_id, content, answer)
+            return answer
             
         except Exception as e:
             logger.error(f"Erro no chat simples: {e}")
             return "Gawrsh! Algo deu errado aqui! Tente novamente mais tarde!"
             
+    def _history(self, chat_id: Optional[int]) -> List[Dict[str, str]]:
+        """Resumo e trocas recentes do chat"""
+        return self.memory.messages(chat_id) if chat_id is not None else []
+        
+    def _remember(self, chat_id: Optional[int], content: str, answer: str) -> None:
+        if chat_id is not None and answer:
+            self.memory.append(chat_id, content, answer)
+            
+    async def _summarize_turns(self, summary: str, turns: List[Turn]) -> Optional[str]:
+        """Condensa as trocas antigas no resumo do chat (adiado enquanto o LLM estiver sobrecarregado)"""
+        if self.shedder.overloaded():
+            return None
+        dialogue = "\n".join(f"Usuário: {question}\nPateta: {answer}" for question, answer, _ in turns)
+        prompt = (f"Resumo anterior: {summary or '(vazio)'}\n\nNovas mensagens:\n{dialogue}\n\n"
+                  f"Atualize o resumo da conversa em até 3 frases, mantendo nomes, preferências e "
+                  f"fatos citados pelos usuários. Responda só com o resumo:")
+        return await asyncio.wait_for(
+            self._stream(prompt, system="Você resume conversas de forma objetiva."), timeout=60
+        )
+            
+    async def _generate(self, content: str, history: Optional[List[Dict[str, str]]] = None) -> str:
+        """Gera a resposta no Ollama respeitando o deadline corrente"""
+        return await asyncio.wait_for(self._stream(content, history), timeout=remaining_timeout())
+        
+    async def _stream(self, content: str, history: Optional[List[Dict[str, str]]] = None,
+                      system: Optional[str] = None, stats: Optional[Dict[str, float]] = None) -> str:
+        """
+        Consome a resposta em streaming medindo o tempo até o primeiro token
+        
+        Args:
+            stats: Se informado, recebe ttft e total (segundos) e as contagens e
+                durações informadas pelo Ollama no último trecho
+        """
+        start = time.perf_counter()
+        first_token_at = None
+        parts: List[str] = []
+        
+        stream = self.pool.stream_chat(
+            self.model,
+            messages=[
+                {"role": "system", "content": system or self.system_prompt},
+                *(history or ()),
+                {"role": "user", "content": content}
+            ],
+            options=self.options,
+        )
+        async for chunk in stream:
+            token = chunk["message"]["content"]
+            if token and first_token_at is None:
+                first_token_at = time.perf_counter()
+                metrics.histogram("llm_time_to_first_token_seconds", model=self.model).observe(
+                    first_token_at - start
+                )
+            parts.append(token)
+            if chunk.get("done"):
+                # Tempos reportados pelo Ollama (em nanossegundos)
+                record_span("llm_load", (chunk.get("load_duration") or 0) / 1e9)
+                record_span("llm_prompt_eval", (chunk.get("prompt_eval_duration") or 0) / 1e9)
+                record_span("llm_generation", (chunk.get("eval_duration") or 0) / 1e9)
+                if stats is not None:
+                    stats.update({key: chunk.get(key) or 0 for key in OLLAMA_TIMINGS})
+            
+        elapsed = time.perf_counter() - start
+        metrics.histogram("llm_generation_seconds", model=self.model).observe(elapsed)
+        record_span("llm", elapsed)
+        if stats is not None:
+            stats['ttft'] = first_token_at - start if first_token_at is not None else elapsed
+            stats['total'] = elapsed
+        return "".join(parts).strip()
+            
     def get_system_prompt(self) -> str:
         """Retorna o prompt do sistema atual"""
         return self.system_prompt
@@ -186,13 +331,20 @@ Lembre-se: Você é o Pateta! Seja engraçado, desajeitado mas sempre prestativo
     def get_model_info(self) -> Dict[str, Any]:
         """Retorna informações sobre o modelo"""
         try:
-            models = ollama.list()
-            for model in models['models']:
-                if model['name'] == self.model:
+            import ollama
+            models = ollama.Client(host=self.pool.primary.host).list()
+            # /api/tags lista "llama3.2:latest" para o modelo pedido como "llama3.2"
+            names = {self.model, f"{self.model}:latest"}
+            for model in models.models:
+                if model.model in names:
+                    details = model.details
                     return {
-                        'name': model['name'],
-                        'size': model.get('size', 'Unknown'),
-                        'modified_at': model.get('modified_at', 'Unknown')
+                        'name': model.model,
+                        'size': model.size if model.size is not None else 'Unknown',
+                        'modified_at': model.modified_at.isoformat() if model.modified_at else 'Unknown',
+                        'family': details.family if details else None,
+                        'parameter_size': details.parameter_size if details else None,
+                        'quantization_level': details.quantization_level if details else None,
                     }
             return {'name': self.model, 'status': 'Model not found'}
         except Exception as e:
@@ -0,0 +1,292 @@
+"""
+Pool de servidores Ollama
+Distribui as gerações entre vários hosts (OLLAMA_HOSTS) pelo menor número
+de requisições em andamento, preferindo um host que já tenha o modelo
+carregado na memória. Hosts que falham saem da rotação até a próxima
+verificação de saúde bem-sucedida (ou de uma requisição que dê certo).
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set
+
+from config.settings import OLLAMA_AFFINITY_SLACK, OLLAMA_HEALTH_INTERVAL, OLLAMA_HOSTS, OLLAMA_NUM_PARALLEL
+from utils.metrics import Histogram, metrics
+
+logger = logging.getLogger(__name__)
+
+# Peso da última amostra na média móvel de latência
+_EWMA_ALPHA = 0.2
+# Tempo máximo de uma verificação de saúde
+_HEALTH_TIMEOUT = 5.0
+# Falhas seguidas de requisição até o host sair da rotação (a verificação de saúde tira na primeira)
+_FAILURES_TO_UNHEALTHY = 3
+
+
+def _ewma(current: Optional[float], sample: float) -> float:
+    return sample if current is None else _EWMA_ALPHA * sample + (1 - _EWMA_ALPHA) * current
+
+
+class NoBackendAvailable(Exception):
+    """Nenhum servidor Ollama conseguiu atender a requisição"""
+
+
+def _is_backend_failure(error: Exception) -> bool:
+    """Falhas do host (conexão, 5xx, fila cheia), em que vale tentar outro servidor"""
+    import httpx
+    from ollama import ResponseError
+
+    if isinstance(error, ResponseError):
+        return error.status_code >= 500 or error.status_code == 429
+    return isinstance(error, (ConnectionError, httpx.TransportError))
+
+
+class OllamaBackend:
+    """Um servidor Ollama com seu estado de roteamento e estatísticas"""
+
+    def __init__(self, host: str):
+        self.host = host
+        self.outstanding = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.loaded_models: Set[str] = set()
+        self.requests = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.latency_ewma: Optional[float] = None
+        # Tempo de processamento no servidor (carga + prompt + geração), sem a espera na fila
+        self.service_ewma: Optional[float] = None
+        self.latency = Histogram()
+        self._client = None
+
+    @property
+    def client(self):
+        """Cliente assíncrono do host (biblioteca importada no primeiro uso)"""
+        if self._client is None:
+            import ollama
+            self._client = ollama.AsyncClient(host=self.host)
+        return self._client
+
+    def record_success(self, model: str, elapsed: float, service: Optional[float] = None) -> None:
+        self.requests += 1
+        self.healthy = True
+        self.consecutive_failures = 0
+        # O Ollama mantém o modelo na memória após a geração
+        self.loaded_models.add(model)
+        self.latency.observe(elapsed)
+        self.latency_ewma = _ewma(self.latency_ewma, elapsed)
+        self.service_ewma = _ewma(self.service_ewma, service if service else elapsed)
+        metrics.histogram("llm_backend_seconds", backend=self.host).observe(elapsed)
+
+    def estimated_wait(self, parallel: int) -> float:
+        """
+        Espera estimada de uma nova requisição antes de começar a ser processada
+
+        Com `parallel` gerações simultâneas, uma vaga abre a cada
+        service_ewma / parallel segundos.
+        """
+        queued = self.outstanding - parallel + 1
+        if queued <= 0 or self.service_ewma is None:
+            return 0.0
+        return queued * self.service_ewma / parallel
+
+    def record_failure(self, error: Exception) -> None:
+        self.requests += 1
+        self.errors += 1
+        self.consecutive_failures += 1
+        # Uma falha isolada (reinício, 429 momentâneo) não tira o host da rotação
+        if self.consecutive_failures >= _FAILURES_TO_UNHEALTHY:
+            self.healthy = False
+        self.last_error = str(error) or type(error).__name__
+        metrics.counter("llm_backend_errors_total", backend=self.host).inc()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'host': self.host,
+            'healthy': self.healthy,
+            'consecutive_failures': self.consecutive_failures,
+            'outstanding': self.outstanding,
+            'loaded_models': sorted(self.loaded_models),
+            'requests': self.requests,
+            'errors': self.errors,
+            'last_error': self.last_error,
+            'latency_ewma': self.latency_ewma,
+            'service_ewma': self.service_ewma,
+            'latency_p50': self.latency.quantile(0.5) if self.latency.count else None,
+            'latency_p95': self.latency.quantile(0.95) if self.latency.count else None,
+        }
+
+
+class OllamaPool:
+    """
+    Roteia as requisições entre os servidores Ollama
+
+    Args:
+        hosts: URLs dos servidores
+        health_interval: Intervalo entre verificações de saúde em segundos (0 desativa)
+        affinity_slack: Requisições a mais aceitas num host que já tem o modelo carregado
+        parallel: Gerações simultâneas por servidor (OLLAMA_NUM_PARALLEL dos servidores)
+    """
+
+    def __init__(self, hosts: List[str], health_interval: float = OLLAMA_HEALTH_INTERVAL,
+                 affinity_slack: int = OLLAMA_AFFINITY_SLACK, parallel: int = OLLAMA_NUM_PARALLEL):
+        if not hosts:
+            raise ValueError("Informe ao menos um servidor Ollama")
+        self.backends = [OllamaBackend(host) for host in dict.fromkeys(hosts)]
+        self.health_interval = health_interval
+        self.affinity_slack = affinity_slack
+        self.parallel = max(1, parallel)
+        self._next = 0
+        self._health_task: Optional[asyncio.Task] = None
+
+    @property
+    def primary(self) -> OllamaBackend:
+        """Primeiro servidor configurado (usado em consultas administrativas)"""
+        return self.backends[0]
+
+    def order(self, model: str) -> List[OllamaBackend]:
+        """
+        Ordem de tentativa dos servidores para o modelo
+
+        Saudáveis primeiro, pelo menor número de requisições em andamento; um
+        host com o modelo carregado ganha até `affinity_slack` requisições de
+        vantagem (carregar o modelo em outro host custa segundos). Empates
+        alternam entre os hosts.
+        """
+        count = len(self.backends)
+        start = self._next
+        self._next = (self._next + 1) % count
+
+        def cost(position: int) -> tuple:
+            backend = self.backends[(start + position) % count]
+            bonus = self.affinity_slack if model in backend.loaded_models else 0
+            return (not backend.healthy, backend.outstanding - bonus, position)
+
+        return [self.backends[(start + position) % count] for position in sorted(range(count), key=cost)]
+
+    async def stream_chat(self, model: str, **kwargs: Any) -> AsyncIterator[Any]:
+        """
+        Geração em streaming no melhor servidor disponível
+
+        Se o servidor falhar antes do primeiro trecho da resposta, a
+        requisição segue para o próximo; depois disso o erro é repassado.
+
+        Raises:
+            NoBackendAvailable: Todos os servidores falharam
+        """
+        self.start_health_checks()
+        failures: List[str] = []
+        for backend in self.order(model):
+            started = False
+            service = None
+            backend.outstanding += 1
+            start = time.perf_counter()
+            try:
+                stream = await backend.client.chat(model=model, stream=True, **kwargs)
+                async for chunk in stream:
+                    started = True
+                    if chunk.get("done"):
+                        # Tempos reportados pelo Ollama (em nanossegundos)
+                        service = sum(chunk.get(key) or 0 for key in (
+                            "load_duration", "prompt_eval_duration", "eval_duration"
+                        )) / 1e9
+                    yield chunk
+                backend.record_success(model, time.perf_counter() - start, service)
+                return
+            except Exception as e:
+                if started or not _is_backend_failure(e):
+                    raise
+                backend.record_failure(e)
+                failures.append(f"{backend.host}: {backend.last_error}")
+                metrics.counter("llm_backend_failovers_total").inc()
+                logger.warning(f"Ollama em {backend.host} falhou ({backend.last_error}); tentando outro servidor")
+            finally:
+                backend.outstanding -= 1
+        raise NoBackendAvailable("; ".join(failures))
+
+    async def embed(self, model: str, inputs: List[str]) -> Sequence[Sequence[float]]:
+        """
+        Embeddings dos textos no melhor servidor disponível, com failover
+
+        Não entra na contagem de requisições em andamento: embeddings são
+        rápidos e não disputam as vagas de geração.
+
+        Raises:
+            NoBackendAvailable: Todos os servidores falharam
+        """
+        self.start_health_checks()
+        failures: List[str] = []
+        for backend in self.order(model):
+            try:
+                response = await backend.client.embed(model=model, input=inputs)
+            except Exception as e:
+                if not _is_backend_failure(e):
+                    raise
+                backend.record_failure(e)
+                failures.append(f"{backend.host}: {backend.last_error}")
+                metrics.counter("llm_backend_failovers_total").inc()
+                continue
+            backend.loaded_models.add(model)
+            return response.embeddings
+        raise NoBackendAvailable("; ".join(failures))
+
+    def estimated_wait(self) -> Optional[float]:
+        """
+        Menor espera estimada entre os servidores saudáveis
+
+        None se nenhum estiver saudável: a espera é desconhecida, não
+        infinita, e as requisições seguem para os hosts fora da rotação
+        (é assim que um host volta sem verificações de saúde).
+        """
+        waits = [backend.estimated_wait(self.parallel) for backend in self.backends if backend.healthy]
+        return min(waits) if waits else None
+
+    def start_health_checks(self) -> None:
+        """Inicia as verificações periódicas (uma vez, fora do contexto do update atual)"""
+        if self._health_task or self.health_interval <= 0:
+            return
+        # Contexto vazio: a task não herda o deadline nem o trace do update que a criou
+        self._health_task = contextvars.Context().run(asyncio.ensure_future, self._check_forever())
+
+    async def _check_forever(self) -> None:
+        while True:
+            await self.check_health()
+            await asyncio.sleep(self.health_interval)
+
+    async def check_health(self) -> None:
+        """Consulta /api/ps de todos os servidores: saúde e modelos carregados"""
+        await asyncio.gather(*(self._check(backend) for backend in self.backends))
+
+    async def _check(self, backend: OllamaBackend) -> None:
+        try:
+            response = await asyncio.wait_for(backend.client.ps(), timeout=_HEALTH_TIMEOUT)
+        except Exception as e:
+            if backend.healthy:
+                logger.warning(f"Ollama em {backend.host} indisponível: {e or type(e).__name__}")
+            backend.healthy = False
+            backend.last_error = str(e) or type(e).__name__
+        else:
+            if not backend.healthy:
+                logger.info(f"Ollama em {backend.host} voltou a responder")
+            backend.healthy = True
+            backend.consecutive_failures = 0
+            backend.loaded_models = {model.model for model in response.models if model.model}
+            # /api/ps lista "llama3.2:latest"; as requisições costumam usar só "llama3.2"
+            backend.loaded_models |= {name.split(":")[0] for name in backend.loaded_models if name.endswith(":latest")}
+        metrics.gauge("llm_backend_healthy", backend=backend.host).set(1 if backend.healthy else 0)
+
+    async def close(self) -> None:
+        """Para as verificações de saúde"""
+        if self._health_task:
+            self._health_task.cancel()
+            self._health_task = None
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Estado e latências de cada servidor"""
+        return [backend.get_stats() for backend in self.backends]
+
+
+# Instância global do pool
+ollama_pool = OllamaPool(OLLAMA_HOSTS)
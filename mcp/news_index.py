@@ -0,0 +1,160 @@
+"""
+Índice local de notícias
+Corpus limitado por idade e quantidade com índice invertido dos títulos
+(sem acentos), consultado pelo NewsTool sem acessar a rede
+"""
+
+import heapq
+import itertools
+import re
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from utils.text import normalize_text
+from .news_dedup import Signature, canonical_url, collapse, title_signature
+from .tool_result import NewsItem
+
+# Palavras ignoradas na indexação e nas consultas
+STOPWORDS = frozenset(
+    "a o as os um uma uns umas de do da dos das em no na nos nas por pelo pela pelos pelas "
+    "para pra com sem sob sobre e ou que se ao aos à às é foi ser são como mais menos muito "
+    "já não sim seu sua seus suas eu voce ele ela eles elas isso isto esse essa este esta "
+    "qual quais quem onde quando the of in on to and for".split()
+)
+# Candidatos examinados por resultado pedido, antes de agrupar as duplicatas
+CANDIDATES_PER_RESULT = 4
+
+# Termos que só indicam "quero notícias": sem outros termos, a consulta vira "mais recentes"
+GENERIC_TERMS = frozenset(
+    "noticia noticias news hoje ultima ultimas ultimo ultimos recente recentes agora "
+    "novidade novidades manchete manchetes aconteceu acontecendo".split()
+)
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Termos indexáveis do texto (minúsculas, sem acentos e sem stopwords)"""
+    return [token for token in _TOKEN_RE.findall(normalize_text(text))
+            if len(token) > 1 and token not in STOPWORDS]
+
+
+def published_timestamp(value: Optional[str]) -> Optional[float]:
+    """Converte o pubDate do RSS (RFC 822) em timestamp unix"""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class NewsIndex:
+    """
+    Corpus de notícias recentes com índice invertido
+
+    Args:
+        max_items: Quantidade máxima de notícias mantidas (as mais antigas saem primeiro)
+        max_age: Idade máxima de uma notícia em segundos
+    """
+
+    def __init__(self, max_items: int = 5000, max_age: float = 48 * 3600):
+        self.max_items = max_items
+        self.max_age = max_age
+        # id -> (timestamp da notícia, horário de indexação, item, assinatura do título,
+        # url canônica), em ordem de indexação
+        self._docs: Dict[int, Tuple[float, float, NewsItem, Signature, str]] = {}
+        self._by_url: Dict[str, int] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._terms: Dict[int, Tuple[str, ...]] = {}
+        self._ids = itertools.count()
+        self.last_update: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, item: NewsItem, now: Optional[float] = None) -> bool:
+        """
+        Indexa uma notícia
+
+        Returns:
+            True se a notícia é nova (URL ainda não indexada e dentro da idade máxima)
+        """
+        now = now or time.time()
+        if not item.url:
+            return False
+        url = canonical_url(item.url)
+        if url in self._by_url:
+            return False
+        published = published_timestamp(item.published)
+        if published is not None and published < now - self.max_age:
+            return False
+        terms = tuple(dict.fromkeys(tokenize(item.title)))
+        if not terms:
+            return False
+
+        doc_id = next(self._ids)
+        self._docs[doc_id] = (min(published or now, now), now, item, title_signature(item.title), url)
+        self._by_url[url] = doc_id
+        self._terms[doc_id] = terms
+        for term in terms:
+            self._postings.setdefault(term, set()).add(doc_id)
+        self.last_update = now
+
+        while len(self._docs) > self.max_items:
+            self._remove(next(iter(self._docs)))
+        return True
+
+    def add_many(self, items: Iterable[NewsItem]) -> int:
+        """Indexa várias notícias e retorna quantas eram novas"""
+        now = time.time()
+        return sum(self.add(item, now) for item in items)
+
+    def _remove(self, doc_id: int) -> None:
+        url = self._docs.pop(doc_id)[4]
+        self._by_url.pop(url, None)
+        for term in self._terms.pop(doc_id):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[term]
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Remove as notícias mais velhas que max_age e retorna quantas saíram"""
+        cutoff = (now or time.time()) - self.max_age
+        expired = [doc_id for doc_id, (timestamp, *_) in self._docs.items() if timestamp < cutoff]
+        for doc_id in expired:
+            self._remove(doc_id)
+        return len(expired)
+
+    def search(self, query: str, limit: int = 3) -> List[NewsItem]:
+        """
+        Busca as notícias mais relevantes para a consulta
+
+        Ordena pela quantidade de termos da consulta presentes no título e, em
+        seguida, pela data. Consultas sem termos específicos ("notícias de
+        hoje") retornam as mais recentes. Matérias quase duplicadas entre os
+        candidatos aparecem uma única vez.
+        """
+        candidates = limit * CANDIDATES_PER_RESULT
+        terms = [term for term in dict.fromkeys(tokenize(query)) if term not in GENERIC_TERMS]
+        if not terms:
+            docs = heapq.nlargest(candidates, self._docs.values(), key=lambda doc: doc[0])
+        else:
+            scores: Dict[int, int] = {}
+            for term in terms:
+                for doc_id in self._postings.get(term, ()):
+                    scores[doc_id] = scores.get(doc_id, 0) + 1
+            best = heapq.nlargest(candidates, scores.items(), key=lambda entry: (entry[1], self._docs[entry[0]][0]))
+            docs = [self._docs[doc_id] for doc_id, _ in best]
+        return collapse([doc[2] for doc in docs], limit, [doc[3] for doc in docs], [doc[4] for doc in docs])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Tamanho do corpus e do índice"""
+        return {
+            'items': len(self._docs),
+            'terms': len(self._postings),
+            'last_update': self.last_update,
+        }
@@ -0,0 +1,175 @@
+"""
+Parsers do caminho de scraping de notícias
+Cada função aceita um backend para que as implementações possam ser
+comparadas em benchmarks (benchmarks/bench_parsers.py)
+"""
+
+from html.parser import HTMLParser
+from io import BytesIO
+from typing import Iterator, List, Optional, Tuple
+
+from .tool_result import NewsItem
+
+# Backends disponíveis
+RSS_BACKENDS = ("bs4-xml", "lxml", "streaming")
+HTML_BACKENDS = ("html.parser", "lxml", "streaming")
+
+# Tamanho dos blocos entregues ao parser incremental de HTML
+_STREAM_CHUNK = 16 * 1024
+
+
+def parse_rss(content: str, limit: int, backend: str = "bs4-xml") -> List[NewsItem]:
+    """
+    Extrai os itens de um feed RSS
+
+    Args:
+        content: XML do feed
+        limit: Número máximo de itens
+        backend: 'bs4-xml' (BeautifulSoup + lxml-xml), 'lxml' (árvore completa)
+                 ou 'streaming' (iterparse, para ao atingir o limite)
+
+    Returns:
+        Itens (NewsItem) com title, url, published e source
+    """
+    if backend == "bs4-xml":
+        return _parse_rss_bs4(content, limit)
+    if backend == "lxml":
+        return _parse_rss_lxml(content, limit)
+    if backend == "streaming":
+        return _parse_rss_streaming(content, limit)
+    raise ValueError(f"Backend de RSS desconhecido: {backend}")
+
+
+def _rss_item(title: Optional[str], link: Optional[str], pub_date: Optional[str]) -> Optional[NewsItem]:
+    if not title or not link:
+        return None
+    return NewsItem(title.strip(), link.strip(), pub_date.strip() if pub_date else None, 'Google News RSS')
+
+
+def _parse_rss_bs4(content: str, limit: int) -> List[NewsItem]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, 'xml')
+    news_items = []
+    for item in soup.find_all('item')[:limit]:
+        title = item.find('title')
+        link = item.find('link')
+        pub_date = item.find('pubDate')
+        parsed = _rss_item(
+            title.get_text() if title else None,
+            link.get_text() if link else None,
+            pub_date.get_text() if pub_date else None,
+        )
+        if parsed:
+            news_items.append(parsed)
+    return news_items
+
+
+def _parse_rss_lxml(content: str, limit: int) -> List[NewsItem]:
+    from lxml import etree
+
+    root = etree.fromstring(content.encode('utf-8'), parser=etree.XMLParser(recover=True))
+    news_items = []
+    for item in root.iter('item'):
+        if limit <= 0:
+            break
+        limit -= 1
+        parsed = _rss_item(item.findtext('title'), item.findtext('link'), item.findtext('pubDate'))
+        if parsed:
+            news_items.append(parsed)
+    return news_items
+
+
+def _parse_rss_streaming(content: str, limit: int) -> List[NewsItem]:
+    from lxml import etree
+
+    news_items = []
+    seen = 0
+    context = etree.iterparse(BytesIO(content.encode('utf-8')), events=('end',), tag='item', recover=True)
+    for _, item in context:
+        parsed = _rss_item(item.findtext('title'), item.findtext('link'), item.findtext('pubDate'))
+        if parsed:
+            news_items.append(parsed)
+        # Libera o item já processado para manter a memória constante
+        item.clear()
+        seen += 1
+        if seen >= limit:
+            break
+    return news_items
+
+
+def iter_links(content: str, backend: str = "html.parser") -> Iterator[Tuple[str, str]]:
+    """
+    Percorre os links de uma página HTML
+
+    Args:
+        content: HTML da página
+        backend: 'html.parser' (BeautifulSoup), 'lxml' (lxml.html)
+                 ou 'streaming' (HTMLParser incremental, permite parar cedo)
+
+    Yields:
+        Tuplas (href, texto do link sem espaços nas pontas)
+    """
+    if backend == "html.parser":
+        return _iter_links_bs4(content)
+    if backend == "lxml":
+        return _iter_links_lxml(content)
+    if backend == "streaming":
+        return _iter_links_streaming(content)
+    raise ValueError(f"Backend de HTML desconhecido: {backend}")
+
+
+def _iter_links_bs4(content: str) -> Iterator[Tuple[str, str]]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, 'html.parser')
+    for link in soup.find_all('a', href=True):
+        yield link.get('href', ''), link.get_text().strip()
+
+
+def _iter_links_lxml(content: str) -> Iterator[Tuple[str, str]]:
+    import lxml.html
+
+    if not content.strip():
+        return
+    document = lxml.html.document_fromstring(content)
+    for link in document.iter('a'):
+        href = link.get('href')
+        if href is not None:
+            yield href, link.text_content().strip()
+
+
+class _LinkCollector(HTMLParser):
+    """Coleta (href, texto) dos links conforme o HTML é alimentado"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links: List[Tuple[str, str]] = []
+        self._href: Optional[str] = None
+        self._text: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            href = dict(attrs).get('href')
+            self._href = href if href is not None else None
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._href is not None:
+            self.links.append((self._href, "".join(self._text).strip()))
+            self._href = None
+
+    def handle_data(self, data):
+        if self._href is not None:
+            self._text.append(data)
+
+
+def _iter_links_streaming(content: str) -> Iterator[Tuple[str, str]]:
+    collector = _LinkCollector()
+    for start in range(0, len(content), _STREAM_CHUNK):
+        collector.feed(content[start:start + _STREAM_CHUNK])
+        if collector.links:
+            yield from collector.links
+            collector.links.clear()
+    collector.close()
+    yield from collector.links
@@ -1,17 +1,30 @@
 """
 Ferramenta de Notícias MCP
-Busca notícias usando Google News RSS e web scraping
+Responde a partir de um índice local alimentado em segundo plano pelos
+feeds de NEWS_FEEDS e pelos portais de NEWS_SITES; busca na rede (Google
+News RSS, DuckDuckGo e web scraping) apenas quando o índice não tem resultado
 """
 
 import asyncio
+import contextvars
 import logging
 import re
-from typing import Any, Dict, List
-from datetime import datetime
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin
 import aiohttp
-from bs4 import BeautifulSoup
 
+from config.settings import (
+    REQUEST_TIMEOUT, USER_AGENT, GOOGLE_NEWS_RSS_BASE, DUCKDUCKGO_API_URL, NEWS_SITES, NEWS_FEEDS,
+    NEWS_INGEST_INTERVAL, NEWS_INDEX_MAX_ITEMS, NEWS_INDEX_MAX_AGE_HOURS, RSS_PARSER, HTML_PARSER
+)
+from utils.deadline import remaining_timeout
+from utils.metrics import metrics
 from .base_tool import BaseTool, ToolExecutionError
+from .news_dedup import collapse
+from .news_index import NewsIndex
+from .news_parsers import iter_links, parse_rss
+from .tool_result import NewsItem, ToolResult
 
 logger = logging.getLogger(__name__)
 
@@ -23,9 +36,15 @@ class NewsTool(BaseTool):
         super().__init__(
             name="news_tool",
             description="Busca notícias recentes sobre um assunto ou cidade",
-            cache_ttl=3600  # 1 hora
+            cache_ttl=3600,  # 1 hora
+            refresh_interval=NEWS_INGEST_INTERVAL
         )
         self.session = None
+        self.index = NewsIndex(NEWS_INDEX_MAX_ITEMS, NEWS_INDEX_MAX_AGE_HOURS * 3600)
+        # url -> cabeçalhos de requisição condicional (ETag / Last-Modified)
+        self._validators: Dict[str, Dict[str, str]] = {}
+        self._ingest_lock = asyncio.Lock()
+        self._ingester: Optional[asyncio.Task] = None
         
     def get_parameters(self) -> List[Dict[str, Any]]:
         """Retorna parâmetros aceitos pela ferramenta"""
@@ -52,7 +71,7 @@ class NewsTool(BaseTool):
             }
         ]
         
-    async def execute(self, params: Dict[str, Any]) -> Dict[str, Any]:
+    async def execute(self, params: Dict[str, Any]) -> ToolResult:
         """Executa a busca de notícias"""
         try:
             # Validar e processar parâmetros
@@ -63,111 +82,189 @@ class NewsTool(BaseTool):
             if not query:
                 raise ToolExecutionError("Query não pode estar vazia")
                 
-            logger.info(f"Buscando notícias para: '{query}' (limite: {limit})")
+            logger.debug("Buscando notícias para: '%s' (limite: %s)", query, limit)
+            self.start_ingestion()
             
-            # Inicializar sessão HTTP se necessário
-            if not self.session:
-                self.session = aiohttp.ClientSession()
-                
-            # Buscar notícias
-            news_items = await self._fetch_news(query, limit, language)
+            # Índice local primeiro (só contém notícias em português)
+            news_items = self._search_index(query, limit) if language == 'pt' else []
             
             if not news_items:
-                return {
-                    'success': False,
-                    'message': f"Nenhuma notícia encontrada para '{query}'",
-                    'data': []
-                }
+                # Inicializar sessão HTTP se necessário
+                if not self.session:
+                    self.session = aiohttp.ClientSession()
+                    
+                # Buscar notícias na rede e guardar no índice
+                news_items = await self._fetch_news(query, limit, language)
+                if language == 'pt':
+                    self.index.add_many(news_items)
+            
+            if not news_items:
+                return ToolResult.failure(f"Nenhuma notícia encontrada para '{query}'")
                 
-            return {
-                'success': True,
-                'query': query,
-                'count': len(news_items),
-                'data': news_items,
-                'timestamp': datetime.now().isoformat()
-            }
+            return ToolResult.found(query, news_items)
             
         except Exception as e:
             logger.error(f"Erro ao buscar notícias: {e}")
             raise ToolExecutionError(f"Erro na busca de notícias: {str(e)}")
             
-    async def _fetch_news(self, query: str, limit: int, language: str) -> List[Dict[str, Any]]:
+    def _search_index(self, query: str, limit: int) -> List[NewsItem]:
+        """Consulta o índice local (vazio enquanto a primeira carga não termina)"""
+        if not len(self.index):
+            return []
+        with metrics.timer("news_index_search_seconds"):
+            items = self.index.search(query, limit)
+        metrics.counter("news_index_lookups_total", result="hit" if items else "miss").inc()
+        return items
+        
+    def start_ingestion(self) -> None:
+        """Inicia a carga periódica do índice (uma vez, fora do contexto do update atual)"""
+        if self._ingester or NEWS_INGEST_INTERVAL <= 0:
+            return
+        # Contexto vazio: a task não herda o deadline nem o trace do update que a criou
+        self._ingester = contextvars.Context().run(asyncio.ensure_future, self._ingest_forever())
+        
+    async def _ingest_forever(self) -> None:
+        while True:
+            try:
+                await self.ingest()
+            except Exception as e:
+                logger.warning(f"Erro na carga periódica de notícias: {e}")
+            await asyncio.sleep(NEWS_INGEST_INTERVAL)
+            
+    async def ingest(self) -> int:
+        """
+        Consulta feeds e portais em paralelo e indexa as notícias novas
+        
+        Returns:
+            Quantidade de notícias novas no índice
+        """
+        if not self.session:
+            self.session = aiohttp.ClientSession()
+            
+        async with self._ingest_lock:
+            with metrics.timer("news_ingest_seconds"):
+                results = await asyncio.gather(
+                    *(self._ingest_feed(feed) for feed in NEWS_FEEDS),
+                    *(self._ingest_site(site) for site in NEWS_SITES),
+                    return_exceptions=True
+                )
+            added = 0
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.warning(f"Erro ao atualizar fonte de notícias: {result}")
+                else:
+                    added += result
+            expired = self.index.prune()
+            metrics.counter("news_ingested_items_total").inc(added)
+            metrics.gauge("news_index_items").set(len(self.index))
+            logger.info(f"Índice de notícias: {added} novas, {expired} expiradas, {len(self.index)} no total")
+            return added
+            
+    async def _get(self, url: str) -> Optional[str]:
+        """GET condicional: None se o conteúdo não mudou desde a última consulta"""
+        headers = dict(self._validators.get(url, {}), **{'User-Agent': USER_AGENT})
+        async with self.session.get(url, headers=headers, timeout=self._request_timeout()) as response:
+            if response.status == 304:
+                return None
+            if response.status != 200:
+                raise Exception(f"HTTP {response.status} em {url}")
+            validators = {}
+            if response.headers.get('ETag'):
+                validators['If-None-Match'] = response.headers['ETag']
+            if response.headers.get('Last-Modified'):
+                validators['If-Modified-Since'] = response.headers['Last-Modified']
+            self._validators[url] = validators
+            return await response.text()
+            
+    async def _ingest_feed(self, feed_url: str) -> int:
+        """Feed RSS configurado em NEWS_FEEDS"""
+        content = await self._get(feed_url)
+        if content is None:
+            return 0
+        # Parse numa thread: o event loop continua atendendo os updates enquanto isso
+        items = await asyncio.to_thread(parse_rss, content, NEWS_INDEX_MAX_ITEMS, RSS_PARSER)
+        return self.index.add_many(items)
+        
+    async def _ingest_site(self, site_url: str) -> int:
+        """Portal de NEWS_SITES: links com cara de manchete"""
+        content = await self._get(site_url)
+        if content is None:
+            return 0
+        items = await asyncio.to_thread(self._extract_headlines, content, site_url)
+        return self.index.add_many(items)
+        
+    @staticmethod
+    def _extract_headlines(content: str, site_url: str) -> List[NewsItem]:
+        """Links do portal com cara de manchete (roda fora do event loop)"""
+        return [
+            NewsItem(title, urljoin(site_url, href), None, site_url)
+            for href, title in iter_links(content, HTML_PARSER)
+            if len(title) > 15 and title.count(' ') >= 2
+        ]
+        
+    async def _fetch_news(self, query: str, limit: int, language: str) -> List[NewsItem]:
         """Busca notícias de múltiplas fontes"""
         news_items = []
         
-        # Tentar Google News RSS primeiro
+        # Tentar Google News RSS primeiro (com folga para as duplicatas agrupadas)
         try:
-            rss_news = await self._fetch_google_news_rss(query, limit, language)
-            news_items.extend(rss_news)
+            with metrics.timer("news_source_latency_seconds", source="google_news_rss"):
+                rss_news = await self._fetch_google_news_rss(query, limit * 3, language)
+            news_items = collapse(rss_news, limit)
         except Exception as e:
             logger.warning(f"Erro ao buscar Google News RSS: {e}")
             
         # Se não conseguiu RSS, tentar DuckDuckGo
         if len(news_items) < limit:
             try:
-                ddg_news = await self._fetch_duckduckgo_news(query, limit - len(news_items))
-                news_items.extend(ddg_news)
+                with metrics.timer("news_source_latency_seconds", source="duckduckgo"):
+                    ddg_news = await self._fetch_duckduckgo_news(query, limit - len(news_items))
+                news_items = collapse(news_items + ddg_news, limit)
             except Exception as e:
                 logger.warning(f"Erro ao buscar DuckDuckGo: {e}")
                 
         # Se ainda não tem notícias suficientes, tentar web scraping
         if len(news_items) < limit:
             try:
-                scraped_news = await self._scrape_news_sites(query, limit - len(news_items))
-                news_items.extend(scraped_news)
+                with metrics.timer("news_source_latency_seconds", source="scraping"):
+                    scraped_news = await self._scrape_news_sites(query, limit - len(news_items))
+                news_items = collapse(news_items + scraped_news, limit)
             except Exception as e:
                 logger.warning(f"Erro ao fazer web scraping: {e}")
                 
         return news_items[:limit]
         
-    async def _fetch_google_news_rss(self, query: str, limit: int, language: str) -> List[Dict[str, Any]]:
+    async def _fetch_google_news_rss(self, query: str, limit: int, language: str) -> List[NewsItem]:
         """Busca notícias via Google News RSS"""
         # Google News RSS URL
         encoded_query = query.replace(' ', '+')
-        rss_url = f"https://news.google.com/rss/search?q={encoded_query}&hl={language}&gl=BR&ceid=BR:pt-419"
+        rss_url = f"{GOOGLE_NEWS_RSS_BASE}?q={encoded_query}&hl={language}&gl=BR&ceid=BR:pt-419"
         
         try:
-            async with self.session.get(rss_url, timeout=10) as response:
+            async with self.session.get(rss_url, timeout=self._request_timeout()) as response:
                 if response.status != 200:
                     raise Exception(f"HTTP {response.status}")
                     
                 content = await response.text()
-                return self._parse_rss_feed(content, limit)
+                return await asyncio.to_thread(self._parse_rss_feed, content, limit)
                 
         except Exception as e:
             logger.error(f"Erro ao buscar RSS: {e}")
             raise
             
-    def _parse_rss_feed(self, content: str, limit: int) -> List[Dict[str, Any]]:
+    def _parse_rss_feed(self, content: str, limit: int, parser: str = RSS_PARSER) -> List[NewsItem]:
         """Parse RSS feed XML"""
         try:
-            soup = BeautifulSoup(content, 'xml')
-            items = soup.find_all('item')[:limit]
-            
-            news_items = []
-            for item in items:
-                title = item.find('title')
-                link = item.find('link')
-                pub_date = item.find('pubDate')
-                
-                if title and link:
-                    news_items.append({
-                        'title': title.get_text().strip(),
-                        'url': link.get_text().strip(),
-                        'published': pub_date.get_text().strip() if pub_date else None,
-                        'source': 'Google News RSS'
-                    })
-                    
-            return news_items
+            return parse_rss(content, limit, parser)
             
         except Exception as e:
             logger.error(f"Erro ao parsear RSS: {e}")
             return []
             
-    async def _fetch_duckduckgo_news(self, query: str, limit: int) -> List[Dict[str, Any]]:
+    async def _fetch_duckduckgo_news(self, query: str, limit: int) -> List[NewsItem]:
         """Busca notícias via DuckDuckGo Instant Answer"""
         # DuckDuckGo Instant Answer API
-        api_url = f"https://api.duckduckgo.com/"
+        api_url = DUCKDUCKGO_API_URL
         params = {
             'q': f"{query} news",
             'format': 'json',
@@ -176,7 +273,7 @@ class NewsTool(BaseTool):
         }
         
         try:
-            async with self.session.get(api_url, params=params, timeout=10) as response:
+            async with self.session.get(api_url, params=params, timeout=self._request_timeout()) as response:
                 if response.status != 200:
                     raise Exception(f"HTTP {response.status}")
                     
@@ -184,12 +281,8 @@ class NewsTool(BaseTool):
                 
                 news_items = []
                 if 'AbstractURL' in data and data['AbstractURL']:
-                    news_items.append({
-                        'title': data.get('Abstract', 'Notícia encontrada'),
-                        'url': data['AbstractURL'],
-                        'published': None,
-                        'source': 'DuckDuckGo'
-                    })
+                    news_items.append(NewsItem(data.get('Abstract') or 'Notícia encontrada', data['AbstractURL'],
+                                               None, 'DuckDuckGo'))
                     
                 return news_items[:limit]
                 
@@ -197,18 +290,12 @@ class NewsTool(BaseTool):
             logger.error(f"Erro ao buscar DuckDuckGo: {e}")
             return []
             
-    async def _scrape_news_sites(self, query: str, limit: int) -> List[Dict[str, Any]]:
+    async def _scrape_news_sites(self, query: str, limit: int) -> List[NewsItem]:
         """Web scraping de sites de notícias"""
-        # Lista de sites para tentar
-        news_sites = [
-            'https://g1.globo.com/',
-            'https://www.uol.com.br/',
-            'https://www.terra.com.br/'
-        ]
-        
         news_items = []
         
-        for site in news_sites:
+        # Sites configurados em NEWS_SITES, em ordem de preferência
+        for site in NEWS_SITES:
             if len(news_items) >= limit:
                 break
                 
@@ -221,46 +308,44 @@ class NewsTool(BaseTool):
                 
         return news_items[:limit]
         
-    async def _scrape_site(self, site_url: str, query: str) -> List[Dict[str, Any]]:
+    async def _scrape_site(self, site_url: str, query: str) -> List[NewsItem]:
         """Faz scraping de um site específico"""
         try:
             headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+                'User-Agent': USER_AGENT
             }
             
-            async with self.session.get(site_url, headers=headers, timeout=10) as response:
+            async with self.session.get(site_url, headers=headers, timeout=self._request_timeout()) as response:
                 if response.status != 200:
                     return []
                     
                 content = await response.text()
-                soup = BeautifulSoup(content, 'html.parser')
-                
-                # Buscar links de notícias (implementação básica)
-                news_links = soup.find_all('a', href=True)
-                
-                news_items = []
-                for link in news_links:
-                    if len(news_items) >= 2:  # Máximo 2 por site
-                        break
-                        
-                    href = link.get('href', '')
-                    title = link.get_text().strip()
-                    
-                    # Verificar se parece ser uma notícia
-                    if self._is_news_link(href, title, query):
-                        news_items.append({
-                            'title': title,
-                            'url': href if href.startswith('http') else f"{site_url.rstrip('/')}{href}",
-                            'published': None,
-                            'source': site_url
-                        })
-                        
-                return news_items
+                return await asyncio.to_thread(self._extract_site_news, content, site_url, query)
                 
         except Exception as e:
             logger.error(f"Erro ao fazer scraping de {site_url}: {e}")
             return []
             
+    def _extract_site_news(self, content: str, site_url: str, query: str,
+                           parser: str = HTML_PARSER) -> List[NewsItem]:
+        """Extrai as notícias relevantes do HTML de um site"""
+        news_items = []
+        for href, title in iter_links(content, parser):
+            if len(news_items) >= 2:  # Máximo 2 por site
+                break
+                
+            # Verificar se parece ser uma notícia
+            if self._is_news_link(href, title, query):
+                news_items.append(NewsItem(
+                    title, href if href.startswith('http') else f"{site_url.rstrip('/')}{href}", None, site_url
+                ))
+                
+        return news_items
+            
+    def _request_timeout(self) -> aiohttp.ClientTimeout:
+        """Timeout HTTP limitado pelo tempo restante do update"""
+        return aiohttp.ClientTimeout(total=remaining_timeout(REQUEST_TIMEOUT))
+        
     def _is_news_link(self, href: str, title: str, query: str) -> bool:
         """Verifica se um link parece ser uma notícia relevante"""
         # Palavras-chave que indicam notícias
@@ -279,6 +364,9 @@ class NewsTool(BaseTool):
         
     async def cleanup(self):
         """Limpa recursos da ferramenta"""
+        if self._ingester:
+            self._ingester.cancel()
+            self._ingester = None
         if self.session:
             await self.session.close()
             self.session = None
@@ -0,0 +1,245 @@
+"""
+Ferramenta de Esportes MCP
+Mantém um conjunto incremental de notícias por time, atualizado em segundo
+plano a partir dos feeds dos times e dos portais de SPORTS_SITES
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote_plus, urljoin
+import aiohttp
+
+from config.settings import (
+    REQUEST_TIMEOUT, USER_AGENT, GOOGLE_NEWS_RSS_BASE, SPORTS_SITES, FAVORITE_TEAMS, CACHE_TTL_SPORTS,
+    SPORTS_POLL_INTERVAL, SPORTS_ITEMS_PER_TEAM, RSS_PARSER, HTML_PARSER
+)
+from utils.deadline import remaining_timeout
+from utils.metrics import metrics
+from utils.text import normalize_text
+from .base_tool import BaseTool, ToolExecutionError
+from .news_parsers import iter_links, parse_rss
+from .tool_result import NewsItem, ToolResult
+
+logger = logging.getLogger(__name__)
+
+# Time usado quando a mensagem não cita nenhum time (mistura as notícias de todos)
+GENERAL_TEAM = "esportes"
+# Links lembrados por fonte (feed ou portal) para detectar o que é novo a cada atualização
+MAX_KNOWN_LINKS = 2000
+
+
+class SportsTool(BaseTool):
+    """Ferramenta de notícias esportivas por time"""
+    
+    def __init__(self):
+        super().__init__(
+            name="sports_tool",
+            description="Últimas notícias esportivas de um time",
+            cache_ttl=CACHE_TTL_SPORTS,
+            refresh_interval=SPORTS_POLL_INTERVAL
+        )
+        self.session = None
+        # time normalizado -> {url: (horário em que foi visto, item)}, em ordem de chegada (mais recentes no fim)
+        self._teams: Dict[str, Dict[str, Tuple[float, NewsItem]]] = {}
+        # fonte (feed ou portal) -> {url: título} já examinados
+        self._known_links: Dict[str, Dict[str, str]] = {}
+        # url -> cabeçalhos de requisição condicional (ETag / Last-Modified)
+        self._validators: Dict[str, Dict[str, str]] = {}
+        self._refresh_lock = asyncio.Lock()
+        self._poller: Optional[asyncio.Task] = None
+        self.last_refresh: Optional[float] = None
+        for team in FAVORITE_TEAMS:
+            if team.strip():
+                self._teams[normalize_text(team)] = {}
+        
+    def get_parameters(self) -> List[Dict[str, Any]]:
+        """Retorna parâmetros aceitos pela ferramenta"""
+        return [
+            {
+                'name': 'team',
+                'type': 'string',
+                'required': True,
+                'description': 'Time (ou "esportes" para todos)'
+            },
+            {
+                'name': 'limit',
+                'type': 'integer',
+                'required': False,
+                'default': 3,
+                'description': 'Número máximo de notícias (1-10)'
+            }
+        ]
+        
+    async def execute(self, params: Dict[str, Any]) -> ToolResult:
+        """Responde a partir do estado já montado por time (mantido pela atualização periódica)"""
+        team = normalize_text(params.get('team', '') or GENERAL_TEAM)
+        limit = min(max(params.get('limit', 3), 1), 10)
+        
+        try:
+            if team != GENERAL_TEAM and team not in self._teams:
+                # Time novo: passa a ser acompanhado e recebe uma primeira carga
+                self._teams[team] = {}
+                await self.refresh([team])
+            elif not self._poller and self._stale():
+                # Sem atualização periódica: carrega sob demanda
+                await self.refresh()
+        except Exception as e:
+            logger.error(f"Erro ao atualizar notícias esportivas: {e}")
+            raise ToolExecutionError(f"Erro na busca de esportes: {str(e)}")
+            
+        items = self.latest(team, limit)
+        if not items:
+            return ToolResult.failure(f"Nenhuma notícia esportiva encontrada para '{team}'")
+            
+        return ToolResult.found(team, items)
+        
+    def latest(self, team: str, limit: int) -> List[NewsItem]:
+        """Itens mais recentes de um time (ou de todos, para GENERAL_TEAM)"""
+        if team != GENERAL_TEAM:
+            store = self._teams.get(team, {})
+            return [item for _, (_, item) in zip(range(limit), reversed(store.values()))]
+        newest = [entry for store in self._teams.values()
+                  for _, entry in zip(range(limit), reversed(store.values()))]
+        newest.sort(key=lambda entry: entry[0], reverse=True)
+        return [item for _, item in newest[:limit]]
+        
+    def _stale(self) -> bool:
+        return self.last_refresh is None or time.monotonic() - self.last_refresh > self.cache_ttl
+        
+    def start_polling(self) -> None:
+        """Inicia a atualização periódica (uma vez, fora do contexto do update atual)"""
+        if self._poller or SPORTS_POLL_INTERVAL <= 0:
+            return
+        # Contexto vazio: a task não herda o deadline nem o trace do update que a criou
+        self._poller = contextvars.Context().run(asyncio.ensure_future, self._poll_forever())
+        
+    async def _poll_forever(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Erro na atualização periódica de esportes: {e}")
+            await asyncio.sleep(SPORTS_POLL_INTERVAL)
+                
+    async def refresh(self, teams: Optional[List[str]] = None) -> int:
+        """
+        Consulta feeds e portais em paralelo e incorpora apenas os itens novos ou alterados
+        
+        Args:
+            teams: Times cujos feeds serão consultados (padrão: todos acompanhados)
+            
+        Returns:
+            Quantidade de itens novos
+        """
+        if not self.session:
+            self.session = aiohttp.ClientSession(headers={'User-Agent': USER_AGENT})
+            
+        async with self._refresh_lock:
+            teams = teams or list(self._teams)
+            with metrics.timer("sports_refresh_seconds"):
+                results = await asyncio.gather(
+                    *(self._poll_feed(team) for team in teams),
+                    *(self._poll_site(site, teams) for site in SPORTS_SITES),
+                    return_exceptions=True
+                )
+            added = 0
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.warning(f"Erro ao atualizar fonte esportiva: {result}")
+                else:
+                    added += result
+            self.last_refresh = time.monotonic()
+            logger.info(f"Esportes atualizados: {added} itens novos ({len(teams)} times)")
+            return added
+            
+    async def _get(self, url: str) -> Optional[str]:
+        """GET condicional: None se o conteúdo não mudou desde a última consulta"""
+        timeout = aiohttp.ClientTimeout(total=remaining_timeout(REQUEST_TIMEOUT))
+        async with self.session.get(url, headers=self._validators.get(url, {}), timeout=timeout) as response:
+            if response.status == 304:
+                return None
+            if response.status != 200:
+                raise Exception(f"HTTP {response.status} em {url}")
+            validators = {}
+            if response.headers.get('ETag'):
+                validators['If-None-Match'] = response.headers['ETag']
+            if response.headers.get('Last-Modified'):
+                validators['If-Modified-Since'] = response.headers['Last-Modified']
+            self._validators[url] = validators
+            return await response.text()
+            
+    async def _poll_feed(self, team: str) -> int:
+        """Feed do Google News do time"""
+        url = f"{GOOGLE_NEWS_RSS_BASE}?q={quote_plus(team + ' futebol')}&hl=pt-BR&gl=BR&ceid=BR:pt-419"
+        content = await self._get(url)
+        if content is None:
+            return 0
+        known = self._known_links.setdefault(url, {})
+        added = 0
+        # Parse numa thread: o event loop continua atendendo os updates enquanto isso
+        items = await asyncio.to_thread(parse_rss, content, SPORTS_ITEMS_PER_TEAM, RSS_PARSER)
+        for item in reversed(items):
+            if known.get(item.url) != item.title:
+                known[item.url] = item.title
+                added += self._add(team, item)
+        self._trim(known)
+        return added
+        
+    async def _poll_site(self, site: str, teams: List[str]) -> int:
+        """Portal esportivo: examina apenas os links novos ou com título alterado"""
+        content = await self._get(site)
+        known = self._known_links.setdefault(site, {})
+        fresh: List[Tuple[str, str]] = []
+        if content is not None:
+            for href, title in await asyncio.to_thread(list, iter_links(content, HTML_PARSER)):
+                url = urljoin(site, href)
+                if known.get(url) != title:
+                    known[url] = title
+                    fresh.append((url, title))
+            self._trim(known)
+                
+        # Times sem carga anterior também olham os links já conhecidos do portal
+        added = 0
+        for team in teams:
+            links = known.items() if not self._teams[team] else fresh
+            for url, title in links:
+                if self._mentions(team, url, title):
+                    added += self._add(team, NewsItem(title, url, None, site))
+        return added
+        
+    def _trim(self, known: Dict[str, str]) -> None:
+        while len(known) > MAX_KNOWN_LINKS:
+            del known[next(iter(known))]
+            
+    def _mentions(self, team: str, url: str, title: str) -> bool:
+        """Link de matéria (título com várias palavras) que cita o time"""
+        if len(title) <= 15 or title.count(' ') < 2:
+            return False
+        return team in normalize_text(title) or team.replace(' ', '-') in url.lower()
+        
+    def _add(self, team: str, item: NewsItem) -> int:
+        """Incorpora um item ao time (0 se já conhecido; um título editado substitui o anterior)"""
+        store = self._teams[team]
+        if item.url in store:
+            seen, current = store[item.url]
+            if current.title != item.title:
+                store[item.url] = (seen, item)
+                metrics.counter("sports_updated_items_total", team=team).inc()
+            return 0
+        store[item.url] = (time.time(), item)
+        if len(store) > SPORTS_ITEMS_PER_TEAM:
+            del store[next(iter(store))]
+        metrics.counter("sports_new_items_total", team=team).inc()
+        return 1
+        
+    async def cleanup(self):
+        """Limpa recursos da ferramenta"""
+        if self._poller:
+            self._poller.cancel()
+            self._poller = None
+        if self.session:
+            await self.session.close()
+            self.session = None
@@ -0,0 +1,109 @@
+"""
+Manifesto de plugins de ferramentas MCP
+Descreve as ferramentas disponíveis (módulo, vocabulário de ativação, TTL e
+limites) sem importar seus módulos; a instância é criada no primeiro uso
+"""
+
+import importlib
+import importlib.util
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from .base_tool import BaseTool, ToolExecutionError
+
+logger = logging.getLogger(__name__)
+
+
+class ToolSpec:
+    """Entrada do manifesto: metadados de uma ferramenta ainda não carregada"""
+
+    __slots__ = ("name", "module", "class_name", "description", "triggers", "examples", "cache_ttl",
+                 "timeout", "max_concurrency", "parameters", "failed")
+
+    def __init__(self, entry: Dict[str, Any]):
+        self.name: str = entry["name"]
+        self.module: str = entry["module"]
+        self.class_name: str = entry["class"]
+        self.description: str = entry.get("description", "")
+        self.triggers = tuple(trigger.lower() for trigger in entry.get("triggers", ()))
+        # Frases de exemplo usadas pelo roteamento por embeddings
+        self.examples = tuple(entry.get("examples", ()))
+        self.cache_ttl: int = _resolve_ttl(entry.get("cache_ttl", 3600))
+        limits = entry.get("limits", {})
+        self.timeout: Optional[float] = limits.get("timeout")
+        self.max_concurrency: int = int(limits.get("max_concurrency", 0))
+        self.parameters: List[Dict[str, Any]] = entry.get("parameters", [])
+        self.failed = False
+
+    def is_available(self) -> bool:
+        """Verifica se o módulo existe (sem executá-lo)"""
+        try:
+            return importlib.util.find_spec(self.module) is not None
+        except (ImportError, ValueError):
+            return False
+
+    def matches(self, message_lower: str) -> bool:
+        """Verifica se a mensagem contém algum termo de ativação"""
+        return any(trigger in message_lower for trigger in self.triggers)
+
+    def instantiate(self) -> BaseTool:
+        """Importa o módulo e cria a ferramenta com o TTL do manifesto"""
+        try:
+            module = importlib.import_module(self.module)
+            tool = getattr(module, self.class_name)()
+        except Exception as e:
+            self.failed = True
+            raise ToolExecutionError(f"Não foi possível carregar '{self.name}' ({self.module}): {e}")
+        if not isinstance(tool, BaseTool):
+            self.failed = True
+            raise ToolExecutionError(f"'{self.module}.{self.class_name}' não herda de BaseTool")
+        tool.cache_ttl = self.cache_ttl
+        return tool
+
+    def get_tool_info(self) -> Dict[str, Any]:
+        """Informações equivalentes a BaseTool.get_tool_info, sem instanciar"""
+        return {
+            'name': self.name,
+            'description': self.description,
+            'parameters': self.parameters,
+            'usage_example': f"{self.name}({', '.join(p['name'] for p in self.parameters)})",
+            'execution_count': 0,
+            'last_execution': None,
+            'loaded': False,
+        }
+
+
+def _resolve_ttl(value: Any) -> int:
+    """Aceita segundos ou o nome de uma configuração (ex.: CACHE_TTL_NEWS)"""
+    if isinstance(value, str):
+        return int(getattr(settings, value))
+    return int(value)
+
+
+def load_manifest(path: str) -> List[ToolSpec]:
+    """
+    Lê o manifesto e retorna as ferramentas cujo módulo existe
+
+    Args:
+        path: Caminho do arquivo JSON do manifesto
+
+    Returns:
+        Lista de ToolSpec na ordem do manifesto (prioridade de roteamento)
+    """
+    with open(path, encoding="utf-8") as manifest:
+        entries = json.load(manifest).get("tools", [])
+
+    specs = []
+    for entry in entries:
+        try:
+            spec = ToolSpec(entry)
+        except (KeyError, AttributeError, TypeError, ValueError) as e:
+            logger.warning(f"Entrada inválida no manifesto de ferramentas: {entry!r} ({e})")
+            continue
+        if not spec.is_available():
+            logger.warning(f"Ferramenta '{spec.name}' ignorada: módulo '{spec.module}' não encontrado")
+            continue
+        specs.append(spec)
+    return specs
@@ -0,0 +1,162 @@
+"""
+Resultados tipados das ferramentas
+NewsItem e ToolResult usam __slots__ (sem dicionário por instância) e os
+nomes das fontes, repetidos em quase todos os itens, são internados: os
+itens de uma mesma fonte apontam para a mesma string. No cache em disco o
+resultado vira uma lista posicional em JSON, sem repetir os nomes dos
+campos a cada item. Os renderizadores montam o contexto do prompt e as
+respostas de texto direto dos objetos.
+"""
+
+import json
+import sys
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Escape do Markdown (v1) do Telegram numa única passada
+_MARKDOWN_ESCAPES = str.maketrans({"_": "\\_", "*": "\\*", "`": "\\`", "[": "\\["})
+
+
+class NewsItem:
+    """
+    Item de resultado: notícia, matéria esportiva ou linha do clima
+
+    Args:
+        title: Título (ou a linha pronta, no clima)
+        url: Link da matéria (vazio quando não há)
+        published: Data de publicação como veio da fonte (RFC 822 nos feeds)
+        source: Nome ou endereço da fonte
+    """
+
+    __slots__ = ("title", "url", "published", "source")
+
+    def __init__(self, title: str, url: str = "", published: Optional[str] = None, source: str = ""):
+        self.title = title
+        self.url = url
+        self.published = published
+        self.source = sys.intern(source) if source else ""
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "NewsItem":
+        return cls(data.get('title') or "Sem título", data.get('url') or "", data.get('published'),
+                   data.get('source') or "")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'title': self.title, 'url': self.url, 'published': self.published, 'source': self.source}
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, NewsItem):
+            return NotImplemented
+        return (self.title, self.url, self.published, self.source) == \
+            (other.title, other.url, other.published, other.source)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"NewsItem({self.title!r}, {self.url!r}, {self.published!r}, {self.source!r})"
+
+
+class ToolResult:
+    """
+    Resultado de uma execução de ferramenta
+
+    Args:
+        success: Se a ferramenta encontrou algo
+        items: Itens encontrados, em ordem de relevância
+        message: Motivo da falha (resultados sem sucesso)
+        query: Consulta atendida
+        timestamp: Horário da execução (ISO 8601)
+    """
+
+    __slots__ = ("success", "items", "message", "query", "timestamp")
+
+    def __init__(self, success: bool, items: Iterable[NewsItem] = (), message: str = "", query: str = "",
+                 timestamp: Optional[str] = None):
+        self.success = success
+        self.items: Tuple[NewsItem, ...] = tuple(items)
+        self.message = message
+        self.query = query
+        self.timestamp = timestamp
+
+    @classmethod
+    def found(cls, query: str, items: Iterable[NewsItem]) -> "ToolResult":
+        """Resultado com itens, marcado com o horário atual"""
+        return cls(True, items, query=query, timestamp=datetime.now().isoformat())
+
+    @classmethod
+    def failure(cls, message: str) -> "ToolResult":
+        return cls(False, message=message)
+
+    @classmethod
+    def coerce(cls, value: Any) -> "ToolResult":
+        """Aceita também o dicionário {'success', 'data', ...} de ferramentas antigas"""
+        if isinstance(value, cls):
+            return value
+        items = [item if isinstance(item, NewsItem) else NewsItem.from_dict(item) for item in value.get('data') or ()]
+        return cls(bool(value.get('success')), items, value.get('message') or "", value.get('query') or "",
+                   value.get('timestamp'))
+
+    @property
+    def count(self) -> int:
+        return len(self.items)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Formato de dicionário (exibição e integrações)"""
+        if not self.success:
+            return {'success': False, 'message': self.message, 'data': []}
+        return {'success': True, 'query': self.query, 'count': self.count,
+                'data': [item.to_dict() for item in self.items], 'timestamp': self.timestamp}
+
+    def dumps(self) -> str:
+        """Serializa para o cache em disco (lista posicional em JSON)"""
+        return json.dumps(
+            [self.success, self.message, self.query, self.timestamp,
+             [(item.title, item.url, item.published, item.source) for item in self.items]],
+            ensure_ascii=False, separators=(",", ":")
+        )
+
+    @classmethod
+    def loads(cls, text: str) -> "ToolResult":
+        """Lê um resultado gravado por dumps"""
+        data = json.loads(text)
+        if isinstance(data, dict):
+            # Entrada gravada antes do formato posicional
+            return cls.coerce(data)
+        success, message, query, timestamp, rows = data
+        return cls(success, [NewsItem(*row) for row in rows], message, query, timestamp)
+
+    def __repr__(self) -> str:
+        if not self.success:
+            return f"ToolResult(failure, {self.message!r})"
+        return f"ToolResult({self.query!r}, {list(self.items)!r})"
+
+
+def render_prompt(result: ToolResult) -> str:
+    """Contexto do resultado para o prompt do modelo"""
+    if not result.success:
+        return f"Ferramenta não conseguiu encontrar informações: {result.message or 'Erro desconhecido'}"
+    if not result.items:
+        return "Nenhuma informação encontrada."
+    return "INFORMAÇÕES ENCONTRADAS:\n" + "\n".join(
+        [f"📰 {item.title} (Fonte: {item.source or 'Fonte desconhecida'})" for item in result.items]
+    )
+
+
+def render_plain(result: ToolResult, header: str, limit: int = 5, with_source: bool = True) -> str:
+    """Lista numerada em texto simples, com os links"""
+    lines: List[str] = [header, ""]
+    for i, item in enumerate(result.items[:limit], 1):
+        lines.append(f"{i}. {item.title} ({item.source})" if with_source and item.source else f"{i}. {item.title}")
+        if item.url:
+            lines.append(f"   {item.url}")
+    return "\n".join(lines)
+
+
+def render_markdown(result: ToolResult, header: str, limit: int = 3) -> str:
+    """Lista numerada em Markdown do Telegram, com títulos e fontes escapados"""
+    parts = [f"{header}\n\n"]
+    for i, item in enumerate(result.items[:limit], 1):
+        title = item.title.translate(_MARKDOWN_ESCAPES)
+        source = (item.source or "Fonte desconhecida").translate(_MARKDOWN_ESCAPES)
+        parts.append(f"{i}. {title}\n   📍 {source}\n\n")
+    return "".join(parts)
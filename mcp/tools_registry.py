@@ -3,9 +3,22 @@ Registro de ferramentas MCP
 Gerencia todas as ferramentas disponíveis no sistema
 """
 
+import asyncio
+import contextvars
+import json
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
+from config.settings import (
+    DEFAULT_CITY, DEFAULT_COUNTRY, FAVORITE_TEAMS, INTENT_ROUTER, TOOLS_MANIFEST, TOOL_CACHE_PATH
+)
+from utils.cache_manager import CacheManager
+from utils.deadline import remaining_timeout
+from utils.metrics import metrics
+from utils.text import normalize_text
+from utils.tracing import span
 from .base_tool import BaseTool, ToolExecutionError, ToolValidationError
+from .tool_manifest import ToolSpec, load_manifest
+from .tool_result import ToolResult
 
 logger = logging.getLogger(__name__)
 
@@ -13,9 +26,36 @@ logger = logging.getLogger(__name__)
 class ToolsRegistry:
     """Registro central de ferramentas MCP"""
     
-    def __init__(self):
+    def __init__(self, manifest_path: Optional[str] = None, cache_path: str = ""):
         self._tools: Dict[str, BaseTool] = {}
-        self._cache: Dict[str, Any] = {}
+        self._specs: Dict[str, ToolSpec] = {}
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+        self._cache = self._new_cache(cache_path)
+        self._router = None
+        self._router_failed = not INTENT_ROUTER
+        self._extractors: Dict[str, Callable[[str], Optional[Dict[str, Any]]]] = {
+            'news_tool': self._extract_news_params,
+            'sports_tool': self._extract_sports_params,
+            'weather_tool': self._extract_weather_params,
+        }
+        if manifest_path:
+            self.load_manifest(manifest_path)
+        
+    def load_manifest(self, path: str) -> None:
+        """
+        Registra as ferramentas descritas no manifesto sem importá-las
+        
+        Args:
+            path: Caminho do arquivo JSON do manifesto
+        """
+        try:
+            specs = load_manifest(path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Erro ao ler manifesto de ferramentas '{path}': {e}")
+            return
+        for spec in specs:
+            self._specs[spec.name] = spec
+        logger.info(f"Manifesto carregado: {', '.join(self._specs) or 'nenhuma ferramenta'}")
         
     def register_tool(self, tool: BaseTool) -> None:
         """
@@ -40,7 +80,21 @@ class ToolsRegistry:
         Returns:
             Instância da ferramenta ou None se não encontrada
         """
-        return self._tools.get(name)
+        tool = self._tools.get(name)
+        if tool is None:
+            spec = self._specs.get(name)
+            if spec is None or spec.failed:
+                return None
+            # Primeira invocação: importar e instanciar a ferramenta
+            tool = spec.instantiate()
+            self._tools[name] = tool
+            logger.info(f"Ferramenta '{name}' carregada sob demanda ({spec.module})")
+        return tool
+        
+    def _entries(self) -> List[Any]:
+        """Ferramentas carregadas e entradas do manifesto ainda não carregadas"""
+        pending = [spec for name, spec in self._specs.items() if name not in self._tools and not spec.failed]
+        return list(self._tools.values()) + pending
         
     def list_tools(self) -> List[Dict[str, Any]]:
         """
@@ -49,9 +103,9 @@ class ToolsRegistry:
         Returns:
             Lista com informações de todas as ferramentas
         """
-        return [tool.get_tool_info() for tool in self._tools.values()]
+        return [entry.get_tool_info() for entry in self._entries()]
         
-    async def execute_tool(self, name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    async def execute_tool(self, name: str, params: Dict[str, Any]) -> ToolResult:
         """
         Executa uma ferramenta específica
         
@@ -70,29 +124,50 @@ class ToolsRegistry:
         if not tool.validate_input(params):
             raise ToolValidationError(f"Parâmetros inválidos para ferramenta '{name}'")
             
-        # Verificar cache
-        cache_key = f"{name}:{hash(str(params))}"
-        if cache_key in self._cache and tool.should_use_cache():
-            logger.info(f"Usando cache para ferramenta '{name}'")
-            return self._cache[cache_key]
+        # Verificar cache (chave estável entre processos, para o cache compartilhado)
+        cache_key = f"{name}:{json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)}"
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Usando cache para ferramenta '%s'", name)
+            metrics.counter("tool_cache_hits_total", tool=name).inc()
+            return cached
+        metrics.counter("tool_cache_misses_total", tool=name).inc()
             
         try:
-            # Executar ferramenta
-            result = await tool.execute(params)
+            # Executar ferramenta respeitando o deadline do update
+            with metrics.timer("tool_latency_seconds", tool=name), span("tool"):
+                result = ToolResult.coerce(await self._run_limited(name, tool, params))
             
             # Atualizar estatísticas
             tool.update_execution_stats()
             
-            # Armazenar no cache
-            self._cache[cache_key] = result
+            # Armazenar no cache pelo TTL da ferramenta (limitado pela atualização do seu índice)
+            self._cache.set(cache_key, result, tool.result_ttl())
             
-            logger.info(f"Ferramenta '{name}' executada com sucesso")
+            logger.debug("Ferramenta '%s' executada com sucesso", name)
             return result
             
         except Exception as e:
             logger.error(f"Erro ao executar ferramenta '{name}': {e}")
             raise ToolExecutionError(f"Erro na execução da ferramenta '{name}': {str(e)}")
             
+    async def _run_limited(self, name: str, tool: BaseTool, params: Dict[str, Any]) -> ToolResult:
+        """Executa respeitando o deadline e os limites do manifesto (timeout e concorrência)"""
+        spec = self._specs.get(name)
+        timeout = remaining_timeout(spec.timeout if spec else None)
+        if not spec or spec.max_concurrency <= 0:
+            return await asyncio.wait_for(tool.execute(params), timeout=timeout)
+        
+        limit = self._limits.get(name)
+        if limit is None:
+            limit = self._limits[name] = asyncio.Semaphore(spec.max_concurrency)
+        
+        async def run() -> ToolResult:
+            async with limit:
+                return await tool.execute(params)
+        
+        return await asyncio.wait_for(run(), timeout=timeout)
+        
     def get_tool_descriptions(self) -> str:
         """
         Retorna descrições de todas as ferramentas para o prompt do Ollama
@@ -101,10 +176,10 @@ class ToolsRegistry:
             String formatada com descrições das ferramentas
         """
         descriptions = []
-        for tool in self._tools.values():
-            desc = f"- {tool.name}: {tool.description}"
-            if tool.get_parameters():
-                params = [f"{p['name']}({p.get('type', 'string')})" for p in tool.get_parameters()]
+        for info in self.list_tools():
+            desc = f"- {info['name']}: {info['description']}"
+            if info['parameters']:
+                params = [f"{p['name']}({p.get('type', 'string')})" for p in info['parameters']]
                 desc += f" Parâmetros: {', '.join(params)}"
             descriptions.append(desc)
             
@@ -122,23 +197,74 @@ class ToolsRegistry:
         """
         message_lower = message.lower()
         
-        # Detectar ferramenta de notícias
-        news_keywords = ['noticia', 'notícia', 'news', 'última', 'recente']
-        if any(keyword in message_lower for keyword in news_keywords):
-            return self._extract_news_params(message)
-            
-        # Detectar ferramenta de esportes
-        sports_keywords = ['flamengo', 'futebol', 'esporte', 'time', 'jogo']
-        if any(keyword in message_lower for keyword in sports_keywords):
-            return self._extract_sports_params(message)
-            
-        # Detectar ferramenta de clima
-        weather_keywords = ['clima', 'tempo', 'weather', 'temperatura', 'chuva']
-        if any(keyword in message_lower for keyword in weather_keywords):
-            return self._extract_weather_params(message)
+        # Apenas ferramentas do manifesto, na ordem de prioridade, que carregaram sem erro
+        for spec in self._specs.values():
+            if not spec.failed and spec.matches(message_lower):
+                return self._tool_call(spec.name, message)
             
         return None
         
+    async def route(self, message: str) -> Optional[Dict[str, Any]]:
+        """
+        Detecta a ferramenta pela similaridade com os exemplos do manifesto
+        
+        Usa as palavras-chave (detect_tool_needed) quando os embeddings estão
+        indisponíveis ou nenhum exemplo é parecido o bastante.
+        
+        Args:
+            message: Mensagem do usuário
+            
+        Returns:
+            Dicionário com nome da ferramenta e parâmetros ou None
+        """
+        router = self._intent_router()
+        if router:
+            found = await router.classify(message)
+            if found:
+                from .intent_router import CHAT_LABEL
+                label = found[0]
+                spec = self._specs.get(label)
+                if label == CHAT_LABEL or (spec and not spec.failed):
+                    metrics.counter("intent_routes_total", method="embedding").inc()
+                    return None if label == CHAT_LABEL else self._tool_call(label, message)
+        metrics.counter("intent_routes_total", method="keywords").inc()
+        return self.detect_tool_needed(message)
+        
+    def _intent_router(self):
+        """Roteador por embeddings, criado no primeiro uso (NumPy só é importado aqui)"""
+        if self._router is None and not self._router_failed:
+            examples = self.intent_examples()
+            try:
+                from .intent_router import CHAT_EXAMPLES, CHAT_LABEL, IntentRouter
+            except ImportError as e:
+                logger.warning(f"Roteamento por embeddings desativado: {e}")
+                self._router_failed = True
+                return None
+            if not examples:
+                self._router_failed = True
+                return None
+            examples[CHAT_LABEL] = CHAT_EXAMPLES
+            self._router = IntentRouter(examples)
+        return self._router
+        
+    def intent_examples(self) -> Dict[str, Any]:
+        """Frases de exemplo do manifesto por ferramenta disponível"""
+        return {spec.name: spec.examples for spec in self._specs.values() if spec.examples and not spec.failed}
+        
+    def start_intent_router(self) -> None:
+        """Prepara os vetores dos exemplos em segundo plano, antes da primeira mensagem"""
+        router = self._intent_router()
+        if router and not router.ready:
+            # Contexto vazio: a task não herda o deadline nem o trace do update que a criou
+            contextvars.Context().run(asyncio.ensure_future, router.prepare())
+        
+    def _tool_call(self, name: str, message: str) -> Dict[str, Any]:
+        """Ferramenta e parâmetros extraídos da mensagem"""
+        extractor = self._extractors.get(name)
+        if extractor:
+            return extractor(message)
+        return {'tool': name, 'params': {'query': message}}
+        
     def _extract_news_params(self, message: str) -> Optional[Dict[str, Any]]:
         """Extrai parâmetros para ferramenta de notícias"""
         # Implementação básica - pode ser melhorada com NLP
@@ -154,11 +280,14 @@ class ToolsRegistry:
         
     def _extract_sports_params(self, message: str) -> Optional[Dict[str, Any]]:
         """Extrai parâmetros para ferramenta de esportes"""
-        if 'flamengo' in message.lower():
-            return {
-                'tool': 'sports_tool',
-                'params': {'team': 'flamengo', 'limit': 3}
-            }
+        message_normalized = normalize_text(message)
+        for team in FAVORITE_TEAMS:
+            team = normalize_text(team)
+            if team and team in message_normalized:
+                return {
+                    'tool': 'sports_tool',
+                    'params': {'team': team, 'limit': 3}
+                }
         return {
             'tool': 'sports_tool',
             'params': {'team': 'esportes', 'limit': 3}
@@ -166,27 +295,52 @@ class ToolsRegistry:
         
     def _extract_weather_params(self, message: str) -> Optional[Dict[str, Any]]:
         """Extrai parâmetros para ferramenta de clima"""
-        # Assumir cidade padrão ou extrair da mensagem
+        # Índice local de cidades (sem geocodificação); senão, cidade padrão
+        from .weather_cities import find_city
+        found = find_city(message)
         return {
             'tool': 'weather_tool',
-            'params': {'city': 'Rio de Janeiro', 'country': 'BR'}
+            'params': {'city': found[0] if found else DEFAULT_CITY, 'country': DEFAULT_COUNTRY}
         }
         
+    def use_shared_cache(self, path: str) -> None:
+        """Troca o cache por um arquivo SQLite compartilhado com outros processos"""
+        self._cache.close()
+        self._cache = self._new_cache(path)
+        logger.info(f"Cache de ferramentas compartilhado em {path}")
+        
+    @staticmethod
+    def _new_cache(path: str) -> CacheManager:
+        # Resultados em memória como objetos; no arquivo compartilhado, no formato posicional
+        return CacheManager(path, dumps=ToolResult.dumps, loads=ToolResult.loads)
+        
     def clear_cache(self) -> None:
         """Limpa o cache de ferramentas"""
         self._cache.clear()
         logger.info("Cache de ferramentas limpo")
         
+    async def cleanup(self) -> None:
+        """Libera os recursos (sessões HTTP e cache compartilhado) das ferramentas registradas"""
+        self._cache.close()
+        for tool in self._tools.values():
+            cleanup = getattr(tool, 'cleanup', None)
+            if cleanup:
+                try:
+                    await cleanup()
+                except Exception as e:
+                    logger.warning(f"Erro ao limpar ferramenta '{tool.name}': {e}")
+        
     def get_stats(self) -> Dict[str, Any]:
         """Retorna estatísticas do registro de ferramentas"""
         total_executions = sum(tool.execution_count for tool in self._tools.values())
         return {
-            'total_tools': len(self._tools),
+            'total_tools': len(self._entries()),
+            'loaded_tools': len(self._tools),
             'total_executions': total_executions,
             'cache_size': len(self._cache),
-            'tools': [tool.get_tool_info() for tool in self._tools.values()]
+            'tools': self.list_tools()
         }
 
 
-# Instância global do registro
-tools_registry = ToolsRegistry()
+# Instância global do registro (lê apenas o manifesto; ferramentas são importadas no primeiro uso)
+tools_registry = ToolsRegistry(TOOLS_MANIFEST, TOOL_CACHE_PATH)
@@ -0,0 +1,147 @@
+"""
+Índice cidade → coordenadas para a ferramenta de clima
+Permite resolver cidades conhecidas (com erros de digitação e sem acentos)
+sem chamar a API de geocodificação
+"""
+
+import difflib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.text import normalize_text
+
+# Nome exibido, latitude, longitude
+CityCoordinates = Tuple[str, float, float]
+
+_CITIES = (
+    # Capitais
+    ("Rio de Janeiro", -22.9068, -43.1729),
+    ("São Paulo", -23.5505, -46.6333),
+    ("Belo Horizonte", -19.9167, -43.9345),
+    ("Brasília", -15.7939, -47.8828),
+    ("Salvador", -12.9777, -38.5016),
+    ("Fortaleza", -3.7319, -38.5267),
+    ("Recife", -8.0476, -34.8770),
+    ("Porto Alegre", -30.0346, -51.2177),
+    ("Curitiba", -25.4284, -49.2733),
+    ("Manaus", -3.1190, -60.0217),
+    ("Belém", -1.4558, -48.4902),
+    ("Goiânia", -16.6869, -49.2648),
+    ("Florianópolis", -27.5954, -48.5480),
+    ("Vitória", -20.3155, -40.3128),
+    ("Natal", -5.7945, -35.2110),
+    ("João Pessoa", -7.1195, -34.8450),
+    ("Maceió", -9.6658, -35.7350),
+    ("Aracaju", -10.9472, -37.0731),
+    ("Teresina", -5.0892, -42.8019),
+    ("São Luís", -2.5307, -44.3068),
+    ("Campo Grande", -20.4697, -54.6201),
+    ("Cuiabá", -15.6014, -56.0979),
+    ("Porto Velho", -8.7612, -63.9004),
+    ("Rio Branco", -9.9754, -67.8249),
+    ("Macapá", 0.0349, -51.0694),
+    ("Boa Vista", 2.8235, -60.6758),
+    ("Palmas", -10.2491, -48.3243),
+    # Região metropolitana do Rio e outras cidades grandes
+    ("Niterói", -22.8832, -43.1034),
+    ("São Gonçalo", -22.8268, -43.0634),
+    ("Duque de Caxias", -22.7856, -43.3117),
+    ("Nova Iguaçu", -22.7592, -43.4511),
+    ("Petrópolis", -22.5050, -43.1787),
+    ("Campinas", -22.9099, -47.0626),
+    ("Santos", -23.9608, -46.3336),
+    # Bairros do Rio de Janeiro
+    ("Copacabana", -22.9711, -43.1822),
+    ("Ipanema", -22.9838, -43.2096),
+    ("Leblon", -22.9840, -43.2238),
+    ("Botafogo", -22.9519, -43.1840),
+    ("Tijuca", -22.9250, -43.2320),
+    ("Barra da Tijuca", -23.0004, -43.3659),
+    ("Recreio dos Bandeirantes", -23.0180, -43.4630),
+    ("Jacarepaguá", -22.9630, -43.3650),
+    ("Méier", -22.9020, -43.2780),
+    ("Madureira", -22.8720, -43.3370),
+)
+
+# Apelidos comuns
+_ALIASES = {
+    "rio": "Rio de Janeiro",
+    "rj": "Rio de Janeiro",
+    "sp": "São Paulo",
+    "sampa": "São Paulo",
+    "bh": "Belo Horizonte",
+    "poa": "Porto Alegre",
+    "floripa": "Florianópolis",
+    "barra": "Barra da Tijuca",
+    "recreio": "Recreio dos Bandeirantes",
+}
+
+# Nomes com menos letras que isso só casam exatamente (evita "rio" ≈ "rj")
+_FUZZY_MIN_LENGTH = 5
+_FUZZY_CUTOFF = 0.85
+
+
+def _build_index() -> Dict[str, CityCoordinates]:
+    index = {normalize_text(name): (name, lat, lon) for name, lat, lon in _CITIES}
+    for alias, name in _ALIASES.items():
+        index[alias] = index[normalize_text(name)]
+    return index
+
+
+CITY_INDEX: Dict[str, CityCoordinates] = _build_index()
+# Candidatos ao casamento aproximado agrupados pela inicial (erros na primeira letra são raros)
+_FUZZY_KEYS: Dict[str, List[str]] = {}
+for _key in CITY_INDEX:
+    if len(_key) >= _FUZZY_MIN_LENGTH:
+        _FUZZY_KEYS.setdefault(_key[0], []).append(_key)
+_MAX_WORDS = max(len(key.split()) for key in CITY_INDEX)
+
+
+def resolve_city(name: str) -> Optional[CityCoordinates]:
+    """
+    Resolve o nome de uma cidade no índice
+
+    Args:
+        name: Nome digitado pelo usuário (aceita erros leves e falta de acentos)
+
+    Returns:
+        (nome exibido, latitude, longitude) ou None se a cidade não for conhecida
+    """
+    key = normalize_text(name)
+    found = CITY_INDEX.get(key)
+    if found or len(key) < _FUZZY_MIN_LENGTH:
+        return found
+    close = closest_key(key, _FUZZY_KEYS.get(key[0], ()))
+    return CITY_INDEX[close] if close else None
+
+
+def closest_key(key: str, candidates: Iterable[str]) -> Optional[str]:
+    """
+    Nome normalizado mais parecido com `key` entre os candidatos
+
+    Args:
+        key: Nome normalizado digitado pelo usuário
+        candidates: Nomes normalizados conhecidos
+
+    Returns:
+        O candidato mais próximo ou None se nenhum for parecido o bastante
+    """
+    if len(key) < _FUZZY_MIN_LENGTH:
+        return None
+    candidates = [candidate for candidate in candidates
+                  if candidate[:1] == key[:1] and abs(len(candidate) - len(key)) <= 3]
+    close = difflib.get_close_matches(key, candidates, n=1, cutoff=_FUZZY_CUTOFF)
+    return close[0] if close else None
+
+
+def find_city(message: str) -> Optional[CityCoordinates]:
+    """Procura a menção a uma cidade conhecida na mensagem (prefere nomes mais longos)"""
+    words = [word.strip("?!.,;:") for word in normalize_text(message).split()]
+    for size in range(min(_MAX_WORDS, len(words)), 0, -1):
+        for start in range(len(words) - size + 1):
+            phrase = " ".join(words[start:start + size])
+            if size == 1 and len(phrase) < 2:
+                continue
+            found = CITY_INDEX.get(phrase) or (resolve_city(phrase) if len(phrase) >= 6 else None)
+            if found:
+                return found
+    return None
@@ -0,0 +1,241 @@
+"""
+Ferramenta de Clima MCP
+Consulta o clima atual na OpenWeather com cache por coordenadas arredondadas
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import aiohttp
+
+from config.settings import (
+    OPENWEATHER_API_KEY, OPENWEATHER_API_URL, CACHE_TTL_WEATHER, DEFAULT_CITY, DEFAULT_COUNTRY,
+    REQUEST_TIMEOUT, WEATHER_COORD_PRECISION
+)
+from utils.deadline import remaining_timeout
+from utils.metrics import metrics
+from utils.text import normalize_text
+from .base_tool import BaseTool, ToolExecutionError
+from .tool_result import NewsItem, ToolResult
+from .weather_cities import CityCoordinates, closest_key, resolve_city
+
+logger = logging.getLogger(__name__)
+
+# Chave do cache: coordenadas arredondadas (bairros próximos compartilham a entrada)
+BucketKey = Tuple[float, float]
+
+# Requisições simultâneas à API em consultas com várias cidades
+MAX_CONCURRENT_REQUESTS = 5
+# Entradas no cache antes de descartar as expiradas
+MAX_CACHE_ENTRIES = 512
+
+
+class WeatherTool(BaseTool):
+    """Ferramenta para consultar o clima atual"""
+    
+    def __init__(self):
+        super().__init__(
+            name="weather_tool",
+            description="Clima atual de uma ou mais cidades",
+            cache_ttl=CACHE_TTL_WEATHER
+        )
+        self.session = None
+        self._cache: Dict[BucketKey, Tuple[float, Dict[str, Any]]] = {}
+        self._pending: Dict[BucketKey, asyncio.Task] = {}
+        # Cidades fora do índice já resolvidas pela API (país -> nome normalizado -> coordenadas)
+        self._learned: Dict[str, Dict[str, CityCoordinates]] = {}
+        
+    def get_parameters(self) -> List[Dict[str, Any]]:
+        """Retorna parâmetros aceitos pela ferramenta"""
+        return [
+            {
+                'name': 'city',
+                'type': 'string',
+                'required': False,
+                'default': DEFAULT_CITY,
+                'description': 'Cidade ou bairro'
+            },
+            {
+                'name': 'country',
+                'type': 'string',
+                'required': False,
+                'default': DEFAULT_COUNTRY,
+                'description': 'Código do país (BR, US...)'
+            },
+            {
+                'name': 'cities',
+                'type': 'list',
+                'required': False,
+                'description': 'Várias cidades de uma vez (ex.: resumo matinal)'
+            }
+        ]
+        
+    async def execute(self, params: Dict[str, Any]) -> ToolResult:
+        """Executa a consulta de clima"""
+        cities = params.get('cities') or [params.get('city') or DEFAULT_CITY]
+        country = params.get('country') or DEFAULT_COUNTRY
+        
+        if not OPENWEATHER_API_KEY:
+            return ToolResult.failure("OPENWEATHER_API_KEY não configurada")
+            
+        try:
+            reports = await self.fetch_many(cities, country)
+        except Exception as e:
+            logger.error(f"Erro ao consultar clima: {e}")
+            raise ToolExecutionError(f"Erro na consulta de clima: {str(e)}")
+            
+        data = [report for report in reports if report]
+        if not data:
+            return ToolResult.failure(f"Não encontrei o clima de {', '.join(cities)}")
+            
+        return ToolResult.found(', '.join(cities), data)
+        
+    async def fetch_many(self, cities: List[str], country: str = DEFAULT_COUNTRY) -> List[Optional[NewsItem]]:
+        """
+        Consulta várias cidades com uma requisição por coordenada distinta
+        
+        Args:
+            cities: Nomes das cidades
+            country: Código do país das cidades
+            
+        Returns:
+            Relatórios na mesma ordem de cities (None para cidades não encontradas)
+        """
+        if not self.session:
+            self.session = aiohttp.ClientSession()
+            
+        limit = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        
+        async def lookup(city: str) -> Optional[NewsItem]:
+            resolved = self._resolve(city, country)
+            try:
+                if resolved:
+                    name, lat, lon = resolved
+                    report = await self._get_bucket(self._bucket(lat, lon), {'lat': lat, 'lon': lon}, limit)
+                else:
+                    # Cidade fora do índice: a própria consulta por nome informa as coordenadas
+                    report = await self._fetch_by_name(city, country, limit)
+                    name = city.strip().title()
+            except Exception as e:
+                logger.warning(f"Erro ao consultar clima de '{city}': {e}")
+                return None
+            if report is None:
+                return None
+            return self._render(name, report)
+            
+        return list(await asyncio.gather(*(lookup(city) for city in cities)))
+        
+    def _resolve(self, city: str, country: str) -> Optional[CityCoordinates]:
+        """Coordenadas do índice local (apenas Brasil) ou de cidades já aprendidas (aceita erros leves)"""
+        key = normalize_text(city)
+        learned = self._learned.get(country.lower(), {})
+        if key in learned:
+            return learned[key]
+        if country.upper() == "BR":
+            found = resolve_city(city)
+            if found:
+                return found
+        close = closest_key(key, learned)
+        return learned[close] if close else None
+        
+    def _bucket(self, lat: float, lon: float) -> BucketKey:
+        return (round(lat, WEATHER_COORD_PRECISION), round(lon, WEATHER_COORD_PRECISION))
+        
+    def _cached(self, key: BucketKey) -> Optional[Dict[str, Any]]:
+        entry = self._cache.get(key)
+        if entry and time.monotonic() - entry[0] < self.cache_ttl:
+            return entry[1]
+        return None
+        
+    def _store(self, key: BucketKey, report: Dict[str, Any]) -> None:
+        if len(self._cache) >= MAX_CACHE_ENTRIES:
+            now = time.monotonic()
+            self._cache = {k: v for k, v in self._cache.items() if now - v[0] < self.cache_ttl}
+            if len(self._cache) >= MAX_CACHE_ENTRIES:
+                del self._cache[min(self._cache, key=lambda k: self._cache[k][0])]
+        self._cache[key] = (time.monotonic(), report)
+        
+    async def _get_bucket(self, key: BucketKey, query: Dict[str, Any],
+                          limit: asyncio.Semaphore) -> Optional[Dict[str, Any]]:
+        """Clima de uma coordenada: cache, requisição já em andamento ou nova requisição"""
+        cached = self._cached(key)
+        if cached is not None:
+            metrics.counter("weather_cache_hits_total").inc()
+            return cached
+            
+        pending = self._pending.get(key)
+        if pending is not None:
+            metrics.counter("weather_cache_hits_total").inc()
+            return await asyncio.shield(pending)
+            
+        metrics.counter("weather_cache_misses_total").inc()
+        # A requisição roda em uma task própria: se quem pediu for cancelado, as
+        # demais consultas à mesma coordenada (e o cache) ainda recebem o resultado
+        task = asyncio.ensure_future(self._fetch_bucket(key, query, limit))
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._pending[key] = task
+        return await asyncio.shield(task)
+        
+    async def _fetch_bucket(self, key: BucketKey, query: Dict[str, Any], limit: asyncio.Semaphore) -> Optional[Dict[str, Any]]:
+        try:
+            async with limit:
+                report = await self._request(query)
+            if report is not None:
+                self._store(key, report)
+            return report
+        finally:
+            self._pending.pop(key, None)
+            
+    async def _fetch_by_name(self, city: str, country: str, limit: asyncio.Semaphore) -> Optional[Dict[str, Any]]:
+        """Consulta pelo nome e aprende as coordenadas para as próximas consultas"""
+        async with limit:
+            report = await self._request({'q': f"{city},{country}"})
+        if report is None:
+            return None
+        lat, lon = report['lat'], report['lon']
+        self._learned.setdefault(country.lower(), {})[normalize_text(city)] = (city.strip().title(), lat, lon)
+        self._store(self._bucket(lat, lon), report)
+        return report
+        
+    async def _request(self, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Chama a API de clima atual (None se a cidade não existir)"""
+        params = dict(query, appid=OPENWEATHER_API_KEY, units='metric', lang='pt_br')
+        timeout = aiohttp.ClientTimeout(total=remaining_timeout(REQUEST_TIMEOUT))
+        
+        metrics.counter("weather_api_requests_total").inc()
+        with metrics.timer("weather_api_latency_seconds"):
+            async with self.session.get(OPENWEATHER_API_URL, params=params, timeout=timeout) as response:
+                if response.status == 404:
+                    return None
+                if response.status != 200:
+                    raise Exception(f"HTTP {response.status}")
+                data = await response.json()
+                
+        main = data.get('main', {})
+        weather = (data.get('weather') or [{}])[0]
+        return {
+            'lat': data.get('coord', {}).get('lat', query.get('lat')),
+            'lon': data.get('coord', {}).get('lon', query.get('lon')),
+            'temperature': main.get('temp'),
+            'feels_like': main.get('feels_like'),
+            'humidity': main.get('humidity'),
+            'description': weather.get('description', ''),
+            'wind_speed': data.get('wind', {}).get('speed'),
+        }
+        
+    def _render(self, city: str, report: Dict[str, Any]) -> NewsItem:
+        """Monta a linha de resposta com o nome pedido pelo usuário"""
+        temperature = report['temperature']
+        summary = f"{temperature:.0f}°C" if temperature is not None else "temperatura indisponível"
+        if report['description']:
+            summary += f", {report['description']}"
+        if report['humidity'] is not None:
+            summary += f", umidade {report['humidity']}%"
+        return NewsItem(f"{city}: {summary}", "", None, "OpenWeather")
+        
+    async def cleanup(self):
+        """Limpa recursos da ferramenta"""
+        if self.session:
+            await self.session.close()
+            self.session = None
@@ -0,0 +1,221 @@
+"""
+Resumo matinal
+Busca todos os tópicos em paralelo alguns minutos antes do horário, gera um
+resumo por tópico no Ollama, renderiza o texto uma única vez e o distribui
+para todos os chats permitidos pelo RateLimitedSender
+"""
+
+import asyncio
+import logging
+import time
+from datetime import date, datetime, timedelta, timezone, time as dtime
+from typing import Any, Dict, Iterable, List, Optional
+from zoneinfo import ZoneInfo
+
+from config.settings import (
+    ALLOWED_CHAT_IDS, MORNING_NEWS_TIME, MORNING_NEWS_TOPICS, MORNING_NEWS_TIMEZONE,
+    MORNING_NEWS_LEAD_MINUTES, MORNING_NEWS_BUDGET, MORNING_NEWS_ITEMS, TELEGRAM_GLOBAL_RATE
+)
+from core.ollama_client import OllamaClient
+from mcp.tool_result import ToolResult
+from mcp.tools_registry import ToolsRegistry, tools_registry
+from utils.deadline import Deadline, deadline_scope
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Títulos das seções para os tópicos mais comuns
+_SECTION_TITLES = {
+    "notícias": "📰 Notícias",
+    "noticias": "📰 Notícias",
+    "esportes": "⚽ Esportes",
+    "clima": "🌤️ Clima",
+}
+
+
+class MorningDigest:
+    """
+    Prepara e distribui o resumo matinal
+
+    Args:
+        client: Cliente Ollama usado nos resumos (padrão: um novo OllamaClient)
+        registry: Registro de ferramentas usado nas buscas
+        topics: Tópicos do resumo (padrão: MORNING_NEWS_TOPICS)
+    """
+
+    def __init__(self, client: Optional[OllamaClient] = None, registry: ToolsRegistry = tools_registry,
+                 topics: Optional[List[str]] = None):
+        self.client = client or OllamaClient()
+        self.registry = registry
+        self.topics = [topic.strip() for topic in (topics or MORNING_NEWS_TOPICS) if topic.strip()]
+        self.prepared: Optional[Dict[str, Any]] = None
+
+    def plan(self, topic: str) -> Dict[str, Any]:
+        """Ferramenta e parâmetros usados para o tópico (roteamento normal, notícias como padrão)"""
+        tool_info = self.registry.detect_tool_needed(topic) or {
+            'tool': 'news_tool', 'params': {'query': topic}
+        }
+        params = dict(tool_info['params'])
+        if tool_info['tool'] in ('news_tool', 'sports_tool'):
+            params['limit'] = MORNING_NEWS_ITEMS
+        return {'tool': tool_info['tool'], 'params': params}
+
+    async def _prepare_topic(self, topic: str) -> Dict[str, Any]:
+        """Busca e resume um tópico, medindo cada etapa"""
+        plan = self.plan(topic)
+        timings: Dict[str, float] = {}
+
+        start = time.perf_counter()
+        try:
+            result = await self.registry.execute_tool(plan['tool'], plan['params'])
+        except Exception as e:
+            logger.warning(f"Resumo matinal: falha ao buscar '{topic}': {e}")
+            result = ToolResult.failure(str(e))
+        timings['fetch'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if result.success and result.items:
+            summary = await self.client.summarize(topic, result)
+        else:
+            summary = "Sem novidades por aqui."
+        timings['summary'] = time.perf_counter() - start
+
+        return {'topic': topic, 'tool': plan['tool'], 'summary': summary, 'timings': timings}
+
+    async def prepare(self) -> Dict[str, Any]:
+        """
+        Busca e resume todos os tópicos em paralelo e renderiza o texto final
+
+        Returns:
+            Resumo preparado (date, text, sections e timings)
+        """
+        start = time.perf_counter()
+        with deadline_scope(Deadline(MORNING_NEWS_BUDGET)):
+            sections = await asyncio.gather(*(self._prepare_topic(topic) for topic in self.topics))
+        elapsed = time.perf_counter() - start
+        metrics.histogram("morning_digest_prepare_seconds").observe(elapsed)
+
+        self.prepared = {
+            'date': self._today(),
+            'text': self.render(sections),
+            'sections': sections,
+            'timings': {'prepare': elapsed},
+        }
+        logger.info(f"Resumo matinal preparado em {elapsed:.1f}s ({len(sections)} tópicos)")
+        return self.prepared
+
+    def render(self, sections: List[Dict[str, Any]]) -> str:
+        """Texto único enviado a todos os chats"""
+        today = datetime.now(ZoneInfo(MORNING_NEWS_TIMEZONE))
+        parts = [f"☀️ Bom dia! Resumo do Pateta de {today:%d/%m}"]
+        for section in sections:
+            title = _SECTION_TITLES.get(section['topic'].lower(), section['topic'].capitalize())
+            parts.append(f"{title}\n{section['summary']}")
+        return "\n\n".join(parts)
+
+    async def deliver(self, sender, chat_ids: Optional[Iterable[int]] = None) -> Dict[str, Any]:
+        """
+        Envia o resumo do dia (preparando na hora se o preparo antecipado falhou)
+
+        Args:
+            sender: RateLimitedSender usado na distribuição
+            chat_ids: Chats de destino (padrão: ALLOWED_CHAT_IDS)
+
+        Returns:
+            Resumo preparado com os tempos e falhas de entrega
+        """
+        if not self.prepared or self.prepared['date'] != self._today():
+            await self.prepare()
+        chat_ids = list(chat_ids) if chat_ids is not None else default_chat_ids()
+
+        start = time.perf_counter()
+        errors = await sender.broadcast(chat_ids, self.prepared['text'])
+        elapsed = time.perf_counter() - start
+        failed = [chat_id for chat_id, error in errors.items() if error]
+
+        self.prepared['timings']['delivery'] = elapsed
+        self.prepared['delivered'] = len(chat_ids) - len(failed)
+        self.prepared['failed'] = failed
+        metrics.histogram("morning_digest_delivery_seconds").observe(elapsed)
+        logger.info(f"Resumo matinal enviado para {len(chat_ids) - len(failed)}/{len(chat_ids)} chats em {elapsed:.1f}s")
+        return self.prepared
+
+    @staticmethod
+    def _today() -> date:
+        return datetime.now(ZoneInfo(MORNING_NEWS_TIMEZONE)).date()
+
+
+def default_chat_ids() -> List[int]:
+    """Chats que recebem o resumo (ALLOWED_CHAT_IDS)"""
+    return sorted(int(chat_id) for chat_id in ALLOWED_CHAT_IDS if chat_id.lstrip("-").isdigit())
+
+
+def schedule_times(day: Optional[date] = None) -> Dict[str, dtime]:
+    """
+    Horários do preparo antecipado e do envio, no fuso MORNING_NEWS_TIMEZONE
+
+    Args:
+        day: Dia usado no cálculo (padrão: hoje no fuso); a antecedência é
+             tempo decorrido, então atravessa corretamente a mudança de horário
+    """
+    tz = ZoneInfo(MORNING_NEWS_TIMEZONE)
+    hour, minute = (int(part) for part in MORNING_NEWS_TIME.split(":"))
+    deliver_at = datetime.combine(day or datetime.now(tz).date(), dtime(hour, minute), tzinfo=tz)
+    # Subtração em UTC: no fuso, a aritmética seria de relógio e ignoraria a hora pulada ou repetida
+    prepare_at = (deliver_at.astimezone(timezone.utc) - timedelta(minutes=MORNING_NEWS_LEAD_MINUTES)).astimezone(tz)
+    return {
+        'prepare': prepare_at.timetz(),
+        'deliver': deliver_at.timetz(),
+    }
+
+
+def schedule_morning_digest(job_queue, digest: MorningDigest, sender) -> None:
+    """
+    Agenda o preparo e o envio diários no JobQueue do PTB
+
+    Args:
+        job_queue: app.job_queue
+        digest: Resumo que será preparado e enviado
+        sender: RateLimitedSender usado no envio
+    """
+    async def prepare_job(context) -> None:
+        try:
+            await digest.prepare()
+        except Exception as e:
+            logger.error(f"Erro ao preparar o resumo matinal: {e}")
+
+    async def deliver_job(context) -> None:
+        try:
+            await digest.deliver(sender)
+        except Exception as e:
+            logger.error(f"Erro ao enviar o resumo matinal: {e}")
+
+    times = schedule_times()
+    job_queue.run_daily(prepare_job, times['prepare'], name="morning_digest_prepare")
+    job_queue.run_daily(deliver_job, times['deliver'], name="morning_digest_deliver")
+    logger.info(f"Resumo matinal agendado: preparo às {times['prepare']:%H:%M}, "
+                f"envio às {times['deliver']:%H:%M} ({MORNING_NEWS_TIMEZONE})")
+
+
+def format_timings(prepared: Dict[str, Any], recipients: int) -> str:
+    """Relatório de tempos do modo de simulação"""
+    lines = ["🧪 Resumo matinal (simulação, nada foi enviado)", ""]
+    for section in prepared['sections']:
+        timings = section['timings']
+        lines.append(f"  {section['topic']:<12} {section['tool']:<13} busca={timings['fetch']:.2f}s "
+                     f"resumo={timings['summary']:.2f}s")
+    lines.append(f"  Preparo total: {prepared['timings']['prepare']:.2f}s")
+    lines.append(f"  Envio estimado: {recipients} chats em ~{recipients / TELEGRAM_GLOBAL_RATE:.1f}s "
+                 f"({TELEGRAM_GLOBAL_RATE:g} msg/s)")
+    lines += ["", prepared['text']]
+    return "\n".join(lines)
+
+
+async def dry_run() -> str:
+    """Prepara o resumo uma vez, sem enviar, e retorna o relatório de tempos"""
+    digest = MorningDigest()
+    try:
+        prepared = await digest.prepare()
+    finally:
+        await digest.registry.cleanup()
+    return format_timings(prepared, len(default_chat_ids()))
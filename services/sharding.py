@@ -0,0 +1,259 @@
+"""
+Modo multiprocesso
+O processo principal recebe os updates do Telegram e os encaminha, pelo
+hash consistente do chat, para N processos workers. Cada chat é sempre
+atendido pelo mesmo worker e na ordem de chegada; os workers compartilham
+o cache de ferramentas por um arquivo SQLite.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import tempfile
+import threading
+from typing import Any, List, Optional
+
+from telegram import Update
+from telegram.ext import Application, ApplicationHandlerStop, ContextTypes, TypeHandler
+
+from config.settings import BOT_TOKEN, METRICS_PORT, TELEGRAM_GLOBAL_RATE, TOOL_CACHE_PATH
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Pontos virtuais por worker no anel (distribuição mais uniforme entre os workers)
+RING_REPLICAS = 64
+# Tempo para os workers terminarem as respostas em andamento ao encerrar
+STOP_TIMEOUT = 30.0
+# Intervalo entre as verificações dos workers pelo supervisor (s)
+SUPERVISE_INTERVAL = 1.0
+# Chave em app.bot_data do processo que só encaminha os updates (não inicia os serviços de atendimento)
+FORWARD_ONLY = "forward_only"
+
+
+def _ring_hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Anel de hash consistente
+
+    Ao mudar a quantidade de workers, só ~1/N dos chats muda de worker.
+    """
+
+    def __init__(self, nodes: int, replicas: int = RING_REPLICAS):
+        points = sorted(
+            (_ring_hash(f"worker-{node}-{replica}"), node) for node in range(nodes) for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node_for(self, key: int) -> int:
+        """Worker responsável pela chave"""
+        index = bisect.bisect(self._hashes, _ring_hash(str(key))) % len(self._hashes)
+        return self._nodes[index]
+
+
+def worker_metrics_port(index: int) -> int:
+    """Porta do endpoint de métricas do worker (0 se o endpoint estiver desativado)"""
+    return METRICS_PORT + 1 + index if METRICS_PORT else 0
+
+
+def shard_key(update: Update) -> int:
+    """Chave de distribuição: o chat (ou o usuário, em updates sem chat)"""
+    if update.effective_chat:
+        return update.effective_chat.id
+    if update.effective_user:
+        return update.effective_user.id
+    return 0
+
+
+class ShardRouter:
+    """
+    Distribui os updates entre processos workers
+
+    Args:
+        workers: Quantidade de processos
+        token: Token do bot
+        base_url: URL base da Bot API (opcional, ex.: servidor local em benchmarks)
+        cache_path: Arquivo SQLite do cache de ferramentas compartilhado pelos workers (opcional)
+        global_rate: Mensagens por segundo de cada worker (padrão: TELEGRAM_GLOBAL_RATE / workers)
+    """
+
+    def __init__(self, workers: int, token: str = BOT_TOKEN, base_url: Optional[str] = None,
+                 cache_path: Optional[str] = None, global_rate: Optional[float] = None):
+        self.workers = workers
+        self.token = token
+        self.base_url = base_url
+        self.cache_path = cache_path
+        # O limite do Telegram vale para o bot inteiro: cada worker fica com uma fração
+        self.global_rate = global_rate or TELEGRAM_GLOBAL_RATE / workers
+        self.ring = HashRing(workers)
+        # spawn: workers não herdam o event loop nem conexões do processo principal
+        self._context = multiprocessing.get_context("spawn")
+        self._queues: List[Any] = []
+        self._processes: List[Any] = []
+        self._stopping = threading.Event()
+        self._supervisor: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Inicia os workers e o supervisor que os reinicia"""
+        for index in range(self.workers):
+            self._queues.append(self._context.Queue())
+            self._processes.append(None)
+            self._spawn(index)
+        self._stopping.clear()
+        # Thread própria: reiniciar um worker não pode travar o polling do processo principal
+        self._supervisor = threading.Thread(target=self._supervise, name="pateta-shard-supervisor", daemon=True)
+        self._supervisor.start()
+
+    def _spawn(self, index: int) -> None:
+        process = self._context.Process(
+            target=worker_main,
+            args=(index, self._queues[index], self.token, self.base_url, self.cache_path, self.global_rate),
+            name=f"pateta-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        self._processes[index] = process
+        logger.info(f"Worker {index} iniciado (pid {process.pid})")
+
+    def check_workers(self) -> List[int]:
+        """Reinicia os workers que pararam e retorna seus índices"""
+        restarted = []
+        for index, process in enumerate(self._processes):
+            if process.is_alive():
+                continue
+            # Os updates já enfileirados continuam na fila e são lidos pelo novo processo
+            logger.warning(f"Worker {index} parou (código {process.exitcode}); reiniciando")
+            metrics.counter("shard_worker_restarts_total", worker=str(index)).inc()
+            self._spawn(index)
+            restarted.append(index)
+        return restarted
+
+    def _supervise(self) -> None:
+        while not self._stopping.wait(SUPERVISE_INTERVAL):
+            try:
+                self.check_workers()
+            except Exception as e:
+                logger.error(f"Erro ao verificar os workers: {e}")
+
+    def dispatch(self, update: Update) -> int:
+        """Enfileira o update para o worker do chat e retorna o índice do worker"""
+        index = self.ring.node_for(shard_key(update))
+        self._queues[index].put(update.to_json())
+        metrics.counter("shard_updates_total", worker=str(index)).inc()
+        return index
+
+    async def forward(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Handler do processo principal: encaminha o update e encerra o processamento local"""
+        self.dispatch(update)
+        raise ApplicationHandlerStop
+
+    def stop(self, timeout: float = STOP_TIMEOUT) -> None:
+        """Pede aos workers que terminem o que está em andamento e encerrem"""
+        # O supervisor para antes: workers encerrando não devem ser reiniciados
+        self._stopping.set()
+        if self._supervisor is not None:
+            self._supervisor.join()
+            self._supervisor = None
+        for queue in self._queues:
+            queue.put(None)
+        for index, process in enumerate(self._processes):
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning(f"Worker {index} não encerrou em {timeout:.0f}s; finalizando")
+                process.terminate()
+        self._processes = []
+        self._queues = []
+
+
+def worker_main(index: int, inbox, token: str, base_url: Optional[str], cache_path: Optional[str],
+                global_rate: float) -> None:
+    """Ponto de entrada do processo worker"""
+    # Ctrl+C chega a todo o grupo de processos: o worker espera o aviso do processo principal
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(_serve(index, inbox, token, base_url, cache_path, global_rate))
+
+
+async def _serve(index: int, inbox, token: str, base_url: Optional[str], cache_path: Optional[str],
+                 global_rate: float) -> None:
+    # Importado aqui: main aplica a configuração de logging do worker.
+    # As configurações já foram lidas ao importar este módulo, por isso o cache
+    # compartilhado e a fração do limite de envio são aplicados explicitamente.
+    import main as bot
+    from mcp.tools_registry import tools_registry
+
+    if cache_path:
+        tools_registry.use_shared_cache(cache_path)
+    app = bot.build_application(token, base_url=base_url)
+    bot.telegram_sender.global_rate = global_rate
+    await app.initialize()
+    await bot.start_update_services()
+    # Cada worker expõe as próprias métricas na porta seguinte à do processo principal
+    await bot.start_metrics(worker_metrics_port(index), f"worker {index}")
+    logger.info(f"Worker {index} pronto")
+
+    loop = asyncio.get_running_loop()
+    pending = set()
+    try:
+        while True:
+            payload = await loop.run_in_executor(None, inbox.get)
+            if payload is None:
+                break
+            update = Update.de_json(json.loads(payload), app.bot)
+            # Tasks criadas na ordem de chegada: cada chat vê seus updates em ordem
+            task = asyncio.ensure_future(app.process_update(update))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.wait(pending, timeout=STOP_TIMEOUT)
+    finally:
+        await bot.post_shutdown(app)
+        await app.shutdown()
+        logger.info(f"Worker {index} encerrado")
+
+
+def run_sharded(app: Application, sender, workers: int, token: str = BOT_TOKEN) -> None:
+    """
+    Executa o processo principal: polling no Telegram e encaminhamento aos workers
+
+    O limite global de envio é dividido entre os workers e o processo
+    principal (que ainda envia o resumo matinal).
+
+    Args:
+        app: Aplicação já construída (handlers locais só rodam para o que não for encaminhado)
+        sender: RateLimitedSender do processo principal
+        workers: Quantidade de processos workers
+        token: Token do bot
+    """
+    from mcp.tools_registry import tools_registry
+
+    share = TELEGRAM_GLOBAL_RATE / (workers + 1)
+    temporary = not TOOL_CACHE_PATH
+    cache_path = TOOL_CACHE_PATH or os.path.join(tempfile.gettempdir(), f"pateta-tool-cache-{os.getpid()}.sqlite")
+    tools_registry.use_shared_cache(cache_path)
+    sender.global_rate = share
+
+    router = ShardRouter(workers, token, cache_path=cache_path, global_rate=share)
+    app.add_handler(TypeHandler(Update, router.forward), group=-1)
+    # O processo principal só encaminha: os serviços de atendimento rodam nos workers
+    app.bot_data[FORWARD_ONLY] = True
+    router.start()
+    logger.info(f"Modo multiprocesso: {workers} workers, cache compartilhado em {cache_path}")
+    try:
+        app.run_polling()
+    finally:
+        router.stop()
+        if temporary:
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(cache_path + suffix)
+                except OSError:
+                    pass
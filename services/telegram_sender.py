@@ -0,0 +1,327 @@
+"""
+Fila central de saída para o Telegram
+Todas as mensagens do bot passam por aqui: token bucket global com
+prioridade para respostas, intervalo mínimo por chat, espera automática em
+RetryAfter, divisão de textos longos, validação do Markdown com fallback
+para texto simples e indicador de digitação compartilhado por chat
+"""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from telegram import Chat, ReplyParameters
+from telegram.constants import ChatAction, ParseMode
+from telegram.error import BadRequest, RetryAfter
+
+from config.settings import (
+    TELEGRAM_GLOBAL_RATE, TELEGRAM_CHAT_INTERVAL, TELEGRAM_GROUP_INTERVAL, MAX_RETRIES, MAX_MESSAGE_LENGTH
+)
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Prioridades na fila global (menor sai primeiro)
+PRIORITY_REPLY = 0
+PRIORITY_BACKGROUND = 1
+
+# Quantidade de chats lembrados antes de descartar os que já podem enviar
+_MAX_TRACKED_CHATS = 10000
+# O Telegram mostra "digitando..." por ~5 s; renovamos um pouco antes
+_TYPING_REFRESH = 4.5
+# Separadores preferidos ao dividir textos longos, do mais ao menos desejável
+_SPLIT_BOUNDARIES = ("\n\n", "\n", ". ", " ")
+# Marcadores do Markdown legado do Telegram
+_MARKDOWN_MARKERS = "*_`["
+
+
+def retry_after_seconds(error: RetryAfter) -> float:
+    """Segundos pedidos pela API (int ou timedelta, conforme a versão da biblioteca)"""
+    value = error.retry_after
+    return value.total_seconds() if hasattr(value, "total_seconds") else float(value)
+
+
+def split_message(text: str, limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """
+    Divide um texto em partes de até `limit` caracteres
+
+    Corta preferencialmente entre parágrafos, depois entre linhas, frases e
+    palavras; só corta no meio de uma palavra se não houver outra opção.
+    """
+    parts = []
+    while len(text) > limit:
+        window = text[:limit]
+        cut = 0
+        for boundary in _SPLIT_BOUNDARIES:
+            position = window.rfind(boundary)
+            # Evita partes pequenas demais quando o separador está muito no início
+            if position >= limit // 4:
+                cut = position + len(boundary)
+                break
+        if not cut:
+            cut = limit
+        parts.append(text[:cut].rstrip())
+        text = text[cut:].lstrip()
+    if text:
+        parts.append(text)
+    return parts
+
+
+def is_valid_markdown(text: str) -> bool:
+    """Verifica se as entidades do Markdown legado estão todas fechadas"""
+    open_marker: Optional[str] = None
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == "\\" and open_marker not in ("`", "```"):
+            i += 2
+            continue
+        if open_marker in ("`", "```"):
+            if text.startswith(open_marker, i):
+                i += len(open_marker)
+                open_marker = None
+                continue
+        elif open_marker == "[":
+            if char == "]":
+                if not text.startswith("(", i + 1) or text.find(")", i + 2) < 0:
+                    return False
+                i = text.find(")", i + 2) + 1
+                open_marker = None
+                continue
+        elif open_marker:
+            if char == open_marker:
+                open_marker = None
+        elif text.startswith("```", i):
+            open_marker = "```"
+            i += 3
+            continue
+        elif char in _MARKDOWN_MARKERS:
+            open_marker = char
+        i += 1
+    return open_marker is None
+
+
+def unescape_markdown(text: str) -> str:
+    """Remove as barras de escape para enviar o texto sem formatação"""
+    for marker in _MARKDOWN_MARKERS + "]\\":
+        text = text.replace("\\" + marker, marker)
+    return text
+
+
+class TokenBucket:
+    """
+    Token bucket assíncrono com prioridades
+
+    No máximo `rate` aquisições por segundo (rajadas até `capacity`). Entre os
+    que aguardam, a menor prioridade sai primeiro e, empatando, a ordem de chegada.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._drainer: Optional[asyncio.Task] = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, priority: int = PRIORITY_REPLY) -> None:
+        """Aguarda um token respeitando a prioridade"""
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        if not self._drainer or self._drainer.done():
+            self._drainer = asyncio.ensure_future(self._drain())
+        await future
+
+    async def _drain(self) -> None:
+        while self._waiters:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                continue
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self._tokens -= 1
+                future.set_result(None)
+
+    @property
+    def waiting(self) -> int:
+        """Quantidade de envios aguardando na fila"""
+        return len(self._waiters)
+
+
+class RateLimitedSender:
+    """
+    Envia mensagens respeitando os limites do Telegram
+
+    Args:
+        bot: Instância de telegram.Bot
+        global_rate: Mensagens por segundo somando todos os chats
+        chat_interval: Intervalo mínimo entre mensagens no mesmo chat privado (s)
+        group_interval: Intervalo mínimo entre mensagens no mesmo grupo (s)
+    """
+
+    def __init__(self, bot, global_rate: float = TELEGRAM_GLOBAL_RATE,
+                 chat_interval: float = TELEGRAM_CHAT_INTERVAL,
+                 group_interval: float = TELEGRAM_GROUP_INTERVAL):
+        self.bot = bot
+        self.chat_interval = chat_interval
+        self.group_interval = group_interval
+        # Capacidade 1: envios espaçados em vez de rajadas (a janela do Telegram é deslizante)
+        self._bucket = TokenBucket(global_rate, capacity=1)
+        self._next_slot: Dict[int, float] = {}
+        self._typing: Dict[int, List[Any]] = {}
+
+    @property
+    def global_rate(self) -> float:
+        """Mensagens por segundo somando todos os chats"""
+        return self._bucket.rate
+
+    @global_rate.setter
+    def global_rate(self, rate: float) -> None:
+        self._bucket.rate = rate
+
+    async def _wait_chat_slot(self, chat_id: int) -> None:
+        """Reserva o próximo horário livre do chat e aguarda até ele"""
+        now = time.monotonic()
+        interval = self.group_interval if chat_id < 0 else self.chat_interval
+        slot = max(now, self._next_slot.get(chat_id, now))
+        self._next_slot[chat_id] = slot + interval
+        if len(self._next_slot) > _MAX_TRACKED_CHATS:
+            self._next_slot = {chat: at for chat, at in self._next_slot.items() if at > now}
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _send_one(self, chat_id: int, text: str, priority: int, **kwargs: Any):
+        """
+        Envia uma parte aguardando os limites e reenviando após RetryAfter
+        
+        O reenvio sem formatação (Markdown recusado) não conta como tentativa:
+        ou a parte é entregue, ou o último erro é repassado.
+        """
+        attempt = 0
+        while True:
+            await self._wait_chat_slot(chat_id)
+            with metrics.timer("telegram_queue_wait_seconds"):
+                await self._bucket.acquire(priority)
+            try:
+                with metrics.timer("telegram_send_seconds"):
+                    return await self.bot.send_message(chat_id=chat_id, text=text, **kwargs)
+            except RetryAfter as e:
+                delay = retry_after_seconds(e)
+                metrics.counter("telegram_retry_after_total").inc()
+                if attempt == MAX_RETRIES:
+                    raise
+                attempt += 1
+                logger.warning(f"Flood control no chat {chat_id}: aguardando {delay:.0f}s")
+                self._next_slot[chat_id] = max(self._next_slot.get(chat_id, 0.0), time.monotonic() + delay)
+            except BadRequest as e:
+                if not kwargs.get("parse_mode") or "parse" not in str(e).lower():
+                    raise
+                # Markdown recusado pela API: reenviar sem formatação
+                logger.warning(f"Markdown inválido no chat {chat_id}, enviando como texto: {e}")
+                metrics.counter("telegram_markdown_fallback_total").inc()
+                kwargs.pop("parse_mode")
+                text = unescape_markdown(text)
+
+    async def send_message(self, chat_id: int, text: str, parse_mode: Optional[str] = None,
+                           priority: int = PRIORITY_REPLY,
+                           reply_parameters: Optional[ReplyParameters] = None, **kwargs: Any) -> List[Any]:
+        """
+        Envia um texto ao chat, dividido em partes se passar de MAX_MESSAGE_LENGTH
+
+        Args:
+            chat_id: Chat de destino
+            text: Texto (com Markdown já escapado, se parse_mode for Markdown)
+            parse_mode: Formatação (None para texto simples)
+            priority: PRIORITY_REPLY (respostas) ou PRIORITY_BACKGROUND (envios em massa)
+            reply_parameters: Mensagem citada (apenas na primeira parte)
+
+        Returns:
+            Mensagens enviadas (telegram.Message), uma por parte
+        """
+        sent = []
+        for index, part in enumerate(split_message(text)):
+            options = dict(kwargs)
+            if parse_mode:
+                if parse_mode == ParseMode.MARKDOWN and not is_valid_markdown(part):
+                    metrics.counter("telegram_markdown_fallback_total").inc()
+                    part = unescape_markdown(part)
+                else:
+                    options["parse_mode"] = parse_mode
+            if index == 0 and reply_parameters:
+                options["reply_parameters"] = reply_parameters
+            sent.append(await self._send_one(chat_id, part, priority, **options))
+        return sent
+
+    async def reply(self, message, text: str, **kwargs: Any) -> List[Any]:
+        """Responde a uma mensagem (citando-a em grupos, como o reply_text do PTB)"""
+        if message.chat.type != Chat.PRIVATE:
+            kwargs.setdefault("reply_parameters", ReplyParameters(message_id=message.message_id))
+        return await self.send_message(message.chat_id, text, **kwargs)
+
+    @contextlib.asynccontextmanager
+    async def typing(self, chat_id: int) -> AsyncIterator[None]:
+        """
+        Mantém "digitando..." no chat enquanto o bloco executa
+
+        Gerações simultâneas no mesmo chat compartilham uma única renovação.
+        """
+        entry = self._typing.get(chat_id)
+        if entry:
+            entry[0] += 1
+        else:
+            entry = self._typing[chat_id] = [1, asyncio.ensure_future(self._keep_typing(chat_id))]
+        try:
+            yield
+        finally:
+            entry[0] -= 1
+            if entry[0] == 0:
+                entry[1].cancel()
+                if self._typing.get(chat_id) is entry:
+                    del self._typing[chat_id]
+
+    async def _keep_typing(self, chat_id: int) -> None:
+        while True:
+            try:
+                await self.bot.send_chat_action(chat_id=chat_id, action=ChatAction.TYPING)
+            except RetryAfter as e:
+                await asyncio.sleep(retry_after_seconds(e))
+                continue
+            except Exception as e:
+                logger.debug(f"Erro ao enviar 'digitando' no chat {chat_id}: {e}")
+            await asyncio.sleep(_TYPING_REFRESH)
+
+    async def broadcast(self, chat_ids: Iterable[int], text: str, **kwargs: Any) -> Dict[int, Optional[Exception]]:
+        """
+        Envia o mesmo texto para vários chats com prioridade baixa
+
+        Returns:
+            Erro por chat (None quando enviado com sucesso)
+        """
+        chat_ids = list(chat_ids)
+        kwargs.setdefault("priority", PRIORITY_BACKGROUND)
+
+        async def deliver(chat_id: int) -> Optional[Exception]:
+            try:
+                await self.send_message(chat_id, text, **kwargs)
+                return None
+            except Exception as e:
+                logger.error(f"Erro ao enviar para o chat {chat_id}: {e}")
+                return e
+
+        results = await asyncio.gather(*(deliver(chat_id) for chat_id in chat_ids))
+        return dict(zip(chat_ids, results))
@@ -0,0 +1,11 @@
+"""
+Configuração dos testes
+As configurações são lidas no import de config.settings: os valores de
+teste precisam estar no ambiente antes de qualquer import do projeto.
+"""
+
+import os
+
+os.environ.setdefault("BOT_TOKEN", "test-token")
+os.environ.setdefault("METRICS_PORT", "0")
+os.environ.setdefault("LOG_ASYNC", "false")
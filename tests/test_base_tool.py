@@ -0,0 +1,23 @@
+"""Testes do TTL de cache das ferramentas (mcp/base_tool.py)"""
+
+from config.settings import CACHE_TTL_SPORTS, SPORTS_POLL_INTERVAL
+from mcp.base_tool import BaseTool
+from mcp.sports_tool import SportsTool
+
+
+class _Tool(BaseTool):
+    async def execute(self, params):
+        return None
+
+    def get_parameters(self):
+        return []
+
+
+def test_result_ttl_is_capped_by_refresh_interval():
+    assert _Tool("t", "", cache_ttl=1800).result_ttl() == 1800
+    assert _Tool("t", "", cache_ttl=1800, refresh_interval=300).result_ttl() == 300
+    assert _Tool("t", "", cache_ttl=60, refresh_interval=300).result_ttl() == 60
+
+
+def test_sports_cache_does_not_hide_polling():
+    assert SportsTool().result_ttl() == min(CACHE_TTL_SPORTS, SPORTS_POLL_INTERVAL or CACHE_TTL_SPORTS)
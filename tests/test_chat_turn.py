@@ -0,0 +1,33 @@
+"""Testes da vez de cada chat (core/ollama_client.py, OllamaClient._turn)"""
+
+import asyncio
+
+from core.ollama_client import OllamaClient
+from utils.deadline import Deadline
+
+
+def test_turns_serialize_a_chat_without_spending_the_deadline():
+    client = OllamaClient()
+    order = []
+
+    async def turn(name, chat_id, deadline=None, hold=0.0):
+        async with client._turn(chat_id, deadline):
+            order.append(name)
+            await asyncio.sleep(hold)
+            return deadline.remaining() if deadline else None
+
+    async def scenario():
+        first = asyncio.ensure_future(turn("primeira", 1, hold=0.2))
+        await asyncio.sleep(0)
+        # Mesmo chat: espera a vez; outro chat e mensagens sem chat passam direto
+        queued = asyncio.ensure_future(turn("segunda", 1, Deadline(0.1)))
+        await turn("outro chat", 2)
+        await turn("sem chat", None)
+        await first
+        return await queued
+
+    remaining = asyncio.run(scenario())
+    assert order == ["primeira", "outro chat", "sem chat", "segunda"]
+    # A espera de ~0.2s não consumiu o orçamento de 0.1s
+    assert remaining > 0.05
+    assert not client._turns
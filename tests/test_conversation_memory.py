@@ -0,0 +1,67 @@
+"""Testes dos limites e do resumo da memória de conversa (core/conversation_memory.py)"""
+
+import asyncio
+
+from core.conversation_memory import ConversationMemory
+
+
+def _turns(memory, chat_id):
+    return [message["content"] for message in memory.messages(chat_id) if message["role"] == "user"]
+
+
+def test_turns_are_capped_by_count_and_tokens():
+    memory = ConversationMemory(max_turns=3, max_tokens=1000, max_chats=10)
+    for i in range(5):
+        memory.append(1, f"pergunta {i}", f"resposta {i}")
+    assert _turns(memory, 1) == ["pergunta 2", "pergunta 3", "pergunta 4"]
+
+    memory = ConversationMemory(max_turns=10, max_tokens=60, max_chats=10)
+    memory.append(1, "a" * 100, "b" * 40)  # ~37 tokens
+    memory.append(1, "c" * 100, "d" * 40)
+    assert _turns(memory, 1) == ["c" * 100]
+    assert memory.get_stats()['tokens'] <= 60
+
+
+def test_idle_chats_are_evicted_first():
+    memory = ConversationMemory(max_turns=2, max_chats=2)
+    memory.append(1, "oi", "olá")
+    memory.append(2, "oi", "olá")
+    memory.messages(1)  # chat 1 volta a ser o mais recente
+    memory.append(3, "oi", "olá")
+    assert len(memory) == 2
+    assert memory.messages(2) == []
+    assert _turns(memory, 1) == ["oi"]
+
+
+def test_disabled_memory_keeps_nothing():
+    memory = ConversationMemory(max_turns=0)
+    memory.append(1, "oi", "olá")
+    assert len(memory) == 0 and memory.messages(1) == []
+
+
+def test_old_turns_go_to_the_summary_and_wait_when_deferred():
+    calls = []
+    defer = True
+
+    async def summarizer(summary, turns):
+        calls.append([question for question, _, _ in turns])
+        return None if defer else f"{summary} {' '.join(question for question, _, _ in turns)}".strip()
+
+    async def scenario():
+        nonlocal defer
+        memory = ConversationMemory(summarizer, max_turns=1, max_tokens=1000, max_chats=10, summary_tokens=50)
+        for i in range(4):
+            memory.append(1, f"p{i}", "r")
+            await asyncio.sleep(0)
+        # Adiado: as trocas esperam, limitadas a max_turns
+        assert memory._chats[1].pending == [("p2", "r", 2)]
+        defer = False
+        memory.append(1, "p4", "r")
+        await asyncio.sleep(0)
+        return memory
+
+    memory = asyncio.run(scenario())
+    # A troca mais antiga saiu do limite de pendentes antes do resumo voltar
+    assert calls[-1] == ["p3"]
+    assert memory.messages(1)[0] == {"role": "system", "content": "Resumo da conversa até aqui: p3"}
+    assert _turns(memory, 1) == ["p4"]
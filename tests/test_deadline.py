@@ -0,0 +1,48 @@
+"""Testes do orçamento de tempo por update (utils/deadline.py)"""
+
+import time
+
+import pytest
+
+from utils.deadline import Deadline, DeadlineExceeded, deadline_scope, get_deadline, remaining_timeout
+
+
+def test_timeout_is_capped_by_remaining_budget():
+    deadline = Deadline(5)
+    assert deadline.timeout(2) == 2
+    assert 4.5 < deadline.timeout(30) <= 5
+    assert 4.5 < deadline.timeout() <= 5
+
+
+def test_expired_deadline_raises():
+    deadline = Deadline(0.01)
+    time.sleep(0.02)
+    assert deadline.expired
+    assert deadline.remaining() == 0
+    with pytest.raises(DeadlineExceeded):
+        deadline.timeout(1)
+
+
+def test_remaining_timeout_without_deadline_returns_default():
+    assert get_deadline() is None
+    assert remaining_timeout() is None
+    assert remaining_timeout(3) == 3
+
+
+def test_deadline_scope_sets_and_restores_current_deadline():
+    outer, inner = Deadline(10), Deadline(1)
+    with deadline_scope(outer):
+        assert get_deadline() is outer
+        with deadline_scope(inner):
+            assert remaining_timeout(5) <= 1
+        assert get_deadline() is outer
+        assert remaining_timeout(5) == 5
+    assert get_deadline() is None
+
+
+def test_extend_postpones_expiry():
+    deadline = Deadline(0.01)
+    deadline.extend(5)
+    time.sleep(0.02)
+    assert not deadline.expired
+    assert 4.5 < deadline.remaining() <= 5.01
@@ -0,0 +1,64 @@
+"""Testes do cancelamento de respostas superadas (main._generate_latest)"""
+
+import asyncio
+
+import pytest
+
+import main
+
+
+async def _slow(answer: str, delay: float = 0.05) -> str:
+    await asyncio.sleep(delay)
+    return answer
+
+
+@pytest.fixture(autouse=True)
+def cancel_superseded(monkeypatch):
+    monkeypatch.setattr(main, "CANCEL_SUPERSEDED", True)
+    main._inflight.clear()
+    yield
+    main._inflight.clear()
+
+
+def test_newer_message_from_same_user_supersedes_previous():
+    async def scenario():
+        first = asyncio.ensure_future(main._generate_latest(1, 10, _slow("primeira")))
+        await asyncio.sleep(0)
+        second = await main._generate_latest(1, 10, _slow("segunda"))
+        return await first, second
+
+    assert asyncio.run(scenario()) == (None, "segunda")
+    assert not main._inflight
+
+
+def test_other_member_of_group_does_not_cancel_pending_answer():
+    async def scenario():
+        first = asyncio.ensure_future(main._generate_latest(-100, 10, _slow("de um")))
+        await asyncio.sleep(0)
+        second = await main._generate_latest(-100, 20, _slow("de outro"))
+        return await first, second
+
+    assert asyncio.run(scenario()) == ("de um", "de outro")
+
+
+def test_nothing_is_cancelled_when_disabled(monkeypatch):
+    monkeypatch.setattr(main, "CANCEL_SUPERSEDED", False)
+
+    async def scenario():
+        first = asyncio.ensure_future(main._generate_latest(1, 10, _slow("primeira")))
+        await asyncio.sleep(0)
+        second = await main._generate_latest(1, 10, _slow("segunda"))
+        return await first, second
+
+    assert asyncio.run(scenario()) == ("primeira", "segunda")
+
+
+def test_cancelling_the_handler_still_propagates():
+    async def scenario():
+        handler = asyncio.ensure_future(main._generate_latest(1, 10, _slow("resposta", 1)))
+        await asyncio.sleep(0.01)
+        handler.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await handler
+
+    asyncio.run(scenario())
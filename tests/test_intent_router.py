@@ -0,0 +1,96 @@
+"""Testes do roteamento por embeddings e da pausa após falhas (mcp/intent_router.py)"""
+
+import asyncio
+import time
+
+from mcp import intent_router
+from mcp.intent_router import CHAT_LABEL, IntentRouter
+from utils.deadline import Deadline, deadline_scope
+
+EXAMPLES = {
+    "weather_tool": ["vai chover amanhã?", "como está o clima?"],
+    CHAT_LABEL: ["oi, tudo bem?", "me conta uma piada"],
+}
+
+
+class FakePool:
+    """Embeddings de duas dimensões: clima x papo livre"""
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+        self.delay = 0.0
+
+    async def embed(self, model, inputs):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("ollama fora do ar")
+        return [[1.0, 0.1] if ("chov" in text or "clima" in text) else [0.1, 1.0] for text in inputs]
+
+
+def _router(pool):
+    return IntentRouter(EXAMPLES, pool=pool, model="fake-embed", cache_path="", threshold=0.5)
+
+
+def test_classifies_by_nearest_example():
+    pool = FakePool()
+    router = _router(pool)
+
+    async def scenario():
+        return await router.classify("será que chove hoje?"), await router.classify("oi robô")
+
+    (label, score), (chat, _) = asyncio.run(scenario())
+    assert (label, chat) == ("weather_tool", CHAT_LABEL)
+    assert score > 0.9
+
+
+def test_failed_preparation_waits_before_retrying():
+    pool = FakePool()
+    pool.fail = True
+    router = _router(pool)
+
+    async def scenario():
+        return await router.classify("vai chover?"), await router.classify("vai chover?")
+
+    assert asyncio.run(scenario()) == (None, None)
+    assert pool.calls == 1
+
+
+def test_message_timeout_pauses_embeddings(monkeypatch):
+    monkeypatch.setattr(intent_router, "INTENT_EMBED_TIMEOUT", 0.01)
+    pool = FakePool()
+    router = _router(pool)
+
+    async def scenario():
+        assert await router.prepare()
+        pool.delay = 0.05
+        first = await router.classify("vai chover?")
+        calls = pool.calls
+        # Durante a pausa, a mensagem seguinte nem chega ao servidor
+        second = await router.classify("e amanhã, chove?")
+        assert pool.calls == calls
+        # Passada a pausa, volta a classificar
+        pool.delay = 0.0
+        router._retry_at = time.monotonic() - 1
+        return first, second, await router.classify("e amanhã, chove?")
+
+    first, second, third = asyncio.run(scenario())
+    assert first is None and second is None
+    assert third[0] == "weather_tool"
+
+
+def test_exhausted_update_deadline_does_not_pause_embeddings():
+    pool = FakePool()
+    router = _router(pool)
+
+    async def scenario():
+        assert await router.prepare()
+        deadline = Deadline(0.001)
+        await asyncio.sleep(0.01)
+        with deadline_scope(deadline):
+            assert await router.classify("vai chover?") is None
+        return await router.classify("vai chover?")
+
+    assert asyncio.run(scenario())[0] == "weather_tool"
@@ -0,0 +1,101 @@
+"""Testes da saúde dos servidores Ollama e da degradação sob carga (core/ollama_pool.py, core/load_shedder.py)"""
+
+import asyncio
+
+from core.load_shedder import LoadShedder
+from core.ollama_pool import OllamaPool
+
+
+class FlakyClient:
+    """Cliente Ollama falso: falha com erro de conexão enquanto `down` for verdadeiro"""
+
+    def __init__(self):
+        self.down = False
+        self.calls = 0
+
+    async def chat(self, model, stream, **kwargs):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("conexão recusada")
+
+        async def chunks():
+            yield {"message": {"content": "oi"}, "done": True, "eval_duration": 10**8}
+
+        return chunks()
+
+
+def _pool(hosts=("http://a:11434",)):
+    pool = OllamaPool(list(hosts), health_interval=0, parallel=1)
+    clients = []
+    for backend in pool.backends:
+        backend._client = FlakyClient()
+        clients.append(backend._client)
+    return pool, clients
+
+
+async def _generate(pool):
+    try:
+        return [chunk async for chunk in pool.stream_chat("modelo", messages=[])]
+    except Exception:
+        return None
+
+
+def test_backend_leaves_rotation_only_after_consecutive_failures():
+    pool, (client,) = _pool()
+    backend = pool.primary
+    client.down = True
+
+    async def scenario():
+        for _ in range(2):
+            await _generate(pool)
+        assert backend.healthy
+        await _generate(pool)
+        assert not backend.healthy
+
+    asyncio.run(scenario())
+
+
+def test_single_host_recovers_without_health_checks():
+    pool, (client,) = _pool()
+    shedder = LoadShedder(pool, slo=5)
+    client.down = True
+
+    async def scenario():
+        for _ in range(3):
+            await _generate(pool)
+        assert not pool.primary.healthy
+        # Sem host saudável a espera é desconhecida: nada de respostas prontas
+        assert pool.estimated_wait() is None
+        assert not shedder.overloaded()
+        # A requisição seguinte chega ao host e o traz de volta
+        client.down = False
+        assert await _generate(pool)
+        assert pool.primary.healthy and pool.primary.consecutive_failures == 0
+
+    asyncio.run(scenario())
+
+
+def test_shedder_enters_above_slo_and_leaves_below_resume_ratio():
+    pool, _ = _pool()
+    backend = pool.primary
+    backend.service_ewma = 2.0
+    shedder = LoadShedder(pool, slo=5, resume_ratio=0.5)
+
+    backend.outstanding = 4  # 4 na fila x 2s
+    assert shedder.overloaded()
+    backend.outstanding = 3  # 6s: ainda acima de SLO x razão
+    assert shedder.overloaded()
+    backend.outstanding = 1  # 2s
+    assert not shedder.overloaded()
+
+
+def test_unhealthy_backends_lift_shedding():
+    pool, _ = _pool()
+    backend = pool.primary
+    backend.service_ewma = 10.0
+    backend.outstanding = 5
+    shedder = LoadShedder(pool, slo=5)
+    assert shedder.overloaded()
+
+    backend.healthy = False
+    assert not shedder.overloaded()
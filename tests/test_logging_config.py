@@ -0,0 +1,44 @@
+"""Testes da gravação de logs pela fila (config/logging_config.py)"""
+
+import io
+import json
+import logging
+
+from config.logging_config import setup_logging, shutdown_logging
+
+
+def _log_through_queue(fmt, emit):
+    stream = io.StringIO()
+    setup_logging(level="INFO", fmt=fmt, use_queue=True, sample_rates="", stream=stream)
+    try:
+        emit(logging.getLogger("tests.logging"))
+        shutdown_logging()
+        return stream.getvalue()
+    finally:
+        setup_logging(use_queue=False)
+
+
+def test_mutable_args_are_formatted_before_enqueueing():
+    def emit(logger):
+        teams = ["flamengo"]
+        logger.info("Times: %s (%d)", teams, 1)
+        # Muda depois do log, antes de a thread do listener formatar
+        teams.append("vasco")
+
+    assert _log_through_queue("%(message)s", emit) == "Times: ['flamengo'] (1)\n"
+
+
+def test_exceptions_keep_their_traceback_through_the_queue():
+    def emit(logger):
+        try:
+            raise ValueError("falhou")
+        except ValueError:
+            logger.exception("Erro em %s", "teste")
+
+    text = _log_through_queue("%(message)s", emit)
+    assert text.startswith("Erro em teste\nTraceback")
+    assert "ValueError: falhou" in text
+
+    entry = json.loads(_log_through_queue("json", emit))
+    assert entry['message'] == "Erro em teste"
+    assert "ValueError: falhou" in entry['exc']
@@ -0,0 +1,62 @@
+"""Testes da exportação no formato texto do Prometheus (utils/metrics.py)"""
+
+from utils.metrics import MetricsRegistry
+
+
+def test_counter_and_gauge_rendering():
+    registry = MetricsRegistry()
+    registry.describe("updates_total", "Updates recebidos")
+    registry.counter("updates_total", handler="chat").inc()
+    registry.counter("updates_total", handler="chat").inc(2)
+    registry.gauge("inflight").set(3)
+    registry.gauge("inflight").dec()
+
+    assert registry.render_prometheus() == (
+        "# HELP updates_total Updates recebidos\n"
+        "# TYPE updates_total counter\n"
+        'updates_total{handler="chat"} 3.0\n'
+        "# TYPE inflight gauge\n"
+        "inflight 2.0\n"
+    )
+
+
+def test_timer_renders_cumulative_histogram_buckets(monkeypatch):
+    registry = MetricsRegistry()
+    clock = iter([10.0, 10.02, 20.0, 23.0])
+    monkeypatch.setattr("utils.metrics.time.perf_counter", lambda: next(clock))
+    with registry.timer("tool_seconds", tool="news"):
+        pass
+    with registry.timer("tool_seconds", tool="news"):
+        pass
+
+    lines = registry.render_prometheus().splitlines()
+    assert lines[0] == "# TYPE tool_seconds histogram"
+    buckets = dict(line.rsplit(" ", 1) for line in lines if line.startswith("tool_seconds_bucket"))
+    assert buckets['tool_seconds_bucket{tool="news",le="0.01"}'] == "0"
+    assert buckets['tool_seconds_bucket{tool="news",le="0.025"}'] == "1"
+    assert buckets['tool_seconds_bucket{tool="news",le="2.5"}'] == "1"
+    assert buckets['tool_seconds_bucket{tool="news",le="5.0"}'] == "2"
+    assert buckets['tool_seconds_bucket{tool="news",le="+Inf"}'] == "2"
+    assert 'tool_seconds_count{tool="news"} 2' in lines
+    total = next(line for line in lines if line.startswith('tool_seconds_sum{tool="news"}'))
+    assert abs(float(total.rsplit(" ", 1)[1]) - 3.02) < 1e-9
+
+
+def test_label_values_and_help_are_escaped():
+    registry = MetricsRegistry()
+    registry.describe("errors_total", "Erros\\n por \\ fonte\nem linhas")
+    registry.counter("errors_total", source='C:\\feeds "g1"\nrss').inc()
+
+    assert registry.render_prometheus().splitlines() == [
+        "# HELP errors_total Erros\\\\n por \\\\ fonte\\nem linhas",
+        "# TYPE errors_total counter",
+        'errors_total{source="C:\\\\feeds \\"g1\\"\\nrss"} 1.0',
+    ]
+
+
+def test_disabled_registry_renders_nothing():
+    registry = MetricsRegistry(enabled=False)
+    registry.counter("updates_total").inc()
+    with registry.timer("tool_seconds"):
+        pass
+    assert registry.render_prometheus() == "\n"
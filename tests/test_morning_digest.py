@@ -0,0 +1,34 @@
+"""Testes dos horários do resumo matinal (services/morning_digest.py)"""
+
+from datetime import date, time
+
+import services.morning_digest as morning_digest
+from services.morning_digest import schedule_times
+
+
+def _times(monkeypatch, timezone, at, lead, day):
+    monkeypatch.setattr(morning_digest, "MORNING_NEWS_TIMEZONE", timezone)
+    monkeypatch.setattr(morning_digest, "MORNING_NEWS_TIME", at)
+    monkeypatch.setattr(morning_digest, "MORNING_NEWS_LEAD_MINUTES", lead)
+    times = schedule_times(day)
+    return {name: (value.replace(tzinfo=None), str(value.tzinfo)) for name, value in times.items()}
+
+
+def test_prepare_runs_lead_minutes_before_delivery(monkeypatch):
+    times = _times(monkeypatch, "America/Sao_Paulo", "08:00", 10, date(2026, 10, 19))
+    assert times == {
+        'prepare': (time(7, 50), "America/Sao_Paulo"),
+        'deliver': (time(8, 0), "America/Sao_Paulo"),
+    }
+
+
+def test_lead_crosses_midnight(monkeypatch):
+    times = _times(monkeypatch, "America/Sao_Paulo", "00:05", 10, date(2026, 10, 19))
+    assert times['prepare'] == (time(23, 55), "America/Sao_Paulo")
+
+
+def test_lead_is_elapsed_time_across_the_dst_change(monkeypatch):
+    # 08/03/2026 em Nova York: 02:00 vira 03:00; 20 minutos antes de 03:10 são 01:50
+    times = _times(monkeypatch, "America/New_York", "03:10", 20, date(2026, 3, 8))
+    assert times['prepare'] == (time(1, 50), "America/New_York")
+    assert times['deliver'] == (time(3, 10), "America/New_York")
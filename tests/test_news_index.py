@@ -0,0 +1,79 @@
+"""Testes do índice local de notícias e do agrupamento de duplicatas (mcp/news_index.py, mcp/news_dedup.py)"""
+
+import time
+
+from mcp.news_dedup import canonical_url, collapse
+from mcp.news_index import NewsIndex
+from mcp.tool_result import NewsItem
+
+
+def _item(title, url, published=None, source="Teste"):
+    return NewsItem(title, url, published, source)
+
+
+def test_search_ranks_by_matching_terms_then_date():
+    index = NewsIndex()
+    now = time.time()
+    index.add(_item("Flamengo vence o clássico no Maracanã", "https://a.com/1"), now - 60)
+    index.add(_item("Flamengo anuncia reforço para a temporada", "https://a.com/2"), now)
+    index.add(_item("Chuva forte atinge o Rio de Janeiro", "https://a.com/3"), now)
+
+    titles = [item.title for item in index.search("flamengo clássico", 3)]
+    assert titles == ["Flamengo vence o clássico no Maracanã", "Flamengo anuncia reforço para a temporada"]
+
+
+def test_search_ignores_accents_and_generic_terms():
+    index = NewsIndex()
+    now = time.time()
+    index.add(_item("Eleição municipal tem recorde de candidatos", "https://a.com/1"), now - 60)
+    index.add(_item("Previsão indica semana de calor intenso", "https://a.com/2"), now)
+
+    assert [item.url for item in index.search("eleicao")] == ["https://a.com/1"]
+    # Sem termos específicos, a consulta retorna as mais recentes
+    assert [item.url for item in index.search("notícias de hoje", 1)] == ["https://a.com/2"]
+
+
+def test_same_story_from_two_sources_appears_once():
+    index = NewsIndex()
+    index.add(_item("Governo anuncia novo pacote econômico - G1", "https://g1.com/pacote?utm_source=x"))
+    index.add(_item("Governo anuncia novo pacote econômico - UOL", "https://uol.com/pacote"))
+
+    assert len(index.search("pacote econômico")) == 1
+
+
+def test_duplicate_urls_are_not_indexed_twice():
+    index = NewsIndex()
+    assert index.add(_item("Título com várias palavras aqui", "https://www.a.com/x?utm_medium=rss#topo"))
+    assert not index.add(_item("Outro título com várias palavras", "https://a.com/x"))
+    assert len(index) == 1
+
+
+def test_index_is_bounded_by_size_and_age():
+    index = NewsIndex(max_items=2, max_age=3600)
+    now = time.time()
+    titles = ["Inflação de economia desacelera em março", "Bolsa sobe com otimismo na economia",
+              "Economia cresce acima do esperado no trimestre"]
+    for i, title in enumerate(titles):
+        index.add(_item(title, f"https://a.com/{i}"), now + i)
+    assert len(index) == 2
+    assert [item.url for item in index.search("economia", 3)] == ["https://a.com/2", "https://a.com/1"]
+    assert not index.add(_item("Notícia antiga sobre economia", "https://a.com/old", "Mon, 06 Jan 2020 10:00:00 GMT"))
+
+    assert index.prune(now + 7200) == 2
+    assert len(index) == 0
+
+
+def test_collapse_keeps_order_limit_and_dated_representative():
+    items = [
+        _item("Governo anuncia novo pacote econômico - G1", "https://g1.com/a"),
+        _item("Chuva forte atinge o Rio de Janeiro", "https://b.com/b"),
+        _item("Governo anuncia novo pacote econômico - UOL", "https://uol.com/c", "Mon, 06 Jan 2025 10:00:00 GMT"),
+        _item("Seleção convoca jogadores para a Copa", "https://c.com/d"),
+    ]
+    result = collapse(items)
+    assert [item.url for item in result] == ["https://uol.com/c", "https://b.com/b", "https://c.com/d"]
+    assert len(collapse(items, 2)) == 2
+
+
+def test_canonical_url_drops_tracking_and_fragment():
+    assert canonical_url("https://www.a.com/x/?utm_source=rss&b=2&a=1#topo") == "https://a.com/x?a=1&b=2"
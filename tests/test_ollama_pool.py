@@ -0,0 +1,122 @@
+"""Testes do roteamento e do failover entre servidores Ollama (core/ollama_pool.py)"""
+
+import asyncio
+
+import pytest
+
+from core.ollama_pool import _FAILURES_TO_UNHEALTHY, NoBackendAvailable, OllamaPool
+
+HOSTS = ("http://a:11434", "http://b:11434", "http://c:11434")
+
+
+class FakeHost:
+    """Cliente Ollama falso: recusa a conexão (`down`) ou cai depois de `break_after` trechos"""
+
+    def __init__(self, name):
+        self.name = name
+        self.down = False
+        self.break_after = None
+        self.calls = 0
+
+    async def chat(self, model, stream, **kwargs):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("conexão recusada")
+
+        async def chunks():
+            for index in range(3):
+                if index == self.break_after:
+                    raise ConnectionError("conexão perdida")
+                yield {"message": {"content": self.name}, "done": index == 2}
+
+        return chunks()
+
+
+def _pool(hosts=HOSTS, affinity_slack=0):
+    # Pool novo: nos empates, a primeira tentativa é o primeiro host
+    pool = OllamaPool(list(hosts), health_interval=0, affinity_slack=affinity_slack, parallel=1)
+    fakes = []
+    for backend in pool.backends:
+        backend._client = FakeHost(backend.host)
+        fakes.append(backend._client)
+    return pool, fakes
+
+
+async def _hosts_used(pool):
+    return {chunk["message"]["content"] async for chunk in pool.stream_chat("modelo", messages=[])}
+
+
+def test_least_outstanding_host_comes_first():
+    pool, _ = _pool()
+    for backend, outstanding in zip(pool.backends, (2, 0, 1)):
+        backend.outstanding = outstanding
+    # A rotação dos empates não muda a ordem quando as cargas são diferentes
+    for _ in range(len(HOSTS)):
+        assert [backend.host for backend in pool.order("modelo")] == [HOSTS[1], HOSTS[2], HOSTS[0]]
+
+
+def test_loaded_model_wins_within_affinity_slack():
+    pool, _ = _pool(HOSTS[:2], affinity_slack=2)
+    loaded, idle = pool.backends
+    loaded.loaded_models.add("modelo")
+    loaded.outstanding, idle.outstanding = 2, 1
+    assert pool.order("modelo")[0] is loaded
+    # Além da folga, o host ocioso carrega o modelo
+    loaded.outstanding = 4
+    assert pool.order("modelo")[0] is idle
+    # Outro modelo não ganha a vantagem
+    loaded.outstanding = 2
+    assert pool.order("outro")[0] is idle
+
+
+def test_host_leaves_rotation_after_consecutive_failures():
+    pool, _ = _pool(HOSTS[:2])
+    failing = pool.backends[0]
+    for _ in range(_FAILURES_TO_UNHEALTHY - 1):
+        failing.record_failure(ConnectionError("conexão recusada"))
+    assert failing.healthy
+    failing.record_failure(ConnectionError("conexão recusada"))
+    assert not failing.healthy
+    # Fora da rotação, fica por último mesmo ocioso
+    pool.backends[1].outstanding = 5
+    assert pool.order("modelo")[-1] is failing
+
+
+def test_fails_over_before_the_first_chunk():
+    pool, (first, second) = _pool(HOSTS[:2])
+    first.down = True
+
+    assert asyncio.run(_hosts_used(pool)) == {HOSTS[1]}
+    assert (first.calls, second.calls) == (1, 1)
+    assert pool.backends[0].consecutive_failures == 1
+    assert all(backend.outstanding == 0 for backend in pool.backends)
+
+
+def test_does_not_fail_over_after_the_first_chunk():
+    pool, (first, second) = _pool(HOSTS[:2])
+    first.break_after = 1
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(_hosts_used(pool))
+    # A resposta já tinha começado: repetir noutro host duplicaria o texto
+    assert second.calls == 0
+
+
+def test_all_hosts_failing_raises_no_backend_available():
+    pool, fakes = _pool(HOSTS[:2])
+    for fake in fakes:
+        fake.down = True
+    with pytest.raises(NoBackendAvailable):
+        asyncio.run(_hosts_used(pool))
+
+
+def test_estimated_wait_ignores_unhealthy_hosts():
+    pool, _ = _pool(HOSTS[:2])
+    busy, idle = pool.backends
+    busy.service_ewma, busy.outstanding = 2.0, 3
+    idle.service_ewma, idle.outstanding = 2.0, 1
+    assert pool.estimated_wait() == 2.0
+    idle.healthy = False
+    assert pool.estimated_wait() == 6.0
+    busy.healthy = False
+    assert pool.estimated_wait() is None
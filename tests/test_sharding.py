@@ -0,0 +1,174 @@
+"""Testes do anel de hash e do cache compartilhado do modo multiprocesso (services/sharding.py, utils/cache_manager.py)"""
+
+import sqlite3
+import time
+
+from mcp.tool_result import NewsItem, ToolResult
+from services.sharding import HashRing, ShardRouter
+from utils.cache_manager import CacheManager
+
+CHATS = range(-5000, 5000)
+
+
+def test_ring_is_deterministic_and_uses_every_worker():
+    first, second = HashRing(4), HashRing(4)
+    assignment = [first.node_for(chat) for chat in CHATS]
+    assert assignment == [second.node_for(chat) for chat in CHATS]
+    counts = [assignment.count(node) for node in range(4)]
+    assert min(counts) > len(CHATS) / 4 * 0.5
+
+
+def test_adding_a_worker_moves_only_its_share_of_chats():
+    before, after = HashRing(4), HashRing(5)
+    moved = [chat for chat in CHATS if before.node_for(chat) != after.node_for(chat)]
+    # Só os chats que passam para o worker novo mudam (~1/5 deles)
+    assert all(after.node_for(chat) == 4 for chat in moved)
+    assert len(moved) < len(CHATS) * 0.35
+
+
+def test_shared_cache_round_trip_between_processes(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    writer = CacheManager(path, dumps=ToolResult.dumps, loads=ToolResult.loads)
+    reader = CacheManager(path, dumps=ToolResult.dumps, loads=ToolResult.loads)
+    result = ToolResult.found("flamengo", [NewsItem("Flamengo vence", "https://a.com/1", None, "G1")])
+    try:
+        writer.set("news_tool:flamengo", result, 60)
+        cached = reader.get("news_tool:flamengo")
+        assert isinstance(cached, ToolResult)
+        assert cached.dumps() == result.dumps()
+        assert reader.get("news_tool:outra") is None
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_expired_and_cleared_entries_are_not_returned(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    writer, reader = CacheManager(path), CacheManager(path)
+    try:
+        writer.set("curta", {"a": 1}, 0.05)
+        writer.set("longa", {"b": 2}, 60)
+        writer.set("ignorada", {"c": 3}, 0)
+        time.sleep(0.1)
+        assert reader.get("curta") is None
+        assert reader.get("ignorada") is None
+        assert reader.get("longa") == {"b": 2}
+        writer.clear()
+        # Um leitor sem a entrada na memória só enxerga o arquivo
+        fresh = CacheManager(path)
+        assert fresh.get("longa") is None
+        fresh.close()
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_locked_shared_cache_is_a_miss_without_blocking(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = CacheManager(path)
+    other = sqlite3.connect(path, isolation_level=None)
+    try:
+        # Outro processo segura o arquivo com uma transação exclusiva
+        other.execute("BEGIN EXCLUSIVE")
+        start = time.perf_counter()
+        cache.set("chave", {"a": 1}, 60)
+        assert cache.get("outra") is None
+        assert time.perf_counter() - start < 0.5
+        other.execute("ROLLBACK")
+        # A escrita pulada não chegou ao arquivo, mas segue na memória do processo
+        assert cache.get("chave") == {"a": 1}
+        fresh = CacheManager(path)
+        assert fresh.get("chave") is None
+        fresh.close()
+    finally:
+        other.close()
+        cache.close()
+
+
+class FakeProcess:
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.exitcode = None if alive else 1
+
+    def is_alive(self):
+        return self.alive
+
+
+class FakeQueue:
+    def __init__(self):
+        self.items = []
+
+    def put(self, item):
+        self.items.append(item)
+
+
+class FakeRouter(ShardRouter):
+    """Roteador sem processos reais: _spawn só registra um processo vivo"""
+
+    def __init__(self, workers):
+        super().__init__(workers, token="123:abc")
+        self._queues = [FakeQueue() for _ in range(workers)]
+        self._processes = [FakeProcess() for _ in range(workers)]
+        self.spawned = []
+
+    def _spawn(self, index):
+        self.spawned.append(index)
+        self._processes[index] = FakeProcess()
+
+
+class FakeUpdate:
+    def __init__(self, chat_id):
+        self.effective_chat = type("Chat", (), {"id": chat_id})()
+        self.effective_user = None
+
+    def to_json(self):
+        return f'{{"chat": {self.effective_chat.id}}}'
+
+
+def test_dispatch_only_enqueues_and_the_supervisor_restarts_dead_workers():
+    router = FakeRouter(2)
+    router._processes[1] = FakeProcess(alive=False)
+    chat = next(chat for chat in CHATS if router.ring.node_for(chat) == 1)
+    # O worker parado não é reiniciado no handler: o update espera na fila dele
+    assert router.dispatch(FakeUpdate(chat)) == 1
+    assert router._queues[1].items == [f'{{"chat": {chat}}}']
+    assert router.spawned == []
+    assert router.check_workers() == [1]
+    assert router.spawned == [1]
+    assert router.check_workers() == []
+
+
+def test_worker_metrics_ports_follow_the_main_port(monkeypatch):
+    from services import sharding
+
+    monkeypatch.setattr(sharding, "METRICS_PORT", 9108)
+    assert [sharding.worker_metrics_port(index) for index in range(3)] == [9109, 9110, 9111]
+    monkeypatch.setattr(sharding, "METRICS_PORT", 0)
+    assert sharding.worker_metrics_port(2) == 0
+
+
+def test_forwarding_process_does_not_start_update_services(monkeypatch):
+    import asyncio
+
+    import main
+    from services.sharding import FORWARD_ONLY
+
+    started = []
+
+    async def start_update_services():
+        started.append(True)
+
+    async def start_metrics(*args):
+        pass
+
+    monkeypatch.setattr(main, "start_update_services", start_update_services)
+    monkeypatch.setattr(main, "start_metrics", start_metrics)
+    monkeypatch.setattr(main, "MORNING_NEWS_ENABLED", False)
+
+    app = main.build_application("123:abc")
+    app.bot_data[FORWARD_ONLY] = True
+    asyncio.run(main.post_init(app))
+    assert started == []
+    del app.bot_data[FORWARD_ONLY]
+    asyncio.run(main.post_init(app))
+    assert started == [True]
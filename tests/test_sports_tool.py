@@ -0,0 +1,72 @@
+"""Testes da atualização incremental da ferramenta de esportes (mcp/sports_tool.py)"""
+
+import asyncio
+
+import mcp.sports_tool as sports_tool
+from mcp.sports_tool import SportsTool
+
+SITE = "https://portal.test/"
+
+
+def _page(*links):
+    return "<html><body>" + "".join(f'<a href="{href}">{title}</a>' for href, title in links) + "</body></html>"
+
+
+def _tool(monkeypatch, pages):
+    monkeypatch.setattr(sports_tool, "SPORTS_SITES", [SITE])
+    tool = SportsTool()
+    tool._teams = {"flamengo": {}}
+
+    async def fake_get(url):
+        # Feeds respondem 304; o portal devolve a próxima versão da página
+        return pages.pop(0) if url == SITE else None
+
+    tool._get = fake_get
+    return tool
+
+
+def test_refresh_emits_only_new_items_and_updates_edited_ones(monkeypatch):
+    first = [("/a", "Flamengo vence o clássico no Maracanã"), ("/b", "Flamengo anuncia reforço para o meio")]
+    edited = [first[0], ("/b", "Flamengo confirma reforço para o meio"), ("/c", "Flamengo treina antes da final")]
+    tool = _tool(monkeypatch, [_page(*first), _page(*first), _page(*edited)])
+
+    async def run():
+        try:
+            assert await tool.refresh() == 2
+            before = [(item.url, item.title) for item in tool.latest("flamengo", 10)]
+            # Página sem mudanças: nada é reemitido
+            assert await tool.refresh() == 0
+            assert [(item.url, item.title) for item in tool.latest("flamengo", 10)] == before
+            # Só /c é novo; /b mantém a posição com o título novo
+            assert await tool.refresh() == 1
+            return {item.url: item.title for item in tool.latest("flamengo", 10)}
+        finally:
+            await tool.cleanup()
+
+    latest = asyncio.run(run())
+    assert latest == {
+        SITE + "a": "Flamengo vence o clássico no Maracanã",
+        SITE + "b": "Flamengo confirma reforço para o meio",
+        SITE + "c": "Flamengo treina antes da final",
+    }
+
+
+def test_execute_reads_the_snapshot_while_polling(monkeypatch):
+    tool = _tool(monkeypatch, [_page(("/a", "Flamengo vence o clássico no Maracanã"))])
+
+    async def run():
+        try:
+            await tool.refresh()
+            tool._poller = asyncio.ensure_future(asyncio.sleep(0))
+
+            async def no_refresh(teams=None):
+                raise AssertionError("a consulta não deve buscar nas fontes")
+
+            tool.refresh = no_refresh
+            tool.last_refresh = 0.0
+            return await tool.execute({'team': 'Flamengo'})
+        finally:
+            await tool.cleanup()
+
+    result = asyncio.run(run())
+    assert [item.title for item in result.items] == ["Flamengo vence o clássico no Maracanã"]
@@ -0,0 +1,85 @@
+"""Testes da fila de saída para o Telegram (services/telegram_sender.py)"""
+
+import asyncio
+
+import pytest
+from telegram.constants import ParseMode
+from telegram.error import BadRequest, RetryAfter
+
+from services import telegram_sender
+from services.telegram_sender import RateLimitedSender, is_valid_markdown, split_message
+
+
+def test_split_message_keeps_short_text_whole():
+    assert split_message("olá", limit=10) == ["olá"]
+    assert split_message("", limit=10) == []
+
+
+def test_split_message_prefers_paragraphs_then_sentences():
+    text = "primeiro parágrafo.\n\nsegundo parágrafo com mais texto. e outra frase"
+    parts = split_message(text, limit=40)
+    assert parts[0] == "primeiro parágrafo."
+    assert all(len(part) <= 40 for part in parts)
+    assert " ".join(parts).replace("\n", " ").split() == text.split()
+
+
+def test_split_message_cuts_words_only_without_other_option():
+    assert split_message("a" * 25, limit=10) == ["a" * 10, "a" * 10, "a" * 5]
+
+
+@pytest.mark.parametrize("text", [
+    "texto simples",
+    "*negrito* e _itálico_",
+    "`código com * e _`",
+    "```\nbloco * _ [\n```",
+    "[link](https://exemplo.com) e \\*escapado",
+])
+def test_valid_markdown(text):
+    assert is_valid_markdown(text)
+
+
+@pytest.mark.parametrize("text", [
+    "*sem fechar",
+    "snake_case sem escape",
+    "`código aberto",
+    "[link sem url]",
+    "[link](sem fechar",
+])
+def test_invalid_markdown(text):
+    assert not is_valid_markdown(text)
+
+
+class FlakyBot:
+    """Bot que responde com os erros da lista antes de aceitar a mensagem"""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.calls.append((text, kwargs.get("parse_mode")))
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"chat_id": chat_id, "text": text}
+
+
+def _sender(bot) -> RateLimitedSender:
+    return RateLimitedSender(bot, global_rate=1000, chat_interval=0, group_interval=0)
+
+
+def test_markdown_fallback_after_last_retry_is_delivered(monkeypatch):
+    monkeypatch.setattr(telegram_sender, "MAX_RETRIES", 2)
+    bot = FlakyBot([RetryAfter(0), RetryAfter(0), BadRequest("Can't parse entities")])
+
+    sent = asyncio.run(_sender(bot).send_message(1, "\\*oi\\*", parse_mode=ParseMode.MARKDOWN))
+
+    assert sent == [{"chat_id": 1, "text": "*oi*"}]
+    assert bot.calls[-1] == ("*oi*", None)
+
+
+def test_errors_are_raised_when_nothing_was_delivered(monkeypatch):
+    monkeypatch.setattr(telegram_sender, "MAX_RETRIES", 1)
+    with pytest.raises(RetryAfter):
+        asyncio.run(_sender(FlakyBot([RetryAfter(0), RetryAfter(0)])).send_message(1, "oi"))
+    with pytest.raises(BadRequest):
+        asyncio.run(_sender(FlakyBot([BadRequest("Chat not found")])).send_message(1, "oi"))
@@ -0,0 +1,49 @@
+"""Testes do manifesto de ferramentas e da carga sob demanda (mcp/tool_manifest.py, mcp/tools_registry.py)"""
+
+import importlib
+import json
+
+from config.settings import TOOLS_MANIFEST
+from mcp.base_tool import BaseTool
+from mcp.tool_manifest import ToolSpec, load_manifest
+from mcp.tools_registry import ToolsRegistry
+
+
+def test_shipped_manifest_resolves_every_tool():
+    with open(TOOLS_MANIFEST, encoding="utf-8") as manifest:
+        names = [entry["name"] for entry in json.load(manifest)["tools"]]
+    specs = load_manifest(TOOLS_MANIFEST)
+    assert [spec.name for spec in specs] == names
+
+    for spec in specs:
+        tool_class = getattr(importlib.import_module(spec.module), spec.class_name)
+        assert issubclass(tool_class, BaseTool)
+        assert isinstance(spec.cache_ttl, int) and spec.cache_ttl > 0
+        assert spec.triggers and spec.examples
+        # Os parâmetros do manifesto (usados antes da carga) são os da ferramenta
+        tool = spec.instantiate()
+        assert tool.name == spec.name
+        assert tool.cache_ttl == spec.cache_ttl
+        assert [p['name'] for p in spec.parameters] == [p['name'] for p in tool.get_parameters()]
+
+
+def test_tools_are_instantiated_only_on_first_use(monkeypatch):
+    created = []
+    instantiate = ToolSpec.instantiate
+
+    def counting(spec):
+        created.append(spec.name)
+        return instantiate(spec)
+
+    monkeypatch.setattr(ToolSpec, "instantiate", counting)
+    registry = ToolsRegistry(TOOLS_MANIFEST)
+    # Listar e descrever as ferramentas não as carrega
+    assert all(not info['loaded'] for info in registry.list_tools())
+    registry.get_tool_descriptions()
+    assert created == []
+
+    tool = registry.get_tool("weather_tool")
+    assert registry.get_tool("weather_tool") is tool
+    assert created == ["weather_tool"]
+    loaded = {info['name']: info['loaded'] for info in registry.list_tools()}
+    assert loaded == {"weather_tool": True, "news_tool": False, "sports_tool": False}
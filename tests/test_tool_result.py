@@ -0,0 +1,45 @@
+"""Testes dos resultados tipados das ferramentas (mcp/tool_result.py)"""
+
+import json
+
+from mcp.tool_result import NewsItem, ToolResult, render_markdown, render_prompt
+
+
+def _result():
+    return ToolResult.found("flamengo", [
+        NewsItem("Flamengo vence", "https://a.com/1", "Mon, 06 Jan 2025 10:00:00 GMT", "G1"),
+        NewsItem("Flamengo contrata", "https://a.com/2", None, "G1"),
+    ])
+
+
+def test_dumps_loads_round_trip():
+    result = _result()
+    loaded = ToolResult.loads(result.dumps())
+    assert loaded.to_dict() == result.to_dict()
+    # Fontes internadas: itens da mesma fonte compartilham a string
+    assert loaded.items[0].source is loaded.items[1].source
+
+
+def test_failure_round_trip():
+    loaded = ToolResult.loads(ToolResult.failure("nada encontrado").dumps())
+    assert not loaded.success and loaded.message == "nada encontrado" and loaded.items == ()
+
+
+def test_legacy_dict_entries_are_coerced():
+    legacy = {'success': True, 'query': 'clima', 'timestamp': '2025-01-06T10:00:00',
+              'data': [{'title': 'Rio: 27°C', 'url': None}, {'source': 'OpenWeather'}]}
+    loaded = ToolResult.loads(json.dumps(legacy))
+    assert loaded.success and loaded.query == "clima"
+    assert loaded.items == (NewsItem("Rio: 27°C"), NewsItem("Sem título", "", None, "OpenWeather"))
+    assert ToolResult.coerce({'success': False, 'message': 'erro'}).to_dict() == \
+        {'success': False, 'message': 'erro', 'data': []}
+    # Objetos já tipados passam direto
+    result = _result()
+    assert ToolResult.coerce(result) is result
+
+
+def test_renderers():
+    result = ToolResult.found("x", [NewsItem("Alta do *dólar* e do_juro", "", None, "")])
+    assert "Fonte desconhecida" in render_prompt(result)
+    assert "Alta do \\*dólar\\* e do\\_juro" in render_markdown(result, "📰")
+    assert render_prompt(ToolResult.failure("sem rede")).endswith("sem rede")
@@ -0,0 +1,52 @@
+"""Testes da gravação de tráfego (utils/traffic_recorder.py)"""
+
+import json
+
+import pytest
+
+from utils.traffic_recorder import TrafficRecorder
+
+SALT = "0123456789abcdef"
+
+
+def test_refuses_to_start_without_salt(tmp_path):
+    with pytest.raises(ValueError):
+        TrafficRecorder(str(tmp_path / "traffic.jsonl"), "")
+    with pytest.raises(ValueError):
+        TrafficRecorder(str(tmp_path / "traffic.jsonl"), "curto")
+
+
+def test_records_length_and_route_by_default(tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    recorder = TrafficRecorder(str(path), SALT)
+    recorder.record(123456, 42, "notícias do flamengo em https://exemplo.com", is_group=True, route="news_tool")
+    recorder.close()
+
+    entry = json.loads(path.read_text())
+    assert "x" not in entry
+    assert entry["n"] == len("notícias do flamengo em https://exemplo.com")
+    assert entry["r"] == "news_tool" and entry["g"] == 1
+    assert "123456" not in entry["c"] and "42" != entry["u"]
+
+
+def test_text_is_anonymized_when_enabled(tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    recorder = TrafficRecorder(str(path), SALT, record_text=True)
+    for i in range(100):
+        recorder.record(1, 2, f"fala @fulano, veja https://exemplo.com/{i} e ligue 99998888")
+    recorder.close()
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 100
+    assert json.loads(lines[0])["x"] == "fala @user, veja <url> e ligue <num>"
+
+
+def test_hashes_depend_on_salt(tmp_path):
+    first = TrafficRecorder(str(tmp_path / "a.jsonl"), SALT)
+    second = TrafficRecorder(str(tmp_path / "b.jsonl"), SALT[::-1])
+    try:
+        assert first._hash(123) == first._hash(123)
+        assert first._hash(123) != second._hash(123)
+    finally:
+        first.close()
+        second.close()
@@ -0,0 +1,81 @@
+"""Testes do cache por coordenadas e das cidades aprendidas da ferramenta de clima (mcp/weather_tool.py)"""
+
+import asyncio
+
+from mcp.weather_cities import resolve_city
+from mcp.weather_tool import WeatherTool
+
+
+def _tool(delay=0.0, known=None):
+    """Ferramenta com a API substituída: conta as requisições e responde depois de `delay`"""
+    tool = WeatherTool()
+    tool.requests = []
+
+    async def fake_request(query):
+        tool.requests.append(query)
+        await asyncio.sleep(delay)
+        if 'q' in query:
+            name = query['q'].split(",")[0]
+            if name not in (known or {}):
+                return None
+            lat, lon = known[name]
+        else:
+            lat, lon = query['lat'], query['lon']
+        return {'lat': lat, 'lon': lon, 'temperature': 25.0, 'feels_like': 26.0, 'humidity': 70,
+                'description': 'céu limpo', 'wind_speed': 3.0}
+
+    tool._request = fake_request
+    return tool
+
+
+def _run(tool, scenario):
+    async def run():
+        try:
+            return await scenario()
+        finally:
+            await tool.cleanup()
+
+    return asyncio.run(run())
+
+
+def test_nearby_neighborhoods_share_one_request():
+    tool = _tool()
+    reports = _run(tool, lambda: tool.fetch_many(["Copacabana", "ipanema", "Leblon", "Niterói"]))
+    # Os três bairros caem na mesma coordenada arredondada; Niterói tem a sua
+    assert len(tool.requests) == 2
+    assert [report.title.split(":")[0] for report in reports] == ["Copacabana", "Ipanema", "Leblon", "Niterói"]
+
+    async def again():
+        return await tool.fetch_many(["copacabna"])
+
+    assert _run(tool, again)[0].title.startswith("Copacabana: 25°C")
+    assert len(tool.requests) == 2
+
+
+def test_concurrent_lookups_of_a_bucket_hit_the_api_once():
+    tool = _tool(delay=0.05)
+
+    async def scenario():
+        return await asyncio.gather(tool.fetch_many(["Tijuca"]), tool.fetch_many(["tijuca"]))
+
+    first, second = _run(tool, scenario)
+    assert len(tool.requests) == 1
+    assert first[0].title == second[0].title
+
+
+def test_learned_cities_resolve_with_typos():
+    tool = _tool(known={"Lisboa": (38.72, -9.14)})
+    assert resolve_city("Lisboa") is None
+
+    async def scenario():
+        learned = await tool.fetch_many(["Lisboa"], "PT")
+        typo = await tool.fetch_many(["lisbona"], "PT")
+        other_country = await tool.fetch_many(["lisbona"], "ES")
+        return learned, typo, other_country
+
+    learned, typo, other_country = _run(tool, scenario)
+    assert learned[0].title.startswith("Lisboa:")
+    # O erro de digitação cai na cidade aprendida e na coordenada já em cache
+    assert typo[0].title.startswith("Lisboa:")
+    assert other_country == [None]
+    assert [query.get('q') for query in tool.requests] == ["Lisboa,PT", "lisbona,ES"]
@@ -0,0 +1,153 @@
+"""
+Cache de resultados das ferramentas
+Dois níveis: um LRU em memória no processo e, opcionalmente, um arquivo
+SQLite compartilhado entre processos (modo multiprocesso), para que uma
+busca feita por um worker sirva aos demais
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Escritas entre limpezas das entradas expiradas no SQLite
+_PURGE_EVERY = 256
+# Entradas expiradas removidas por limpeza: mantém cada DELETE curto no event loop
+_PURGE_BATCH = 256
+# Espera máxima pelo arquivo travado por outro processo (ms). As consultas rodam no event loop:
+# com o arquivo ocupado, a leitura vira falta no cache e a escrita é pulada, sem segurar o loop
+_BUSY_TIMEOUT_MS = 5
+
+
+class CacheManager:
+    """
+    Cache com TTL por entrada
+
+    Args:
+        path: Arquivo SQLite compartilhado (vazio: somente memória)
+        max_entries: Entradas mantidas na memória do processo (LRU)
+        dumps: Serializa um valor para o arquivo compartilhado (padrão: JSON)
+        loads: Lê um valor serializado por dumps
+    """
+
+    def __init__(self, path: str = "", max_entries: int = 1024,
+                 dumps: Optional[Callable[[Any], str]] = None, loads: Optional[Callable[[str], Any]] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.dumps = dumps or (lambda value: json.dumps(value, ensure_ascii=False, default=str))
+        self.loads = loads or json.loads
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes = 0
+        if path:
+            self._db = self._open(path)
+
+    @staticmethod
+    def _open(path: str) -> sqlite3.Connection:
+        # Na abertura (inicialização dos workers, fora do atendimento) a espera pode ser maior
+        db = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        # WAL: leitores não bloqueiam o escritor de outro processo
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value TEXT NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+        db.execute(f"PRAGMA busy_timeout={_BUSY_TIMEOUT_MS}")
+        return db
+
+    @staticmethod
+    def _busy(error: sqlite3.Error, operation: str) -> bool:
+        """Conta o arquivo travado por outro processo (True); outros erros vão para o log"""
+        if isinstance(error, sqlite3.OperationalError) and ("locked" in str(error) or "busy" in str(error)):
+            metrics.counter("tool_cache_shared_busy_total", operation=operation).inc()
+            return True
+        return False
+
+    def get(self, key: str) -> Optional[Any]:
+        """Valor ainda válido para a chave (None se ausente ou expirado)"""
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._memory.move_to_end(key)
+                return entry[1]
+            del self._memory[key]
+
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT expires_at, value FROM cache WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+        except sqlite3.Error as e:
+            if not self._busy(e, "read"):
+                logger.warning(f"Erro ao ler o cache compartilhado: {e}")
+            return None
+        if row is None:
+            return None
+        try:
+            value = self.loads(row[1])
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Entrada ilegível no cache compartilhado: {e}")
+            return None
+        self._remember(key, row[0], value)
+        metrics.counter("tool_cache_shared_hits_total").inc()
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Guarda o valor por `ttl` segundos"""
+        if ttl <= 0:
+            return
+        expires_at = time.time() + ttl
+        self._remember(key, expires_at, value)
+        if self._db is None:
+            return
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache (key, expires_at, value) VALUES (?, ?, ?)",
+                (key, expires_at, self.dumps(value)),
+            )
+            self._writes += 1
+            if self._writes % _PURGE_EVERY == 0:
+                self._db.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache WHERE expires_at <= ? LIMIT ?)",
+                    (time.time(), _PURGE_BATCH),
+                )
+        except sqlite3.Error as e:
+            if not self._busy(e, "write"):
+                logger.warning(f"Erro ao gravar no cache compartilhado: {e}")
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove todas as entradas (inclusive as compartilhadas)"""
+        self._memory.clear()
+        if self._db is not None:
+            try:
+                self._db.execute("DELETE FROM cache")
+            except sqlite3.Error as e:
+                logger.warning(f"Erro ao limpar o cache compartilhado: {e}")
+
+    def close(self) -> None:
+        """Fecha o arquivo compartilhado"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Tamanho do cache local e arquivo compartilhado"""
+        return {'entries': len(self._memory), 'shared_path': self.path or None}
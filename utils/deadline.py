@@ -0,0 +1,89 @@
+"""
+Orçamento de tempo (deadline) por update
+Propaga o tempo restante entre main.py, ferramentas e chamadas ao Ollama
+"""
+
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Exceção lançada quando o orçamento de tempo do update se esgota"""
+    pass
+
+
+class Deadline:
+    """Prazo absoluto (relógio monotônico) para processar um update"""
+
+    def __init__(self, budget: float):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        """Retorna os segundos restantes (nunca negativo)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def extend(self, seconds: float) -> None:
+        """Adia o prazo (tempo que não deve contar no orçamento, como a espera pela vez do chat)"""
+        self.expires_at += seconds
+
+    @property
+    def expired(self) -> bool:
+        """Indica se o prazo já passou"""
+        return time.monotonic() >= self.expires_at
+
+    def timeout(self, default: Optional[float] = None) -> float:
+        """
+        Calcula o timeout para uma operação dentro do prazo
+
+        Args:
+            default: Timeout próprio da operação (opcional)
+
+        Returns:
+            O menor valor entre o timeout da operação e o tempo restante
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Orçamento de {self.budget:.1f}s esgotado")
+        if default is None:
+            return remaining
+        return min(default, remaining)
+
+
+_current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar(
+    "current_deadline", default=None
+)
+
+
+def get_deadline() -> Optional[Deadline]:
+    """Retorna o deadline do update em processamento (se houver)"""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """Define o deadline corrente enquanto o bloco estiver ativo"""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def remaining_timeout(default: Optional[float] = None) -> Optional[float]:
+    """
+    Timeout para a próxima operação respeitando o deadline corrente
+
+    Args:
+        default: Timeout usado quando não há deadline ativo
+
+    Returns:
+        Timeout em segundos (ou o default se não houver deadline)
+    """
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return default
+    return deadline.timeout(default)
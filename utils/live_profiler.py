@@ -0,0 +1,266 @@
+"""
+Diagnóstico do processo em execução
+Perfil de CPU por alguns segundos (cProfile), snapshots do tracemalloc
+comparados entre si para achar o que cresce e o atraso do event loop com
+as tarefas pendentes. Nada fica ativo fora de um pedido: o cProfile só
+roda durante a janela pedida e o tracemalloc, entre o primeiro snapshot e
+o /memsnap stop (ou TRACEMALLOC_MAX_SECONDS).
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import PROFILE_MAX_SECONDS, PROFILE_TOP, TRACEMALLOC_FRAMES, TRACEMALLOC_MAX_SECONDS
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Ordenações aceitas pelo /profile -> índice em (chamadas primitivas, chamadas, próprio, acumulado)
+PROFILE_SORTS = {"tottime": 2, "cumtime": 3, "calls": 1}
+
+
+def _short_path(filename: str) -> str:
+    """Caminho relativo ao projeto, ou os dois últimos componentes (bibliotecas)"""
+    if filename.startswith(PROJECT_ROOT):
+        return os.path.relpath(filename, PROJECT_ROOT)
+    parts = filename.replace("\\", "/").rsplit("/", 2)
+    return "/".join(parts[-2:])
+
+
+def top_functions(stats: Dict[Tuple[str, int, str], Tuple], sort: str = "tottime",
+                  limit: int = PROFILE_TOP) -> List[Dict[str, Any]]:
+    """
+    Funções mais caras de um perfil
+
+    Args:
+        stats: Dicionário `stats` de um pstats.Stats
+        sort: tottime (tempo próprio), cumtime (acumulado) ou calls
+        limit: Quantidade de funções
+
+    Returns:
+        Lista de dicionários com function, calls, tottime e cumtime
+    """
+    index = PROFILE_SORTS[sort]
+    ranked = sorted(stats.items(), key=lambda entry: entry[1][index], reverse=True)[:limit]
+    return [{
+        'function': f"{_short_path(filename)}:{line}({name})" if line else name,
+        'calls': calls,
+        'tottime': tottime,
+        'cumtime': cumtime,
+    } for (filename, line, name), (_, calls, tottime, cumtime, _) in ranked]
+
+
+class LiveProfiler:
+    """
+    Ganchos de diagnóstico para o bot em produção (um por processo)
+
+    Args:
+        max_seconds: Duração máxima de um perfil de CPU
+        tracemalloc_max_seconds: Tempo até o tracemalloc ser desligado sozinho
+        frames: Quadros da pilha guardados por alocação
+    """
+
+    def __init__(self, max_seconds: float = PROFILE_MAX_SECONDS,
+                 tracemalloc_max_seconds: float = TRACEMALLOC_MAX_SECONDS, frames: int = TRACEMALLOC_FRAMES):
+        self.max_seconds = max_seconds
+        self.tracemalloc_max_seconds = tracemalloc_max_seconds
+        self.frames = frames
+        self._profiling = False
+        self._baseline = None
+        self._baseline_at = 0.0
+        # Só desliga o tracemalloc se foi ligado aqui (e não por PYTHONTRACEMALLOC)
+        self._started_tracemalloc = False
+        self._auto_stop: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def profiling(self) -> bool:
+        return self._profiling
+
+    async def cpu_profile(self, seconds: float, sort: str = "tottime", limit: int = PROFILE_TOP) -> Dict[str, Any]:
+        """
+        Perfila a thread do event loop por alguns segundos
+
+        Args:
+            seconds: Duração (limitada a max_seconds)
+            sort: tottime, cumtime ou calls
+            limit: Quantidade de funções no resultado
+
+        Returns:
+            Dicionário com seconds, total_calls e functions (ver top_functions)
+        """
+        if self._profiling:
+            raise RuntimeError("Já há um perfil em andamento")
+        if sort not in PROFILE_SORTS:
+            raise ValueError(f"Ordenação inválida: {sort} (use {', '.join(PROFILE_SORTS)})")
+        import cProfile
+        import pstats
+
+        seconds = min(max(seconds, 0.1), self.max_seconds)
+        profiler = cProfile.Profile()
+        self._profiling = True
+        logger.info("Perfil de CPU por %.1fs", seconds)
+        try:
+            profiler.enable()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profiler.disable()
+        finally:
+            self._profiling = False
+        stats = pstats.Stats(profiler)
+        return {
+            'seconds': seconds,
+            'total_calls': stats.total_calls,
+            'functions': top_functions(stats.stats, sort, limit),
+        }
+
+    @property
+    def tracing(self) -> bool:
+        return self._baseline is not None
+
+    async def memory_snapshot(self, limit: int = PROFILE_TOP) -> Dict[str, Any]:
+        """
+        Snapshot do tracemalloc comparado com o anterior
+
+        O primeiro pedido liga o tracemalloc e guarda a base; os seguintes
+        mostram o que cresceu desde o snapshot anterior, que vira a nova base.
+
+        Returns:
+            Dicionário com started, current_bytes, peak_bytes e, a partir do
+            segundo pedido, interval_seconds e growth (linhas que mais cresceram)
+        """
+        import tracemalloc
+
+        if self._baseline is None:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                self._started_tracemalloc = True
+            self._baseline = await asyncio.to_thread(self._take_snapshot)
+            self._baseline_at = time.monotonic()
+            self._schedule_auto_stop()
+            current, peak = tracemalloc.get_traced_memory()
+            logger.info("tracemalloc ligado (%d quadros)", self.frames)
+            return {'started': True, 'current_bytes': current, 'peak_bytes': peak}
+
+        # Snapshot e comparação numa thread: com muitos objetos levam centenas de ms
+        snapshot = await asyncio.to_thread(self._take_snapshot)
+        growth = await asyncio.to_thread(snapshot.compare_to, self._baseline, "lineno")
+        interval = time.monotonic() - self._baseline_at
+        self._baseline, self._baseline_at = snapshot, time.monotonic()
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            'started': False,
+            'current_bytes': current,
+            'peak_bytes': peak,
+            'interval_seconds': interval,
+            'growth': [{
+                'location': f"{_short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                'size_diff': stat.size_diff,
+                'size': stat.size,
+                'count_diff': stat.count_diff,
+            } for stat in growth[:limit] if stat.size_diff > 0],
+        }
+
+    @staticmethod
+    def _take_snapshot():
+        import tracemalloc
+
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+
+    def _schedule_auto_stop(self) -> None:
+        if self.tracemalloc_max_seconds <= 0:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._auto_stop = loop.call_later(self.tracemalloc_max_seconds, self.stop_tracing)
+
+    def stop_tracing(self) -> bool:
+        """Desliga o tracemalloc e descarta a base (False se não estava ligado)"""
+        import tracemalloc
+
+        if self._auto_stop is not None:
+            self._auto_stop.cancel()
+            self._auto_stop = None
+        if self._baseline is None:
+            return False
+        self._baseline = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        logger.info("tracemalloc desligado")
+        return True
+
+    async def loop_report(self, samples: int = 20, interval: float = 0.05, limit: int = PROFILE_TOP) -> Dict[str, Any]:
+        """
+        Atraso do event loop e tarefas pendentes
+
+        Args:
+            samples: Sleeps medidos (o relatório leva cerca de samples x interval)
+            interval: Duração de cada sleep
+
+        Returns:
+            Dicionário com lag (p50 e máximo, em segundos), tasks (total) e
+            by_coroutine (tarefas agrupadas pela corrotina)
+        """
+        lags = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(max(0.0, time.perf_counter() - start - interval))
+        lags.sort()
+
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        by_coroutine = Counter(getattr(task.get_coro(), "__qualname__", repr(task.get_coro())) for task in tasks)
+        return {
+            'lag': {'p50': lags[len(lags) // 2], 'max': lags[-1]},
+            'tasks': len(tasks),
+            'by_coroutine': by_coroutine.most_common(limit),
+        }
+
+
+def format_cpu_profile(report: Dict[str, Any]) -> str:
+    lines = [f"🔥 Perfil de CPU ({report['seconds']:.1f}s, {report['total_calls']} chamadas):", ""]
+    for entry in report['functions']:
+        lines.append(f"{entry['tottime']:.3f}s próprio | {entry['cumtime']:.3f}s acumulado | "
+                     f"{entry['calls']}x {entry['function']}")
+    return "\n".join(lines)
+
+
+def format_memory_snapshot(report: Dict[str, Any]) -> str:
+    usage = f"rastreado {report['current_bytes'] / 1e6:.1f} MB (pico {report['peak_bytes'] / 1e6:.1f} MB)"
+    if report['started']:
+        return (f"🧮 tracemalloc ligado, {usage}. Envie /memsnap de novo para ver o que cresceu "
+                f"e /memsnap stop para desligar.")
+    lines = [f"🧮 Crescimento em {report['interval_seconds']:.0f}s, {usage}:", ""]
+    for entry in report['growth']:
+        lines.append(f"+{entry['size_diff'] / 1024:.1f} KB ({entry['count_diff']:+d} objetos, "
+                     f"total {entry['size'] / 1024:.1f} KB) {entry['location']}")
+    if not report['growth']:
+        lines.append("Nada cresceu desde o snapshot anterior.")
+    return "\n".join(lines)
+
+
+def format_loop_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"⏱️ Event loop: atraso p50={report['lag']['p50'] * 1000:.1f}ms máx={report['lag']['max'] * 1000:.1f}ms",
+        f"Tarefas pendentes: {report['tasks']}",
+    ]
+    for name, count in report['by_coroutine']:
+        lines.append(f"{count}x {name}")
+    return "\n".join(lines)
+
+
+# Instância global do processo
+live_profiler = LiveProfiler()
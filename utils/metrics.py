@@ -0,0 +1,258 @@
+"""
+Métricas em processo do Pateta Bot
+Contadores, gauges e histogramas de buckets fixos com exportação
+em texto Prometheus (HTTP local) e resumo periódico no log
+"""
+
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+from config.settings import ENABLE_METRICS
+
+logger = logging.getLogger(__name__)
+
+# Buckets de latência (segundos) usados por padrão nos histogramas
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# Escapes do formato texto do Prometheus: valores de label e textos de ajuda
+_LABEL_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n"})
+_HELP_ESCAPES = str.maketrans({"\\": "\\\\", "\n": "\\n"})
+
+
+class Counter:
+    """Contador monotônico"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Gauge:
+    """Valor instantâneo que pode subir e descer"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class Histogram:
+    """Histograma de buckets fixos (contagens não cumulativas internamente)"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimativa do quantil pelo limite superior do bucket"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+
+class _NoopMetric:
+    """Métrica nula usada quando ENABLE_METRICS está desligado"""
+
+    __slots__ = ()
+
+    def inc(self, amount: float = 1.0) -> None:
+        pass
+
+    def dec(self, amount: float = 1.0) -> None:
+        pass
+
+    def set(self, value: float) -> None:
+        pass
+
+    def observe(self, value: float) -> None:
+        pass
+
+
+_NOOP = _NoopMetric()
+
+
+class MetricsRegistry:
+    """Registro central de métricas"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: Dict[str, Dict[LabelKey, object]] = {}
+        self._types: Dict[str, str] = {}
+        self._help: Dict[str, str] = {}
+
+    def _get(self, kind: str, name: str, labels: Dict[str, str], factory):
+        if not self.enabled:
+            return _NOOP
+        children = self._metrics.get(name)
+        if children is None:
+            children = self._metrics[name] = {}
+            self._types[name] = kind
+        key = tuple(sorted(labels.items())) if labels else ()
+        metric = children.get(key)
+        if metric is None:
+            metric = children[key] = factory()
+        return metric
+
+    def describe(self, name: str, help_text: str) -> None:
+        """Registra o texto de ajuda exibido na exportação Prometheus"""
+        self._help[name] = help_text
+
+    def counter(self, name: str, **labels: str) -> Counter:
+        """Obtém (ou cria) um contador"""
+        return self._get("counter", name, labels, Counter)
+
+    def gauge(self, name: str, **labels: str) -> Gauge:
+        """Obtém (ou cria) um gauge"""
+        return self._get("gauge", name, labels, Gauge)
+
+    def histogram(self, name: str, **labels: str) -> Histogram:
+        """Obtém (ou cria) um histograma de latência"""
+        return self._get("histogram", name, labels, Histogram)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """Mede a duração do bloco em um histograma"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram(name, **labels).observe(time.perf_counter() - start)
+
+    def render_prometheus(self) -> str:
+        """Renderiza todas as métricas no formato texto do Prometheus"""
+        lines: List[str] = []
+        for name, children in self._metrics.items():
+            kind = self._types[name]
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name].translate(_HELP_ESCAPES)}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, metric in children.items():
+                if kind == "histogram":
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets, metric.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_labels(key, le=repr(bound))} {cumulative}")
+                    lines.append(f"{name}_bucket{_labels(key, le='+Inf')} {metric.count}")
+                    lines.append(f"{name}_sum{_labels(key)} {metric.sum}")
+                    lines.append(f"{name}_count{_labels(key)} {metric.count}")
+                else:
+                    lines.append(f"{name}{_labels(key)} {metric.value}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """Resumo legível das métricas para o log periódico"""
+        parts: List[str] = []
+        for name, children in self._metrics.items():
+            kind = self._types[name]
+            for key, metric in children.items():
+                label = f"{name}{_labels(key)}"
+                if kind == "histogram":
+                    if metric.count:
+                        parts.append(
+                            f"{label} n={metric.count} avg={metric.sum / metric.count:.3f}s "
+                            f"p50<={metric.quantile(0.5)}s p99<={metric.quantile(0.99)}s"
+                        )
+                else:
+                    parts.append(f"{label}={metric.value:g}")
+
+        hits = sum(m.value for m in self._metrics.get("tool_cache_hits_total", {}).values())
+        misses = sum(m.value for m in self._metrics.get("tool_cache_misses_total", {}).values())
+        if hits + misses:
+            parts.append(f"cache_hit_ratio={hits / (hits + misses):.2%}")
+        return "; ".join(parts) if parts else "sem dados"
+
+
+def _labels(key: LabelKey, **extra: str) -> str:
+    """Formata os labels no estilo Prometheus"""
+    items = list(key) + list(extra.items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v).translate(_LABEL_ESCAPES)}"' for k, v in items) + "}"
+
+
+async def start_metrics_server(host: str, port: int):
+    """
+    Inicia o endpoint HTTP local com as métricas no formato Prometheus
+
+    Args:
+        host: Endereço de escuta (use 127.0.0.1 para acesso apenas local)
+        port: Porta de escuta
+
+    Returns:
+        AppRunner do aiohttp (use runner.cleanup() para encerrar)
+    """
+    from aiohttp import web
+
+    async def handle_metrics(request):
+        return web.Response(
+            text=metrics.render_prometheus(),
+            content_type="text/plain",
+            charset="utf-8",
+        )
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Métricas disponíveis em http://{host}:{port}/metrics")
+    return runner
+
+
+async def log_metrics_periodically(interval: int, label: str = "") -> None:
+    """Escreve o resumo das métricas no log a cada `interval` segundos (label: processo, ex.: worker 2)"""
+    prefix = f"Métricas ({label})" if label else "Métricas"
+    while True:
+        await asyncio.sleep(interval)
+        logger.info(f"{prefix}: {metrics.summary()}")
+
+
+# Instância global do registro de métricas
+metrics = MetricsRegistry(enabled=ENABLE_METRICS)
+metrics.describe("handler_latency_seconds", "Tempo total de processamento por handler")
+metrics.describe("updates_in_progress", "Updates sendo processados no momento")
+metrics.describe("llm_time_to_first_token_seconds", "Tempo até o primeiro token do Ollama")
+metrics.describe("llm_generation_seconds", "Tempo total de geração do Ollama")
+metrics.describe("tool_latency_seconds", "Latência de execução por ferramenta")
+metrics.describe("news_source_latency_seconds", "Latência por fonte de notícias")
+metrics.describe("tool_cache_hits_total", "Acertos no cache de ferramentas")
+metrics.describe("tool_cache_misses_total", "Falhas no cache de ferramentas")
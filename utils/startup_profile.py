@@ -0,0 +1,120 @@
+"""
+Perfil de inicialização do bot
+Executa `python -X importtime` em um processo novo e resume quais
+módulos mais pesam no import de main.py
+"""
+
+import ast
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Dependências pesadas que só devem ser carregadas no primeiro uso
+LAZY_MODULES = ("ollama", "aiohttp", "bs4", "lxml", "numpy", "mcp.news_tool")
+
+_PROBE = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import {module}\n"
+    "elapsed = time.perf_counter() - start\n"
+    "loaded = [m for m in {lazy!r} if m in sys.modules]\n"
+    "print(repr((elapsed, loaded)))\n"
+)
+
+
+def run_import_probe(module: str = "main", importtime: bool = True) -> Dict[str, Any]:
+    """
+    Importa o módulo em um processo novo e mede o tempo
+
+    Args:
+        module: Módulo a importar (padrão: main)
+        importtime: Se True, coleta o relatório do -X importtime
+
+    Returns:
+        Dicionário com import_seconds, lazy_loaded (módulos pesados que foram
+        carregados no import) e entries (linhas do importtime, se coletadas)
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", _PROBE.format(module=module, lazy=LAZY_MODULES)]
+
+    env = dict(os.environ)
+    env.setdefault("BOT_TOKEN", "startup-profile")
+    completed = subprocess.run(command, cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, timeout=120)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {module}: {completed.stderr[-2000:]}")
+
+    elapsed, lazy_loaded = ast.literal_eval(completed.stdout.strip().splitlines()[-1])
+    return {
+        'module': module,
+        'import_seconds': elapsed,
+        'lazy_loaded': lazy_loaded,
+        'entries': parse_importtime(completed.stderr) if importtime else [],
+    }
+
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """Converte as linhas 'import time: self | cumulative | módulo' em dicionários"""
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        except ValueError:
+            continue
+        stripped = name.lstrip()
+        entries.append({
+            'module': stripped,
+            'depth': (len(name) - len(stripped) - 1) // 2,
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000,
+        })
+    return entries
+
+
+def direct_imports(entries: List[Dict[str, Any]], module: str) -> List[Dict[str, Any]]:
+    """Módulos importados diretamente pelo módulo (o importtime lista os filhos antes do pai)"""
+    pending: List[Dict[str, Any]] = []
+    for entry in entries:
+        if entry['depth'] == 0:
+            if entry['module'] == module:
+                return pending
+            pending = []
+        elif entry['depth'] == 1:
+            pending.append(entry)
+    return []
+
+
+def format_report(profile: Dict[str, Any], top: int = 15) -> str:
+    """Monta o relatório legível do perfil de inicialização"""
+    entries = profile['entries']
+    module = profile['module']
+    lines = [f"⏱️  import {module}: {profile['import_seconds'] * 1000:.0f} ms", ""]
+
+    lines.append(f"Maiores tempos acumulados (top {top}, imports diretos de {module}):")
+    direct = direct_imports(entries, module)
+    for entry in sorted(direct, key=lambda e: e['cumulative_ms'], reverse=True)[:top]:
+        lines.append(f"  {entry['cumulative_ms']:8.1f} ms  {entry['module']}")
+
+    lines.append("")
+    lines.append(f"Maiores tempos próprios (top {top}):")
+    for entry in sorted(entries, key=lambda e: e['self_ms'], reverse=True)[:top]:
+        lines.append(f"  {entry['self_ms']:8.1f} ms  {entry['module']}")
+
+    lines.append("")
+    if profile['lazy_loaded']:
+        lines.append(f"⚠️  Carregados no import (deveriam ser sob demanda): {', '.join(profile['lazy_loaded'])}")
+    else:
+        lines.append(f"✅ Dependências sob demanda não carregadas: {', '.join(LAZY_MODULES)}")
+    return "\n".join(lines)
+
+
+def profile_startup(top: int = 15, module: Optional[str] = None) -> str:
+    """Executa o perfil e retorna o relatório"""
+    return format_report(run_import_probe(module or "main"), top)
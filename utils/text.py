@@ -0,0 +1,11 @@
+"""
+Normalização de texto compartilhada pelas ferramentas
+"""
+
+import unicodedata
+
+
+def normalize_text(text: str) -> str:
+    """Minúsculas, sem acentos e com espaços simples"""
+    folded = unicodedata.normalize("NFKD", text.lower())
+    return " ".join("".join(c for c in folded if not unicodedata.combining(c)).split())
@@ -0,0 +1,155 @@
+"""
+Tempos por etapa de cada update (spans)
+Mantém janelas recentes por etapa para percentis e um ring buffer
+com os updates mais lentos
+"""
+
+import contextvars
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from config.settings import SLOW_UPDATE_THRESHOLD, SLOW_UPDATES_KEPT, TRACE_WINDOW
+
+
+class UpdateTrace:
+    """Spans coletados durante o processamento de um update"""
+
+    __slots__ = ("handler", "update_id", "chat_id", "started_at", "_start", "spans")
+
+    def __init__(self, handler: str, update_id: Optional[int] = None, chat_id: Optional[int] = None):
+        self.handler = handler
+        self.update_id = update_id
+        self.chat_id = chat_id
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self.spans: List[Tuple[str, float]] = []
+
+    def add(self, stage: str, duration: float) -> None:
+        """Adiciona a duração (segundos) de uma etapa"""
+        self.spans.append((stage, duration))
+
+    def elapsed(self) -> float:
+        """Tempo decorrido desde o início do update"""
+        return time.perf_counter() - self._start
+
+    def to_dict(self, total: float) -> Dict[str, Any]:
+        """Resumo serializável do update"""
+        return {
+            'handler': self.handler,
+            'update_id': self.update_id,
+            'chat_id': self.chat_id,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'total': round(total, 3),
+            'spans': [(stage, round(duration, 3)) for stage, duration in self.spans],
+        }
+
+
+class TraceCollector:
+    """Agrega os spans dos updates recentes"""
+
+    def __init__(self, window: int = 512, slow_threshold: float = 5.0, slow_kept: int = 50):
+        self.window = window
+        self.slow_threshold = slow_threshold
+        self._samples: Dict[str, Deque[float]] = {}
+        self.slow_updates: Deque[Dict[str, Any]] = deque(maxlen=slow_kept)
+
+    def _sample(self, stage: str, duration: float) -> None:
+        samples = self._samples.get(stage)
+        if samples is None:
+            samples = self._samples[stage] = deque(maxlen=self.window)
+        samples.append(duration)
+
+    def record(self, trace: UpdateTrace) -> None:
+        """Registra um update finalizado"""
+        total = trace.elapsed()
+        for stage, duration in trace.spans:
+            self._sample(stage, duration)
+        self._sample("total", total)
+        if total >= self.slow_threshold:
+            self.slow_updates.append(trace.to_dict(total))
+
+    def percentiles(self) -> Dict[str, Dict[str, float]]:
+        """
+        Calcula p50/p95/p99 por etapa sobre a janela recente
+
+        Returns:
+            Dicionário etapa -> {'count', 'p50', 'p95', 'p99'}
+        """
+        result = {}
+        for stage, samples in self._samples.items():
+            ordered = sorted(samples)
+            result[stage] = {
+                'count': len(ordered),
+                'p50': _quantile(ordered, 0.50),
+                'p95': _quantile(ordered, 0.95),
+                'p99': _quantile(ordered, 0.99),
+            }
+        return result
+
+    def clear(self) -> None:
+        """Descarta as amostras coletadas"""
+        self._samples.clear()
+        self.slow_updates.clear()
+
+
+def _quantile(ordered: List[float], q: float) -> float:
+    """Quantil por vizinho mais próximo de uma lista ordenada"""
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(q * len(ordered)))
+    return ordered[index]
+
+
+_current_trace: contextvars.ContextVar[Optional[UpdateTrace]] = contextvars.ContextVar(
+    "current_trace", default=None
+)
+
+
+def current_trace() -> Optional[UpdateTrace]:
+    """Trace do update em andamento (None fora de um update)"""
+    return _current_trace.get()
+
+
+@contextmanager
+def trace_update(handler: str, update_id: Optional[int] = None,
+                 chat_id: Optional[int] = None) -> Iterator[UpdateTrace]:
+    """Abre o trace de um update e o registra ao final"""
+    trace = UpdateTrace(handler, update_id, chat_id)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        tracer.record(trace)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Mede uma etapa do update corrente (no-op fora de um trace)"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(stage, time.perf_counter() - start)
+
+
+def record_span(stage: str, duration: float) -> None:
+    """Registra uma etapa já medida (ex.: tempos reportados pelo Ollama)"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(stage, duration)
+
+
+# Instância global do coletor
+tracer = TraceCollector(
+    window=TRACE_WINDOW,
+    slow_threshold=SLOW_UPDATE_THRESHOLD,
+    slow_kept=SLOW_UPDATES_KEPT,
+)
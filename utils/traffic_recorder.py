@@ -0,0 +1,106 @@
+"""
+Gravação opcional do tráfego recebido pelo bot
+Grava updates anonimizados em JSON Lines (append-only) para replay em
+benchmarks/replay.py. A escrita no arquivo é feita por uma thread, fora do
+event loop.
+"""
+
+import hashlib
+import json
+import logging
+import queue
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Tamanho mínimo do sal: sem ele os hashes de IDs (poucos bytes) podem ser revertidos por força bruta
+MIN_SALT_LENGTH = 16
+
+# Registros aguardando a thread de escrita antes de começar a descartar
+_QUEUE_SIZE = 10000
+
+# Padrões removidos do texto antes de gravar
+_URL_RE = re.compile(r"https?://\S+|www\.\S+")
+_EMAIL_RE = re.compile(r"\b[\w.+-]+@[\w-]+\.[\w.]+\b")
+_MENTION_RE = re.compile(r"@\w+")
+_DIGITS_RE = re.compile(r"\d{4,}")
+
+
+def anonymize_text(text: str) -> str:
+    """Remove URLs, e-mails, menções e sequências longas de dígitos"""
+    text = _URL_RE.sub("<url>", text)
+    text = _EMAIL_RE.sub("<email>", text)
+    text = _MENTION_RE.sub("@user", text)
+    return _DIGITS_RE.sub("<num>", text)
+
+
+class TrafficRecorder:
+    """
+    Grava um registro compacto por update
+
+    Formato de cada linha (chaves curtas para economizar espaço):
+        t: timestamp unix do recebimento
+        c: hash do chat, u: hash do usuário, g: 1 se for grupo
+        x: texto anonimizado (ou n: tamanho do texto, se o texto não for gravado)
+        r: ferramenta detectada para a mensagem (quando houver)
+    """
+
+    def __init__(self, path: str, salt: str, record_text: bool = False):
+        if len(salt) < MIN_SALT_LENGTH:
+            raise ValueError(f"TRAFFIC_RECORD_SALT precisa de ao menos {MIN_SALT_LENGTH} caracteres")
+        self.path = path
+        self.salt = salt.encode()
+        self.record_text = record_text
+        self.records = 0
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(_QUEUE_SIZE)
+        self._writer = threading.Thread(target=self._write_forever, name="traffic-recorder", daemon=True)
+        self._writer.start()
+        logger.info(f"Gravando tráfego em {path}")
+
+    def _hash(self, value: int) -> str:
+        return hashlib.blake2b(str(value).encode(), digest_size=6, key=self.salt[:64]).hexdigest()
+
+    def record(self, chat_id: int, user_id: Optional[int], text: str,
+               is_group: bool = False, route: Optional[str] = None) -> None:
+        """Grava um update recebido"""
+        entry: Dict[str, Any] = {"t": round(time.time(), 3), "c": self._hash(chat_id)}
+        if user_id is not None:
+            entry["u"] = self._hash(user_id)
+        if is_group:
+            entry["g"] = 1
+        if self.record_text:
+            entry["x"] = anonymize_text(text)
+        else:
+            entry["n"] = len(text)
+        if route:
+            entry["r"] = route
+        try:
+            self._queue.put_nowait(entry)
+            self.records += 1
+        except queue.Full:
+            # Disco lento: descarta em vez de segurar o event loop
+            from utils.metrics import metrics
+
+            metrics.counter("traffic_records_dropped_total").inc()
+
+    def _write_forever(self) -> None:
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                return
+            try:
+                self._file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+            except Exception as e:
+                logger.warning(f"Erro ao gravar tráfego: {e}")
+
+    def close(self) -> None:
+        """Grava os registros pendentes e fecha o arquivo"""
+        if self._file.closed:
+            return
+        self._queue.put(None)
+        self._writer.join()
+        self._file.close()